@@ -1,12 +1,77 @@
+from typing import Optional
 from fastapi import Depends, HTTPException
+from starlette.requests import HTTPConnection
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
+from app.core.security import token_signer, TokenClaims, TokenError
 
 def get_database_session(db: Session = Depends(get_db)):
     return db
 
-def get_current_user_id(user_id: int = None) -> int:
-    """Helper to get current user ID - in production this would use JWT token"""
+def get_token_claims(connection: HTTPConnection) -> Optional[TokenClaims]:
+    """Claims of the request's access token (verified without the database), None without one"""
+    authorization = connection.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        # EventSource and browser WebSockets cannot set headers
+        token = connection.query_params.get("access_token")
+    if not token:
+        return None
+    try:
+        return token_signer.verify(token.strip())
+    except TokenError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+def require_active_user(user_id: int, superuser: bool = False) -> None:
+    """
+    Tokens are valid until they expire, so a deleted or deactivated user (and, with
+    superuser, a demoted one) is refused here. Cached per worker (identity_cache), so
+    this rarely queries; the session is its own so that long-lived responses (event
+    streams) do not hold a connection.
+    """
+    from app.services import user_service
+    db = SessionLocal()
+    try:
+        active = user_service.user_exists_by_id(db, user_id)
+        is_superuser = active and user_service.is_active_superuser(db, user_id)
+    finally:
+        db.close()
+    if not active:
+        raise HTTPException(status_code=401, detail="User is inactive or deleted", headers={"WWW-Authenticate": "Bearer"})
+    if superuser and not is_superuser:
+        raise HTTPException(status_code=403, detail="Superuser access required")
+
+def resolve_user_id(claims: Optional[TokenClaims], user_id: Optional[int]) -> int:
+    """The token's user; the user_id query param only when no token was sent and that is allowed"""
+    if claims is not None:
+        if user_id is not None and user_id != claims.user_id:
+            raise HTTPException(status_code=403, detail="Token does not belong to this user")
+        return claims.user_id
+    if not settings.AUTH_ALLOW_USER_ID_PARAM:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
     if not user_id:
         raise HTTPException(status_code=401, detail="User ID required")
-    return user_id
\ No newline at end of file
+    return user_id
+
+def get_current_user_id(
+    user_id: Optional[int] = None,
+    claims: Optional[TokenClaims] = Depends(get_token_claims)
+) -> int:
+    """Current active user from the bearer token (or, in development, the user_id query param)"""
+    user_id = resolve_user_id(claims, user_id)
+    if claims is not None:
+        require_active_user(user_id)
+    return user_id
+
+def get_current_superuser(claims: Optional[TokenClaims] = Depends(get_token_claims)) -> Optional[TokenClaims]:
+    """Guard for the admin API: a superuser's token (no token is let through only in development)"""
+    if claims is None:
+        if settings.AUTH_ALLOW_USER_ID_PARAM:
+            return None
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    if not claims.is_superuser:
+        raise HTTPException(status_code=403, detail="Superuser access required")
+    # The claim lasts as long as the token; the database decides whether it still holds
+    require_active_user(claims.user_id, superuser=True)
+    return claims
@@ -0,0 +1,74 @@
+"""
+Projections from database rows to response payloads.
+
+Routes return these plain dicts and let FastAPI validate them once against the
+route's response_model. Building TaskResponse/ProjectResponse instances in the
+route instead means every field is copied, validated, dumped back to a dict by
+FastAPI and then validated again.
+"""
+
+from typing import Dict, List, Optional
+from app.models.database import Project as ProjectDB, Task as TaskDB, Roadmap as RoadmapDB, Conversation, Tombstone
+
+def task_to_dict(task: TaskDB) -> dict:
+    """TaskResponse shape for a task row"""
+    return {
+        "id": task.id,
+        "project_id": task.project_id,
+        "text": task.text,
+        "completed": task.completed,
+        "task_type": task.task_type,
+        "created_at": task.created_at,
+        "updated_at": task.updated_at,
+        "archive": task.archive or False,
+    }
+
+def tasks_by_type_to_dict(tasks_by_type: Dict[str, List[TaskDB]]) -> dict:
+    """TasksByType shape for the grouping returned by TaskService"""
+    return {
+        "daily_todos": [task_to_dict(task) for task in tasks_by_type["daily-todos"]],
+        "your_ideas": [task_to_dict(task) for task in tasks_by_type["your-ideas"]],
+    }
+
+def project_to_dict(project: ProjectDB, roadmap_data: Optional[dict], tasks_by_type: Optional[Dict[str, List[TaskDB]]]) -> dict:
+    """ProjectResponse shape; roadmap_data comes from RoadmapService's compatibility view"""
+    return {
+        "id": project.id,
+        "name": project.name,
+        "description": project.description,
+        "status": project.status,
+        "roadmap_data": roadmap_data,
+        "tasks": tasks_by_type_to_dict(tasks_by_type) if tasks_by_type is not None else None,
+        "created_at": project.created_at,
+        "updated_at": project.updated_at,
+    }
+
+def roadmap_to_dict(roadmap: RoadmapDB, roadmap_data: Optional[dict]) -> dict:
+    """SyncRoadmap shape; roadmap_data comes from RoadmapService.get_conversation_roadmaps"""
+    return {
+        "id": roadmap.id,
+        "conversation_id": roadmap.conversation_id,
+        "roadmap_data": roadmap_data,
+        "roadmap_hash": roadmap.roadmap_hash,
+        "updated_at": roadmap.updated_at,
+    }
+
+def conversation_to_dict(conversation: Conversation) -> dict:
+    """SyncConversation shape (conversation metadata, without messages)"""
+    return {
+        "id": conversation.id,
+        "session_id": conversation.session_id,
+        "project_id": conversation.project_id,
+        "project_name": conversation.project_name,
+        "current_phase": conversation.current_phase,
+        "is_specification_complete": bool(conversation.is_specification_complete),
+        "updated_at": conversation.updated_at,
+    }
+
+def tombstone_to_dict(tombstone: Tombstone) -> dict:
+    """SyncDeletion shape"""
+    return {
+        "entity_type": tombstone.entity_type,
+        "entity_id": tombstone.entity_id,
+        "deleted_at": tombstone.deleted_at,
+    }
@@ -1,57 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
-import shutil
 import os
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.database import User, Project, Conversation, Roadmap
-from app.services.feedback_service import FeedbackService
+from app.core.llm_governor import llm_governor
+from app.core.retry import llm_retry
+from app.models.database import User, Project, Conversation, Roadmap, Epic, Story, Tombstone
+from app.services import (
+    user_service, project_service, feedback_service, roadmap_version_service,
+    backup_service, wal_shipping_service, analytics_service, search_service, password_service
+)
+from app.services.backup_service import BackupInProgressError
 from app.models.api_schemas import UserCreate, FeedbackUpdate
 
 router = APIRouter()
-feedback_service = FeedbackService()
+
+def _set_page_headers(response: Response, total: int, next_before_id: Optional[int]) -> None:
+    """Listing bodies stay plain arrays; the total and the next page cursor travel in headers"""
+    response.headers["X-Total-Count"] = str(total)
+    if next_before_id is not None:
+        response.headers["X-Next-Before-Id"] = str(next_before_id)
 
 @router.get("/users")
-async def get_all_users(db: Session = Depends(get_db)):
-    """Get all users with their project counts"""
+async def get_all_users(
+    response: Response,
+    search: Optional[str] = Query(None, description="Case-insensitive prefix of email, first or last name"),
+    is_active: Optional[bool] = None,
+    limit: int = Query(100, ge=1, le=500),
+    before_id: Optional[int] = Query(None, description="X-Next-Before-Id of the previous page"),
+    db: Session = Depends(get_db)
+):
+    """Page of users (newest first) with their project counts; X-Total-Count holds the number of matches"""
     try:
-        # Get users with project counts
-        query = text("""
-            SELECT 
-                u.id,
-                u.email,
-                u.first_name,
-                u.last_name,
-                u.is_active,
-                u.created_at,
-                u.updated_at,
-                COUNT(p.id) as project_count
-            FROM users u
-            LEFT JOIN projects p ON u.id = p.user_id
-            GROUP BY u.id, u.email, u.first_name, u.last_name, u.is_active, u.created_at, u.updated_at
-            ORDER BY u.created_at DESC
-        """)
-        
-        result = db.execute(query)
-        users = []
-        
-        for row in result:
-            users.append({
-                "id": row.id,
-                "email": row.email,
-                "first_name": row.first_name,
-                "last_name": row.last_name,
-                "is_active": row.is_active,
-                "created_at": row.created_at,
-                "updated_at": row.updated_at,
-                "project_count": row.project_count
-            })
-        
-        return users
+        users, total, next_before_id = user_service.list_users(
+            db, search=(search or "").strip() or None, is_active=is_active, limit=limit, before_id=before_id
+        )
+        _set_page_headers(response, total, next_before_id)
+        
+        return [{
+            "id": user.id,
+            "email": user.email,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "is_active": user.is_active,
+            "created_at": user.created_at,
+            "updated_at": user.updated_at,
+            "project_count": user.project_count
+        } for user in users]
         
     except Exception as e:
         raise HTTPException(
@@ -76,7 +77,7 @@ async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
             email=user_data.email,
             first_name=user_data.first_name,
             last_name=user_data.last_name,
-            password_hash=user_data.password,  # In production, hash this!
+            password_hash=await password_service.hash_async(user_data.password) if user_data.password else None,
             is_active=True
         )
         
@@ -115,7 +116,9 @@ async def delete_user(user_id: int, db: Session = Depends(get_db)):
             )
         
         # Delete user's data in order (due to foreign key constraints)
-        # Delete roadmaps
+        # Delete roadmaps and their version history
+        roadmap_ids = [row.id for row in db.query(Roadmap.id).filter(Roadmap.user_id == user_id)]
+        roadmap_version_service.delete_versions(db, roadmap_ids)
         db.query(Roadmap).filter(Roadmap.user_id == user_id).delete()
         
         # Delete messages and conversations
@@ -128,9 +131,18 @@ async def delete_user(user_id: int, db: Session = Depends(get_db)):
         
         db.query(Conversation).filter(Conversation.user_id == user_id).delete()
         
-        # Delete projects
+        # Delete normalized roadmap rows and projects
+        user_project_ids = db.query(Project.id).filter(Project.user_id == user_id)
+        db.query(Story).filter(Story.project_id.in_(user_project_ids)).delete(synchronize_session=False)
+        db.query(Epic).filter(Epic.project_id.in_(user_project_ids)).delete(synchronize_session=False)
         db.query(Project).filter(Project.user_id == user_id).delete()
         
+        search_service.remove_user(db, user_id)
+        user_service.forget_user(db, user_id)
+        
+        # Nobody is left to sync these deletions to
+        db.query(Tombstone).filter(Tombstone.user_id == user_id).delete()
+        
         # Delete user
         db.delete(user)
         
@@ -159,6 +171,7 @@ async def toggle_user_status(user_id: int, status_data: dict, db: Session = Depe
             )
         
         user.is_active = status_data.get("is_active", not user.is_active)
+        user_service.forget_user(db, user_id)
         user.updated_at = datetime.utcnow()
         
         db.commit()
@@ -183,7 +196,15 @@ async def toggle_user_status(user_id: int, status_data: dict, db: Session = Depe
 async def get_user_projects(user_id: int, db: Session = Depends(get_db)):
     """Get all projects for a specific user"""
     try:
-        projects = db.query(Project).filter(Project.user_id == user_id).order_by(Project.created_at.desc()).all()
+        projects = db.query(
+            Project.id,
+            Project.name,
+            Project.description,
+            Project.status,
+            Project.created_at,
+            Project.updated_at,
+            Project.has_roadmap
+        ).filter(Project.user_id == user_id).order_by(Project.created_at.desc()).all()
         
         return [{
             "id": project.id,
@@ -192,7 +213,7 @@ async def get_user_projects(user_id: int, db: Session = Depends(get_db)):
             "status": project.status,
             "created_at": project.created_at,
             "updated_at": project.updated_at,
-            "has_roadmap": project.roadmap_data is not None
+            "has_roadmap": project.has_roadmap
         } for project in projects]
         
     except Exception as e:
@@ -202,42 +223,40 @@ async def get_user_projects(user_id: int, db: Session = Depends(get_db)):
         )
 
 @router.get("/projects")
-async def get_all_projects(db: Session = Depends(get_db)):
-    """Get all projects with user information"""
+async def get_all_projects(
+    response: Response,
+    search: Optional[str] = Query(None, description="Case-insensitive prefix of the project name"),
+    project_status: Optional[str] = Query(None, alias="status"),
+    has_roadmap: Optional[bool] = None,
+    user_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    before_id: Optional[int] = Query(None, description="X-Next-Before-Id of the previous page"),
+    db: Session = Depends(get_db)
+):
+    """Page of projects (newest first) with user information; X-Total-Count holds the number of matches"""
     try:
-        query = text("""
-            SELECT 
-                p.id,
-                p.name,
-                p.description,
-                p.status,
-                p.created_at,
-                p.updated_at,
-                p.roadmap_data,
-                u.first_name || ' ' || u.last_name as user_name,
-                u.email as user_email
-            FROM projects p
-            JOIN users u ON p.user_id = u.id
-            ORDER BY p.created_at DESC
-        """)
-        
-        result = db.execute(query)
-        projects = []
-        
-        for row in result:
-            projects.append({
-                "id": row.id,
-                "name": row.name,
-                "description": row.description,
-                "status": row.status,
-                "created_at": row.created_at,
-                "updated_at": row.updated_at,
-                "has_roadmap": row.roadmap_data is not None,
-                "user_name": row.user_name,
-                "user_email": row.user_email
-            })
-        
-        return projects
+        projects, total, next_before_id = project_service.list_all_projects(
+            db,
+            search=(search or "").strip() or None,
+            status=project_status,
+            has_roadmap=has_roadmap,
+            user_id=user_id,
+            limit=limit,
+            before_id=before_id
+        )
+        _set_page_headers(response, total, next_before_id)
+        
+        return [{
+            "id": row.id,
+            "name": row.name,
+            "description": row.description,
+            "status": row.status,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "has_roadmap": row.has_roadmap,
+            "user_name": f"{row.first_name} {row.last_name}" if row.first_name is not None and row.last_name is not None else None,
+            "user_email": row.email
+        } for row in projects]
         
     except Exception as e:
         raise HTTPException(
@@ -246,27 +265,14 @@ async def get_all_projects(db: Session = Depends(get_db)):
         )
 
 @router.get("/analytics")
-async def get_analytics(db: Session = Depends(get_db)):
-    """Get system analytics"""
+async def get_analytics(days: int = 30, db: Session = Depends(get_db)):
+    """
+    Get system analytics: totals plus daily series (signups, projects created, roadmaps
+    generated, conversations started) for the last `days` days. Served from rollup tables
+    refreshed in the background; `refreshed_at` says how current they are.
+    """
     try:
-        # Get basic counts
-        total_users = db.query(User).count()
-        active_projects = db.query(Project).filter(Project.status == "active").count()
-        total_roadmaps = db.query(Roadmap).count()
-        total_conversations = db.query(Conversation).count()
-        
-        # Get projects with roadmaps
-        projects_with_roadmaps = db.query(Project).filter(Project.roadmap_data.isnot(None)).count()
-        
-        return {
-            "total_users": total_users,
-            "active_projects": active_projects,
-            "total_projects": db.query(Project).count(),
-            "total_roadmaps": total_roadmaps,
-            "total_conversations": total_conversations,
-            "projects_with_roadmaps": projects_with_roadmaps,
-            "roadmap_completion_rate": (projects_with_roadmaps / max(active_projects, 1)) * 100 if active_projects > 0 else 0
-        }
+        return analytics_service.get_analytics(db, days)
         
     except Exception as e:
         raise HTTPException(
@@ -274,36 +280,90 @@ async def get_analytics(db: Session = Depends(get_db)):
             detail=f"Failed to fetch analytics: {str(e)}"
         )
 
-@router.post("/backup")
-async def create_backup(db: Session = Depends(get_db)):
-    """Create a database backup"""
+@router.post("/analytics/refresh")
+async def refresh_analytics(full: bool = False, db: Session = Depends(get_db)):
+    """Recompute the analytics rollups now (`full` rebuilds every daily bucket)"""
     try:
-        # Get the database file path
-        db_path = "/Users/henriquepitta/Desktop/Roadmap/agentic-backend/roadmap.db"
-        backup_dir = "/Users/henriquepitta/Desktop/Roadmap/agentic-backend/backups"
-        
-        # Create backup directory if it doesn't exist
-        os.makedirs(backup_dir, exist_ok=True)
+        analytics_service.refresh(db, full=full)
+        return analytics_service.get_analytics(db)
         
-        # Create backup filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"roadmap_backup_{timestamp}.db"
-        backup_path = os.path.join(backup_dir, backup_filename)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to refresh analytics: {str(e)}"
+        )
+
+@router.post("/search/rebuild")
+async def rebuild_search_index(db: Session = Depends(get_db)):
+    """Drop and rebuild the full-text search index from the database"""
+    try:
+        documents = await run_in_threadpool(search_service.rebuild, db)
+        return {"documents": documents}
         
-        # Copy the database file
-        shutil.copy2(db_path, backup_path)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to rebuild search index: {str(e)}"
+        )
+
+@router.post("/backup")
+async def create_backup():
+    """
+    Create an online database backup. The copy runs in a worker thread and is verified
+    before it is kept; poll GET /backup/status from another request for progress.
+    """
+    try:
+        result = await run_in_threadpool(backup_service.create_backup)
+        return {"message": "Backup created successfully", **result}
         
+    except BackupInProgressError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create backup: {str(e)}"
+        )
+
+@router.get("/backup/status")
+async def backup_status():
+    """Progress of the running backup, or the outcome of the last one"""
+    return backup_service.status
+
+@router.get("/backup/wal")
+async def wal_backup_status():
+    """Continuous (WAL shipping) backup: shipper state and the restorable generations"""
+    try:
         return {
-            "message": "Backup created successfully",
-            "backup_file": backup_filename,
-            "backup_path": backup_path,
-            "created_at": datetime.now().isoformat()
+            "enabled": settings.BACKUP_WAL_SHIPPING,
+            "status": wal_shipping_service.status,
+            "generations": wal_shipping_service.list_generations()
         }
         
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create backup: {str(e)}"
+            detail=f"Failed to read WAL backup status: {str(e)}"
+        )
+
+@router.get("/llm")
+async def llm_status():
+    """LLM concurrency governor (slots in use, queue depth, recent wait times) and provider retries, for this worker"""
+    return {**llm_governor.stats(), "retries": llm_retry.stats()}
+
+@router.get("/backups")
+async def list_backups():
+    """Backups kept in the primary backup destination, newest first"""
+    try:
+        return backup_service.list_backups()
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to list backups: {str(e)}"
         )
 
 @router.get("/health")
@@ -314,8 +374,8 @@ async def system_health(db: Session = Depends(get_db)):
         db.execute(text("SELECT 1"))
         
         # Get database file size
-        db_path = "/Users/henriquepitta/Desktop/Roadmap/agentic-backend/roadmap.db"
-        db_size = os.path.getsize(db_path) if os.path.exists(db_path) else 0
+        db_path = backup_service.database_path()
+        db_size = os.path.getsize(db_path) if db_path and os.path.exists(db_path) else 0
         
         return {
             "status": "healthy",
@@ -333,10 +393,20 @@ async def system_health(db: Session = Depends(get_db)):
         }
 
 @router.get("/feedback")
-async def get_all_feedback(db: Session = Depends(get_db)):
-    """Get all feedback (admin use)"""
+async def get_all_feedback(
+    response: Response,
+    feedback_status: Optional[str] = Query(None, alias="status"),
+    feedback_type: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    before_id: Optional[int] = Query(None, description="X-Next-Before-Id of the previous page"),
+    db: Session = Depends(get_db)
+):
+    """Page of feedback (newest first, admin use); X-Total-Count holds the number of matches"""
     try:
-        feedback_list = feedback_service.get_all_feedback(db)
+        feedback_list, total, next_before_id = feedback_service.get_all_feedback(
+            db, status=feedback_status, feedback_type=feedback_type, limit=limit, before_id=before_id
+        )
+        _set_page_headers(response, total, next_before_id)
         return feedback_list
         
     except Exception as e:
@@ -1,32 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 from app.core.database import get_db
-from app.models.api_schemas import ConversationState, ChatMessage, Roadmap, ChatRequest, ChatResponse
-from app.services import database_service
+from app.core.etag import etag_matches
+from app.core.llm_governor import llm_governor, LlmBusyError
+from app.core.serialization import json_loads
+from app.models.api_schemas import ConversationState, ChatMessage, Roadmap, ChatRequest, ChatResponse, RoadmapVersionInfo
+from app.services import database_service, roadmap_service, roadmap_version_service
 import uuid
 from datetime import datetime
 import logging
-import os
 
-# Set Google API key in environment before importing agent
-from app.core.config import settings
-os.environ["GOOGLE_API_KEY"] = settings.GOOGLE_API_KEY
-
-# Google ADK imports
-from google.adk.sessions import DatabaseSessionService
-from google.adk.runners import Runner
-from google.genai.types import Content, Part
-from app.agents.agent import project_roadmap_orchestrator
+# Google ADK, the agents and the ADK session service load on first use (see agent_runtime)
+from app.core.agent_runtime import agent_runtime
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Global session service to maintain ADK sessions
-# Using DatabaseSessionService for persistence across restarts and multiple workers
-SESSION_SERVICE = DatabaseSessionService(db_url=settings.DATABASE_URL)
-
 @router.post("/conversate", response_model=ChatResponse)
 async def conversate_with_agent(
     request: ChatRequest,
@@ -41,14 +32,16 @@ async def conversate_with_agent(
 
         logger.info(f"Processing conversation request for session: {session_id} (User: {user_id})")
 
-        existing_session = await SESSION_SERVICE.get_session(
+        stack = await agent_runtime.get()
+
+        existing_session = await stack.session_service.get_session(
             user_id=user_id,
             session_id=session_id,
             app_name="conversation"
         )
 
         if existing_session is None:
-            await SESSION_SERVICE.create_session(
+            await stack.session_service.create_session(
                 app_name="conversation",
                 user_id=user_id,
                 state={},
@@ -60,59 +53,46 @@ async def conversate_with_agent(
 
         story_context = ""
         if request.selected_story_ids and request.conversation_state and request.conversation_state.project_id:
-            from app.models.database import Project
-            project = db.query(Project).filter(Project.id == request.conversation_state.project_id).first()
+            # Indexed lookup on (project_id, story_id) instead of walking the roadmap JSON
+            selected_stories = roadmap_service.get_stories(
+                db, request.conversation_state.project_id, request.selected_story_ids
+            )
             
-            if project and project.roadmap_data:
-                roadmap_data = project.roadmap_data
-                epics = roadmap_data.get("epics", []) or roadmap_data.get("roadmapNodes", [])
-                
-                selected_stories = []
-                for epic in epics:
-                    stories = epic.get("stories", []) or epic.get("subtasks", [])
-                    for story in stories:
-                        if story.get("id") in request.selected_story_ids:
-                            selected_stories.append({
-                                "title": story.get("title", ""),
-                                "acceptance_criteria": story.get("acceptance_criteria", [])
-                            })
-                
-                if selected_stories:
-                    story_context = "\n\nSelected Stories Context:\n"
-                    for idx, story in enumerate(selected_stories, 1):
-                        story_context += f"\n{idx}. {story['title']}\n"
-                        if story.get("acceptance_criteria"):
-                            story_context += "   Acceptance Criteria:\n"
-                            for ac in story["acceptance_criteria"]:
-                                story_context += f"   - {ac}\n"
+            if selected_stories:
+                story_context = "\n\nSelected Stories Context:\n"
+                for idx, story in enumerate(selected_stories, 1):
+                    story_context += f"\n{idx}. {story.get('title', '')}\n"
+                    if story.get("acceptance_criteria"):
+                        story_context += "   Acceptance Criteria:\n"
+                        for ac in story["acceptance_criteria"]:
+                            story_context += f"   - {ac}\n"
 
         user_message = request.message
         if story_context:
             user_message = f"{story_context}\n\nUser Question: {request.message}"
         
-        user_content = Content(parts=[Part(text=user_message)])
-
-        from app.agents.agent import conversation_agent
+        user_content = stack.Content(parts=[stack.Part(text=user_message)])
 
-        runner = Runner(
+        runner = stack.Runner(
             app_name="conversation",
-            agent=conversation_agent,
-            session_service=SESSION_SERVICE
+            agent=stack.conversation_agent,
+            session_service=stack.session_service
         )
 
         agent_response_parts = []
 
-        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=user_content):
-            logger.debug(f"Conversation agent event: author={event.author}")
+        async with llm_governor.slot(user_id):
+            async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=user_content):
+                logger.debug(f"Conversation agent event: author={event.author}")
 
-            if event.content and event.content.parts:
-                for part in event.content.parts:
-                    if hasattr(part, 'text') and part.text:
-                        agent_response_parts.append(part.text)
+                if event.content and event.content.parts:
+                    for part in event.content.parts:
+                        if hasattr(part, 'text') and part.text:
+                            agent_response_parts.append(part.text)
 
         agent_response = "\n".join(agent_response_parts) if agent_response_parts else "I'm here to help! How can I assist you?"
 
-        session = await SESSION_SERVICE.get_session(
+        session = await stack.session_service.get_session(
             user_id=user_id,
             session_id=session_id,
             app_name="conversation"
@@ -156,6 +136,9 @@ async def conversate_with_agent(
             session_id=session_id
         )
 
+    except LlmBusyError as e:
+        logger.warning(f"Error processing conversation: {e}")
+        raise HTTPException(status_code=503, detail="The assistant is busy, please retry shortly", headers={"Retry-After": "30"})
     except Exception as e:
         logger.error(f"Error processing conversation: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing conversation: {str(e)}")
@@ -175,8 +158,10 @@ async def create_roadmap(
 
         logger.info(f"Processing chat request for session: {session_id} (User: {user_id})")
 
+        stack = await agent_runtime.get()
+
         # Check if session exists (get_session returns None if not found, doesn't raise exception)
-        existing_session = await SESSION_SERVICE.get_session(
+        existing_session = await stack.session_service.get_session(
             user_id=user_id,
             session_id=session_id,
             app_name="agents"
@@ -184,7 +169,7 @@ async def create_roadmap(
 
         if existing_session is None:
             # Create session if it doesn't exist (first message in conversation)
-            await SESSION_SERVICE.create_session(
+            await stack.session_service.create_session(
                 app_name="agents",
                 user_id=user_id,
                 state={},
@@ -195,46 +180,51 @@ async def create_roadmap(
             logger.info(f"Using existing ADK session: {session_id}")
 
         # Create user message content
-        user_content = Content(parts=[Part(text=request.message)])
+        user_content = stack.Content(parts=[stack.Part(text=request.message)])
 
         # Run the agent (Runner setup uses the correct app_name)
-        runner = Runner(
+        runner = stack.Runner(
             app_name="agents",
-            agent=project_roadmap_orchestrator,
-            session_service=SESSION_SERVICE
+            agent=stack.roadmap_agent,
+            session_service=stack.session_service
         )
 
         # Collect agent responses
         agent_response_parts = []
 
-        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=user_content):
-            logger.debug(f"Agent event: author={event.author}")
+        # One slot per run: the agents of a run call the model one after another
+        async with llm_governor.slot(user_id):
+            async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=user_content):
+                logger.debug(f"Agent event: author={event.author}")
 
-            # Collect responses from any sub-agent
-            if event.content and event.content.parts:
-                for part in event.content.parts:
-                    if hasattr(part, 'text') and part.text:
-                        agent_response_parts.append(part.text)
+                # Collect responses from any sub-agent
+                if event.content and event.content.parts:
+                    for part in event.content.parts:
+                        if hasattr(part, 'text') and part.text:
+                            agent_response_parts.append(part.text)
 
         # Combine all response parts
         raw_response = "\n".join(agent_response_parts) if agent_response_parts else "Processing your request..."
 
         # Parse JSON response(s) and extract message field(s) if it's structured output
-        import json
         agent_response = raw_response
         extracted_messages = []
 
         # Try to parse each response part individually (in case multiple agents respond)
         for part in agent_response_parts:
+            # Plain-text parts can't be JSON objects; skip the parse attempt
+            if not part.lstrip().startswith("{"):
+                extracted_messages.append(part)
+                continue
             try:
-                parsed_response = json.loads(part)
+                parsed_response = json_loads(part)
                 if isinstance(parsed_response, dict) and "message" in parsed_response:
                     extracted_messages.append(parsed_response["message"])
                     logger.debug(f"Extracted message from JSON response part")
                 else:
                     # JSON but no message field, use raw part
                     extracted_messages.append(part)
-            except (json.JSONDecodeError, ValueError):
+            except ValueError:
                 # Not JSON, use raw part
                 extracted_messages.append(part)
 
@@ -245,7 +235,7 @@ async def create_roadmap(
             agent_response = raw_response
 
         # Get updated session to extract state
-        session = await SESSION_SERVICE.get_session(
+        session = await stack.session_service.get_session(
             user_id=user_id,
             session_id=session_id,
             app_name="agents"
@@ -328,6 +318,9 @@ async def create_roadmap(
             session_id=session_id
         )
 
+    except LlmBusyError as e:
+        logger.warning(f"Error processing message: {e}")
+        raise HTTPException(status_code=503, detail="The assistant is busy, please retry shortly", headers={"Retry-After": "30"})
     except Exception as e:
         logger.error(f"Error processing message: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
@@ -335,18 +328,25 @@ async def create_roadmap(
 @router.get("/conversation/{session_id}")
 async def get_conversation(
     session_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieve conversation state by session ID
+    Retrieve conversation state by session ID (304 when If-None-Match is current)
     """
     try:
+        etag = database_service.get_conversation_etag(db, session_id)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
         # Load conversation state from database
         conversation_state = database_service.load_conversation_state(db, session_id)
 
         if not conversation_state:
             raise HTTPException(status_code=404, detail="Conversation not found")
 
+        response.headers["ETag"] = etag
         return conversation_state
 
     except Exception as e:
@@ -355,16 +355,24 @@ async def get_conversation(
 @router.get("/roadmap/{session_id}")
 async def get_roadmap(
     session_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Get the current roadmap for a session
+    Get the current roadmap for a session (304 when If-None-Match is current)
     """
     try:
+        # Checked before the roadmap JSON is loaded and decompressed
+        etag = database_service.get_roadmap_etag(db, session_id)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
         # Load roadmap from database
         roadmap = database_service.load_roadmap(db, session_id)
 
         if roadmap:
+            response.headers["ETag"] = etag
             return {"roadmap": roadmap.dict(), "message": "Roadmap retrieved successfully"}
         else:
             return {"roadmap": None, "message": "No roadmap found for this session"}
@@ -372,6 +380,77 @@ async def get_roadmap(
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Roadmap not found: {str(e)}")
 
+@router.get("/roadmap/{session_id}/versions", response_model=List[RoadmapVersionInfo])
+async def list_roadmap_versions(
+    session_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    List the stored versions of a session's roadmap, newest first
+    """
+    try:
+        roadmap_id = database_service.get_roadmap_id(db, session_id)
+        if roadmap_id is None:
+            raise HTTPException(status_code=404, detail="Roadmap not found")
+
+        return roadmap_version_service.list_versions(db, roadmap_id)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing roadmap versions: {str(e)}")
+
+@router.get("/roadmap/{session_id}/versions/diff")
+async def diff_roadmap_versions(
+    session_id: str,
+    from_version: int,
+    to_version: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Structural delta between two versions of a session's roadmap
+    """
+    try:
+        roadmap_id = database_service.get_roadmap_id(db, session_id)
+        if roadmap_id is None:
+            raise HTTPException(status_code=404, detail="Roadmap not found")
+
+        delta = roadmap_version_service.diff_versions(db, roadmap_id, from_version, to_version)
+        if delta is None:
+            raise HTTPException(status_code=404, detail="Version not found")
+
+        return {"from_version": from_version, "to_version": to_version, "delta": delta}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error diffing roadmap versions: {str(e)}")
+
+@router.get("/roadmap/{session_id}/versions/{version}")
+async def get_roadmap_version(
+    session_id: str,
+    version: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Get a past version of a session's roadmap
+    """
+    try:
+        roadmap_id = database_service.get_roadmap_id(db, session_id)
+        if roadmap_id is None:
+            raise HTTPException(status_code=404, detail="Roadmap not found")
+
+        roadmap_data = roadmap_version_service.get_version(db, roadmap_id, version)
+        if roadmap_data is None:
+            raise HTTPException(status_code=404, detail="Version not found")
+
+        return {"version": version, "roadmap": roadmap_data}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading roadmap version: {str(e)}")
+
 @router.delete("/conversation/{session_id}")
 async def delete_conversation(
     session_id: str,
@@ -402,7 +481,8 @@ async def agent_health():
         return {
             "status": "healthy",
             "agent": "Google ADK",
-            "model": "gemini-2.5-flash"
+            "model": "gemini-2.5-flash",
+            "loaded": agent_runtime.loaded  # False until the first agent request or the startup warm-up
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Agent unhealthy: {str(e)}")
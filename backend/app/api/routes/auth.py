@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.api.dependencies import get_current_user_id
+from app.core.config import settings
+from app.core.security import token_signer
 from app.models.database import User as UserDB
 from app.services import user_service
 from app.models.api_schemas import LoginRequest, UserResponse, User, LoginResponse, ChangePasswordRequest, ChangePasswordResponse
@@ -11,15 +14,21 @@ router = APIRouter()
 @router.post("/login", response_model=LoginResponse)
 async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """
-    Simple login endpoint for development
-    In production, this would return JWT tokens
+    Login with email and password (the password may be omitted in development)
+    Returns a signed access token for the other endpoints
     """
     try:
+        if login_data.password is None and not settings.AUTH_ALLOW_USER_ID_PARAM:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid email or password"
+            )
+        
         # Authenticate user
-        user = user_service.authenticate_user(
+        user = await user_service.authenticate_user(
             db, 
             email=login_data.email, 
-            password=None  # No password for dev mode
+            password=login_data.password  # May be omitted in development
         )
         
         if not user:
@@ -28,10 +37,10 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
                 detail="Invalid email or password"
             )
         
-        # For development: return user data directly
-        # In production: return JWT token
         return LoginResponse(
             message="Login successful",
+            access_token=token_signer.issue(user.id, user.is_superuser),
+            expires_in=token_signer.lifetime_seconds,
             user=UserResponse(
                 id=user.id,
                 email=user.email,
@@ -52,12 +61,12 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
-    user_id: int,  # In production, this would come from JWT token
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """
     Get current user information
-    For development, user_id is passed as query parameter
+    The user comes from the bearer token (in development, the user_id query param)
     """
     try:
         user = user_service.get_user_by_id(db, user_id)
@@ -88,13 +97,13 @@ async def get_current_user(
 
 @router.post("/change-password", response_model=ChangePasswordResponse)
 async def change_password(
-    user_id: int,
     password_data: ChangePasswordRequest,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """
     Change user password
-    For development, user_id is passed as query parameter
+    The user comes from the bearer token (in development, the user_id query param)
     """
     try:
         # Validate passwords match
@@ -127,14 +136,14 @@ async def change_password(
             )
         
         # Verify current password
-        if not user_service.verify_password(password_data.current_password, db_user.password_hash):
+        if not await user_service.verify_password(password_data.current_password, db_user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
         
         # Update password
-        success = user_service.update_password(db, user_id, password_data.new_password)
+        success = await user_service.update_password(db, user_id, password_data.new_password)
         
         if not success:
             raise HTTPException(
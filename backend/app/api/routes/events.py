@@ -0,0 +1,103 @@
+from fastapi import APIRouter, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.core.database import SessionLocal
+from app.api.dependencies import get_current_user_id, get_token_claims, resolve_user_id
+from app.core.events import event_bus
+from app.core.serialization import json_loads
+from app.services import user_service
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Proxies and browsers drop idle streams, so send a comment line this often
+KEEPALIVE_SECONDS = 15
+
+@router.get("/events")
+async def stream_events(user_id: int = Depends(get_current_user_id)):
+    """
+    Server-sent events for the user's projects, tasks and roadmaps. Each event names
+    what changed (e.g. `task.updated` with project_id/task_id); fetch the data with
+    /api/sync. EventSource cannot send headers, so the token may be passed as
+    ?access_token=.
+    """
+    try:
+        # Short-lived session: a Depends(get_db) one would stay open (holding a pooled
+        # connection) until the stream ends
+        db = SessionLocal()
+        try:
+            user_exists = user_service.user_exists_by_id(db, user_id)
+        finally:
+            db.close()
+        if not user_exists:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        async def event_stream():
+            # Subscribed inside the generator so the finally below always runs
+            subscription = await event_bus.subscribe(user_id)
+            try:
+                yield ": connected\n\n"
+                while True:
+                    try:
+                        message = await asyncio.wait_for(subscription.get(), KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+                        continue
+                    yield f"event: {json_loads(message)['type']}\ndata: {message}\n\n"
+            finally:
+                await subscription.close()
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error opening event stream: {str(e)}")
+
+@router.websocket("/events/ws")
+async def websocket_events(websocket: WebSocket, user_id: Optional[int] = None):
+    """WebSocket variant of /events; each message is one JSON event (token as ?access_token=)"""
+    try:
+        user_id = resolve_user_id(get_token_claims(websocket), user_id)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+
+    db = SessionLocal()
+    try:
+        user_exists = user_service.user_exists_by_id(db, user_id)
+    finally:
+        db.close()
+    if not user_exists:
+        await websocket.close(code=1008, reason="User not found")
+        return
+
+    await websocket.accept()
+    subscription = await event_bus.subscribe(user_id)
+
+    async def forward():
+        while True:
+            await websocket.send_text(await subscription.get())
+
+    async def wait_for_disconnect():
+        # Incoming messages are ignored; receiving is how a disconnect is noticed
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(wait_for_disconnect())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.warning(f"Event websocket for user {user_id} closed: {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await subscription.close()
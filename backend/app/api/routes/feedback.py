@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.api.dependencies import get_current_user_id
 from app.services import user_service, feedback_service
 from app.models.api_schemas import FeedbackCreate, FeedbackResponse
 from typing import List
@@ -9,8 +10,8 @@ router = APIRouter()
 
 @router.post("/submit", response_model=FeedbackResponse)
 async def submit_feedback(
-    user_id: int,
     feedback_data: FeedbackCreate,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """
@@ -39,7 +40,7 @@ async def submit_feedback(
 
 @router.get("/user", response_model=List[FeedbackResponse])
 async def get_user_feedback(
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """
@@ -1,22 +1,26 @@
 # Standard library imports
-from typing import List
+from typing import List, Optional
 
 # Third-party imports
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 # Local imports
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
+from app.core.etag import etag_matches
 from app.api.dependencies import get_current_user_id
-from app.models.api_schemas import ProjectCreate, ProjectUpdate, ProjectResponse, Roadmap, TaskCreate, TaskUpdate, TaskResponse, TasksByType
-from app.services import project_service, task_service, user_service
+from app.api.projections import project_to_dict, task_to_dict, tasks_by_type_to_dict
+from app.models.api_schemas import ProjectCreate, ProjectUpdate, ProjectResponse, Roadmap, Epic, Story, UpdateEpic, StoryUpdate, AppendStoriesRequest, TaskCreate, TaskUpdate, TaskResponse, TasksByType, TaskBulkCreate, TaskBulkUpdate, TaskBulkIds, TaskBulkResponse, ProjectImportResponse
+from app.services import project_service, task_service, user_service, roadmap_service, project_transfer_service
 
 router = APIRouter()
 
 @router.post("/projects", response_model=ProjectResponse)
 async def create_project(
     project: ProjectCreate,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Create a new project for the authenticated user"""
@@ -28,46 +32,14 @@ async def create_project(
         
         tasks_by_type = task_service.get_project_tasks(db, db_project.id)
         
-        tasks_response = TasksByType(
-            daily_todos=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["daily-todos"]],
-            your_ideas=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["your-ideas"]]
-        )
-        
-        return ProjectResponse(
-            id=db_project.id,
-            name=db_project.name,
-            description=db_project.description,
-            status=db_project.status,
-            roadmap_data=None,
-            tasks=tasks_response,
-            created_at=db_project.created_at,
-            updated_at=db_project.updated_at
-        )
+        return project_to_dict(db_project, None, tasks_by_type)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating project: {str(e)}")
 
 @router.get("/projects", response_model=List[ProjectResponse])
 async def get_user_projects(
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get all projects for the authenticated user"""
@@ -76,98 +48,145 @@ async def get_user_projects(
             raise HTTPException(status_code=404, detail="User not found")
         
         projects = project_service.get_user_projects(db, user_id)
+        roadmaps = roadmap_service.get_project_roadmaps(db, projects)
+        tasks = task_service.get_projects_tasks(db, [project.id for project in projects])
         
-        response_projects = []
-        for project in projects:
-            tasks_by_type = task_service.get_project_tasks(db, project.id)
-            
-            tasks_response = TasksByType(
-                daily_todos=[TaskResponse(
-                    id=task.id,
-                    project_id=task.project_id,
-                    text=task.text,
-                    completed=task.completed,
-                    task_type=task.task_type,
-                    created_at=task.created_at,
-                    updated_at=task.updated_at,
-                    archive=task.archive or False,
-                ) for task in tasks_by_type["daily-todos"]],
-                your_ideas=[TaskResponse(
-                    id=task.id,
-                    project_id=task.project_id,
-                    text=task.text,
-                    completed=task.completed,
-                    task_type=task.task_type,
-                    created_at=task.created_at,
-                    updated_at=task.updated_at,
-                    archive=task.archive or False,
-                ) for task in tasks_by_type["your-ideas"]]
-            )
-            
-            response_projects.append(ProjectResponse(
-                id=project.id,
-                name=project.name,
-                description=project.description,
-                status=project.status,
-                roadmap_data=Roadmap(**project.roadmap_data) if project.roadmap_data else None,
-                tasks=tasks_response,
-                created_at=project.created_at,
-                updated_at=project.updated_at
-            ))
-        
-        return response_projects
+        return [
+            project_to_dict(project, roadmaps[project.id], tasks[project.id])
+            for project in projects
+        ]
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching projects: {str(e)}")
 
+# Declared before /projects/{project_id} so "export" is not parsed as a project id
+@router.get("/projects/export")
+async def export_projects(
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream all of the user's projects as NDJSON: one line per project with its roadmap
+    and tasks. The output can be sent back unchanged to /projects/import.
+    """
+    try:
+        if not user_service.user_exists_by_id(db, user_id):
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        def export_stream():
+            # Own session: the stream outlives the request's dependencies
+            export_db = SessionLocal()
+            try:
+                yield from project_transfer_service.export_projects(export_db, user_id)
+            finally:
+                export_db.close()
+        
+        return StreamingResponse(
+            export_stream(),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="projects-{user_id}.ndjson"'}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting projects: {str(e)}")
+
+async def _ndjson_lines(request: Request):
+    """Yield (line number, line) pairs from the request body as it arrives"""
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+@router.post("/projects/import", response_model=ProjectImportResponse)
+async def import_projects(
+    request: Request,
+    response: Response,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Import projects from an NDJSON body (the /projects/export format). The body is read
+    in chunks and committed every few hundred projects (in the threadpool, off the event
+    loop); invalid lines are skipped and reported with their line number. If a chunk
+    cannot be written, the import stops with status 500: `imported` counts the projects
+    already committed and `stopped_at_line` is where to resume.
+    """
+    try:
+        if not user_service.user_exists_by_id(db, user_id):
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        imported, failed, errors = 0, 0, []
+        stopped_at_line = None
+        
+        async def import_batch(batch) -> bool:
+            """False when the chunk could not be written (it is rolled back, earlier ones stay)"""
+            nonlocal imported, failed, stopped_at_line
+            try:
+                result = await run_in_threadpool(project_transfer_service.import_lines, db, user_id, batch)
+            except Exception as e:
+                db.rollback()
+                stopped_at_line = batch[0][0]
+                errors.append({"line": stopped_at_line, "error": f"Import stopped: {str(e)}"})
+                return False
+            imported += result["imported"]
+            failed += len(result["errors"])
+            errors.extend(result["errors"][:project_transfer_service.MAX_ERRORS - len(errors)])
+            return True
+        
+        batch = []
+        async for line in _ndjson_lines(request):
+            batch.append(line)
+            if len(batch) >= project_transfer_service.CHUNK_SIZE:
+                if not await import_batch(batch):
+                    break
+                batch = []
+        if batch and stopped_at_line is None:
+            await import_batch(batch)
+        
+        if stopped_at_line is not None:
+            response.status_code = 500
+        return {"imported": imported, "failed": failed, "errors": errors, "stopped_at_line": stopped_at_line}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing projects: {str(e)}")
+
 @router.get("/projects/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: int,
-    user_id: int,
+    response: Response,
+    user_id: int = Depends(get_current_user_id),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Get a specific project by ID"""
+    """Get a specific project by ID (answers If-None-Match with 304 when unchanged)"""
     try:
+        # Checked before the project row (and its roadmap JSON) is loaded
+        etag = project_service.get_project_etag(db, project_id, user_id)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
         project = project_service.get_project(db, project_id, user_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         
         tasks_by_type = task_service.get_project_tasks(db, project.id)
         
-        tasks_response = TasksByType(
-            daily_todos=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["daily-todos"]],
-            your_ideas=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["your-ideas"]]
-        )
-        
-        return ProjectResponse(
-            id=project.id,
-            name=project.name,
-            description=project.description,
-            status=project.status,
-            roadmap_data=Roadmap(**project.roadmap_data) if project.roadmap_data else None,
-            tasks=tasks_response,
-            created_at=project.created_at,
-            updated_at=project.updated_at
-        )
+        response.headers["ETag"] = etag
+        return project_to_dict(project, roadmap_service.get_project_roadmap(db, project), tasks_by_type)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching project: {str(e)}")
 
@@ -175,58 +194,37 @@ async def get_project(
 async def update_project(
     project_id: int,
     project_update: ProjectUpdate,
-    user_id: int,
+    response: Response,
+    user_id: int = Depends(get_current_user_id),
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Update a project"""
+    """Update a project (If-Match with a stale ETag is rejected with 412)"""
     try:
+        claimed = project_service.claim_if_match(db, project_id, user_id, if_match)
+        if claimed is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if not claimed:
+            raise HTTPException(status_code=412, detail="Project was modified by another request")
+        
         updated_project = project_service.update_project(db, project_id, user_id, project_update)
         if not updated_project:
             raise HTTPException(status_code=404, detail="Project not found")
         
         tasks_by_type = task_service.get_project_tasks(db, updated_project.id)
         
-        tasks_response = TasksByType(
-            daily_todos=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["daily-todos"]],
-            your_ideas=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["your-ideas"]]
-        )
-        
-        return ProjectResponse(
-            id=updated_project.id,
-            name=updated_project.name,
-            description=updated_project.description,
-            status=updated_project.status,
-            roadmap_data=Roadmap(**updated_project.roadmap_data) if updated_project.roadmap_data else None,
-            tasks=tasks_response,
-            created_at=updated_project.created_at,
-            updated_at=updated_project.updated_at
-        )
+        response.headers["ETag"] = project_service.get_project_etag(db, project_id, user_id)
+        return project_to_dict(updated_project, roadmap_service.get_project_roadmap(db, updated_project), tasks_by_type)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating project: {str(e)}")
 
 @router.delete("/projects/{project_id}")
 async def delete_project(
     project_id: int,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Delete a project"""
@@ -244,59 +242,137 @@ async def delete_project(
 async def update_project_roadmap(
     project_id: int,
     roadmap: Roadmap,
-    user_id: int,
+    response: Response,
+    user_id: int = Depends(get_current_user_id),
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Update the roadmap for a project"""
+    """Update the roadmap for a project (If-Match with a stale ETag is rejected with 412)"""
     try:
-        updated_project = project_service.update_project_roadmap(db, project_id, user_id, roadmap)
+        claimed = project_service.claim_if_match(db, project_id, user_id, if_match)
+        if claimed is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if not claimed:
+            raise HTTPException(status_code=412, detail="Project was modified by another request")
+        
+        updated_project, changed = project_service.update_project_roadmap(db, project_id, user_id, roadmap)
         if not updated_project:
             raise HTTPException(status_code=404, detail="Project not found")
+        if not changed:
+            db.rollback()  # Same roadmap: drop the If-Match claim so the ETag stays valid
         
         tasks_by_type = task_service.get_project_tasks(db, updated_project.id)
         
-        tasks_response = TasksByType(
-            daily_todos=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["daily-todos"]],
-            your_ideas=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["your-ideas"]]
-        )
-        
-        return ProjectResponse(
-            id=updated_project.id,
-            name=updated_project.name,
-            description=updated_project.description,
-            status=updated_project.status,
-            roadmap_data=Roadmap(**updated_project.roadmap_data) if updated_project.roadmap_data else None,
-            tasks=tasks_response,
-            created_at=updated_project.created_at,
-            updated_at=updated_project.updated_at
-        )
+        response.headers["ETag"] = project_service.get_project_etag(db, project_id, user_id)
+        return project_to_dict(updated_project, roadmap_service.get_project_roadmap(db, updated_project), tasks_by_type)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating project roadmap: {str(e)}")
 
+@router.patch("/projects/{project_id}/roadmap/stories/{story_id}", response_model=Story)
+async def update_roadmap_story(
+    project_id: int,
+    story_id: int,
+    story_update: StoryUpdate,
+    response: Response,
+    user_id: int = Depends(get_current_user_id),
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Update a single story (e.g. mark it completed) without resending the roadmap"""
+    try:
+        claimed = project_service.claim_if_match(db, project_id, user_id, if_match)
+        if claimed is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if not claimed:
+            raise HTTPException(status_code=412, detail="Project was modified by another request")
+        
+        story = roadmap_service.update_story(db, project_id, story_id, story_update)
+        if not story:
+            raise HTTPException(status_code=404, detail="Story not found")
+        
+        response.headers["ETag"] = project_service.get_project_etag(db, project_id, user_id)
+        return story
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating story: {str(e)}")
+
+@router.patch("/projects/{project_id}/roadmap/epics/{epic_id}", response_model=Epic)
+async def update_roadmap_epic(
+    project_id: int,
+    epic_id: int,
+    epic_update: UpdateEpic,
+    response: Response,
+    user_id: int = Depends(get_current_user_id),
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Update a single epic; stories, if provided, replace only this epic's stories"""
+    try:
+        if epic_update.id != epic_id:
+            raise HTTPException(status_code=400, detail="Epic id in body does not match the URL")
+        
+        claimed = project_service.claim_if_match(db, project_id, user_id, if_match)
+        if claimed is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if not claimed:
+            raise HTTPException(status_code=412, detail="Project was modified by another request")
+        
+        epic = roadmap_service.update_epic(db, project_id, epic_update)
+        if not epic:
+            raise HTTPException(status_code=404, detail="Epic not found")
+        
+        response.headers["ETag"] = project_service.get_project_etag(db, project_id, user_id)
+        return epic
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating epic: {str(e)}")
+
+@router.post("/projects/{project_id}/roadmap/epics/{epic_id}/stories", response_model=Epic)
+async def append_roadmap_stories(
+    project_id: int,
+    epic_id: int,
+    request: AppendStoriesRequest,
+    response: Response,
+    user_id: int = Depends(get_current_user_id),
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Append stories to an epic (If-Match with a stale ETag is rejected with 412)"""
+    try:
+        claimed = project_service.claim_if_match(db, project_id, user_id, if_match)
+        if claimed is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if not claimed:
+            raise HTTPException(status_code=412, detail="Project was modified by another request")
+        
+        epic = roadmap_service.append_stories(db, project_id, epic_id, request.stories)
+        if not epic:
+            raise HTTPException(status_code=404, detail="Epic not found")
+        
+        response.headers["ETag"] = project_service.get_project_etag(db, project_id, user_id)
+        return epic
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error appending stories: {str(e)}")
+
 @router.post("/projects/{project_id}/tasks", response_model=TaskResponse)
 async def create_task(
     project_id: int,
     task: TaskCreate,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Create a new task for a project"""
@@ -309,48 +385,150 @@ async def create_task(
         
         db_task = task_service.create_task(db, task, project_id)
         
-        return TaskResponse(
-            id=db_task.id,
-            project_id=db_task.project_id,
-            text=db_task.text,
-            completed=db_task.completed,
-            task_type=db_task.task_type,
-            created_at=db_task.created_at,
-            updated_at=db_task.updated_at,
-            archive=False,
-        )
+        return task_to_dict(db_task)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating task: {str(e)}")
 
+def _bulk_response(results: list) -> dict:
+    return {"results": [
+        {**result, "task": task_to_dict(result["task"]) if result["task"] is not None else None}
+        for result in results
+    ]}
+
+def _check_bulk_size(count: int) -> None:
+    if count > task_service.BULK_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {task_service.BULK_LIMIT} tasks per request")
+
+@router.post("/projects/{project_id}/tasks/bulk", response_model=TaskBulkResponse)
+async def bulk_create_tasks(
+    project_id: int,
+    request: TaskBulkCreate,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Create many tasks in one transaction"""
+    try:
+        if not project_service.project_exists(db, project_id, user_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        _check_bulk_size(len(request.tasks))
+        
+        results = task_service.bulk_create_tasks(db, project_id, request.tasks)
+        return _bulk_response(results)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating tasks: {str(e)}")
+
+@router.patch("/projects/{project_id}/tasks/bulk", response_model=TaskBulkResponse)
+async def bulk_update_tasks(
+    project_id: int,
+    request: TaskBulkUpdate,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Apply partial updates to many tasks in one transaction"""
+    try:
+        if not project_service.project_exists(db, project_id, user_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        _check_bulk_size(len(request.tasks))
+        
+        results = task_service.bulk_update_tasks(db, project_id, request.tasks)
+        return _bulk_response(results)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating tasks: {str(e)}")
+
+@router.post("/projects/{project_id}/tasks/bulk/complete", response_model=TaskBulkResponse)
+async def bulk_complete_tasks(
+    project_id: int,
+    request: TaskBulkIds,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Mark many tasks completed (or reopen them with completed=false) with one UPDATE"""
+    try:
+        if not project_service.project_exists(db, project_id, user_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        _check_bulk_size(len(request.task_ids))
+        
+        results = task_service.bulk_set_tasks(db, project_id, request.task_ids, {"completed": request.completed})
+        return _bulk_response(results)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error completing tasks: {str(e)}")
+
+@router.post("/projects/{project_id}/tasks/bulk/archive", response_model=TaskBulkResponse)
+async def bulk_archive_tasks(
+    project_id: int,
+    request: TaskBulkIds,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Archive many tasks with one UPDATE"""
+    try:
+        if not project_service.project_exists(db, project_id, user_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        _check_bulk_size(len(request.task_ids))
+        
+        results = task_service.bulk_set_tasks(db, project_id, request.task_ids, {"archive": True})
+        return _bulk_response(results)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error archiving tasks: {str(e)}")
+
+@router.post("/projects/{project_id}/tasks/bulk/delete", response_model=TaskBulkResponse)
+async def bulk_delete_tasks(
+    project_id: int,
+    request: TaskBulkIds,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Delete many tasks with one DELETE"""
+    try:
+        if not project_service.project_exists(db, project_id, user_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        _check_bulk_size(len(request.task_ids))
+        
+        results = task_service.bulk_delete_tasks(db, project_id, request.task_ids)
+        return _bulk_response(results)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting tasks: {str(e)}")
+
+def _raise_task_not_found(db: Session, project_id: int, user_id: int) -> None:
+    # Task writes check ownership in their own query; only a miss needs to say which part is missing
+    if not project_service.project_exists(db, project_id, user_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    raise HTTPException(status_code=404, detail="Task not found")
+
 @router.put("/projects/{project_id}/tasks/{task_id}", response_model=TaskResponse)
 async def update_task(
     project_id: int,
     task_id: int,
     task_update: TaskUpdate,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Update a task"""
     try:
-        if not project_service.project_exists(db, project_id, user_id):
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        updated_task = task_service.update_task(db, task_id, project_id, task_update)
+        updated_task = task_service.update_task(db, task_id, project_id, task_update, user_id=user_id)
         if not updated_task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        return TaskResponse(
-            id=updated_task.id,
-            project_id=updated_task.project_id,
-            text=updated_task.text,
-            completed=updated_task.completed,
-            task_type=updated_task.task_type,
-            created_at=updated_task.created_at,
-            updated_at=updated_task.updated_at,
-            archive=updated_task.archive or False,
-        )
+            _raise_task_not_found(db, project_id, user_id)
+        
+        return task_to_dict(updated_task)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating task: {str(e)}")
 
@@ -358,27 +536,26 @@ async def update_task(
 async def delete_task(
     project_id: int,
     task_id: int,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Delete a task"""
     try:
-        if not project_service.project_exists(db, project_id, user_id):
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        success = task_service.delete_task(db, task_id, project_id)
+        success = task_service.delete_task(db, task_id, project_id, user_id=user_id)
         if not success:
-            raise HTTPException(status_code=404, detail="Task not found")
+            _raise_task_not_found(db, project_id, user_id)
         
         return {"message": f"Task {task_id} deleted successfully"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting task: {str(e)}")
 
 @router.get("/projects/{project_id}/tasks", response_model=TasksByType)
 async def get_project_tasks(
     project_id: int,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get all tasks for a project"""
@@ -388,28 +565,7 @@ async def get_project_tasks(
         
         tasks_by_type = task_service.get_project_tasks(db, project_id)
         
-        return TasksByType(
-            daily_todos=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["daily-todos"]],
-            your_ideas=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in tasks_by_type["your-ideas"]]
-        )
+        return tasks_by_type_to_dict(tasks_by_type)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching tasks: {str(e)}")
@@ -418,25 +574,24 @@ async def get_project_tasks(
 async def archive_task(
     project_id: int,
     task_id: int,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Archive a task"""
     try:
-        if not project_service.project_exists(db, project_id, user_id):
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        success = task_service.archive_task(db, task_id, project_id)
+        success = task_service.archive_task(db, task_id, project_id, user_id=user_id)
         if not success:
-            raise HTTPException(status_code=404, detail="Task not found")
+            _raise_task_not_found(db, project_id, user_id)
         return {"message": f"Task {task_id} archived successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error archiving task: {str(e)}")
     
 @router.get("/projects/{project_id}/tasks/archived")
 async def get_archived_tasks(
     project_id: int,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get archived tasks for a project""" 
@@ -451,27 +606,6 @@ async def get_archived_tasks(
             "your-ideas": [task for task in all_tasks["your-ideas"] if task.archive]
         }
 
-        return TasksByType(
-            daily_todos=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in archived_tasks["daily-todos"]],
-            your_ideas=[TaskResponse(
-                id=task.id,
-                project_id=task.project_id,
-                text=task.text,
-                completed=task.completed,
-                task_type=task.task_type,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                archive=task.archive or False,
-            ) for task in archived_tasks["your-ideas"]]
-        )
+        return tasks_by_type_to_dict(archived_tasks)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching archived tasks: {str(e)}")
\ No newline at end of file
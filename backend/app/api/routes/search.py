@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.database import get_db
+from app.api.dependencies import get_current_user_id
+from app.models.api_schemas import SearchResponse
+from app.services import search_service, user_service
+from app.services.search_service import SearchUnavailableError
+
+router = APIRouter()
+
+@router.get("/search", response_model=SearchResponse)
+async def search(
+    user_id: int = Depends(get_current_user_id),
+    q: str = Query(..., min_length=1, max_length=200),
+    kinds: Optional[List[str]] = Query(None, description="Limit to project, epic, story, task and/or message"),
+    project_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Search the user's projects, epics, stories (with acceptance criteria), tasks and
+    chat messages. Every word (of two or more letters) must match as the start of a
+    word, ignoring case and accents, so the endpoint can back a type-ahead search box.
+    """
+    try:
+        if not user_service.user_exists_by_id(db, user_id):
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        unknown = set(kinds or []) - set(search_service.KINDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(sorted(unknown))}")
+        
+        results = search_service.search(db, user_id, q, kinds=kinds, project_id=project_id, limit=limit)
+        return {"query": q, "results": results}
+        
+    except HTTPException:
+        raise
+    except SearchUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+from app.core.database import get_db
+from app.api.dependencies import get_current_user_id
+from app.api.projections import project_to_dict, task_to_dict, roadmap_to_dict, conversation_to_dict, tombstone_to_dict
+from app.models.api_schemas import SyncResponse
+from app.services import sync_service, user_service
+
+router = APIRouter()
+
+@router.get("/sync", response_model=SyncResponse)
+async def sync_changes(
+    user_id: int = Depends(get_current_user_id),
+    since: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Projects, tasks, roadmaps and conversations created, updated or deleted since the
+    cursor returned by the previous call. Omit `since` for a full load.
+    """
+    try:
+        if not user_service.user_exists_by_id(db, user_id):
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        # Cursors are naive UTC like the updated_at columns
+        if since is not None and since.tzinfo is not None:
+            since = since.replace(tzinfo=None) - since.utcoffset()
+        
+        changes = sync_service.get_changes(db, user_id, since)
+        
+        return {
+            "cursor": changes["cursor"],
+            "full": changes["full"],
+            "projects": [
+                project_to_dict(project, changes["project_roadmaps"][project.id], None)
+                for project in changes["projects"]
+            ],
+            "tasks": [task_to_dict(task) for task in changes["tasks"]],
+            "roadmaps": [
+                roadmap_to_dict(roadmap, changes["roadmap_contents"][roadmap.id])
+                for roadmap in changes["roadmaps"]
+            ],
+            "conversations": [conversation_to_dict(conversation) for conversation in changes["conversations"]],
+            "deleted": [tombstone_to_dict(tombstone) for tombstone in changes["deleted"]]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error syncing changes: {str(e)}")
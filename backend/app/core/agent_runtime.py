@@ -0,0 +1,100 @@
+"""
+Google ADK and the agent graph, loaded on first use instead of at import.
+
+Importing google.adk / google.genai and app.agents.agent (which builds every agent)
+and opening the ADK DatabaseSessionService takes seconds, and only the
+/api/agent/conversate and /api/agent/roadmap routes need them. The agent routes get
+them with `stack = await agent_runtime.get()`, so the app starts and answers
+/health without them.
+
+get() loads the stack in a worker thread, so the event loop keeps serving other
+requests during the first load. With AGENT_WARM_ON_STARTUP the startup event calls
+warm(), which starts that load in the background once the server is up; the first
+agent request then usually finds it ready. A failed load (e.g. the google-adk
+package missing) is logged and retried by the next get().
+
+scripts/benchmark_startup.py measures the import time of app.main and fails if the
+agent stack is imported eagerly again.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Modules that must not be imported by `import app.main` (checked by benchmark_startup.py)
+LAZY_MODULES = ("google.adk", "google.genai", "app.agents.agent")
+
+class AgentStack(NamedTuple):
+    Runner: Any
+    Content: Any
+    Part: Any
+    session_service: Any  # ADK DatabaseSessionService, shared by all requests
+    roadmap_agent: Any
+    conversation_agent: Any
+
+class AgentRuntime:
+    """Loads the AgentStack once per process, on first use or in the background"""
+
+    def __init__(self):
+        self._stack: Optional[AgentStack] = None
+        self._lock = threading.Lock()
+        self._warm_task: Optional[asyncio.Task] = None
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._stack is not None
+
+    async def get(self) -> AgentStack:
+        """The agent stack, loading it (off the event loop) if needed"""
+        if self._stack is None:
+            return await asyncio.to_thread(self._load)
+        return self._stack
+
+    def warm(self) -> None:
+        """Start loading in the background; call from a running event loop"""
+        if self._stack is None and self._warm_task is None:
+            self._warm_task = asyncio.get_running_loop().create_task(self._warm())
+
+    async def _warm(self) -> None:
+        try:
+            await self.get()
+            logger.info(f"Agent stack loaded in the background in {self.load_seconds:.2f}s")
+        except Exception as e:
+            logger.warning(f"Could not preload the agent stack, will retry on first use: {e}")
+        finally:
+            self._warm_task = None
+
+    def _load(self) -> AgentStack:
+        with self._lock:  # Concurrent first requests load once
+            if self._stack is not None:
+                return self._stack
+            started = time.perf_counter()
+
+            # The agents read the key from the environment when they are built
+            os.environ["GOOGLE_API_KEY"] = settings.GOOGLE_API_KEY
+            from google.adk.sessions import DatabaseSessionService
+            from google.adk.runners import Runner
+            from google.genai.types import Content, Part
+            from app.agents.agent import project_roadmap_orchestrator, conversation_agent
+
+            self._stack = AgentStack(
+                Runner=Runner,
+                Content=Content,
+                Part=Part,
+                # Database sessions persist across restarts and are shared by all workers
+                session_service=DatabaseSessionService(db_url=settings.DATABASE_URL),
+                roadmap_agent=project_roadmap_orchestrator,
+                conversation_agent=conversation_agent
+            )
+            self.load_seconds = time.perf_counter() - started
+            return self._stack
+
+agent_runtime = AgentRuntime()
@@ -0,0 +1,150 @@
+"""
+Transparent compression for large JSON/Text columns.
+
+Values are stored as `MAGIC + codec + dictionary id + compressed bytes`. Anything
+without the magic prefix is read as plain JSON/text, so rows written before
+compression was enabled keep working and can be rewritten lazily or with
+scripts/compress_columns.py. The columns are binary; on Postgres, startup converts
+json/text columns of older databases (app.core.migrations.COMPRESSED_COLUMNS).
+
+Codecs: zlib (always available) and zstd (if the optional `zstandard` package is
+installed). Both can use a shared dictionary trained on existing roadmaps, which
+helps a lot for small values that share the same keys and phrasing.
+"""
+
+import logging
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, List, Optional
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+from app.core.config import settings
+from app.core.serialization import json_dumps, json_loads
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"\x1fRC"
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+HEADER_SIZE = len(MAGIC) + 1 + 4  # magic + codec + crc32 of the dictionary (0 = none)
+
+class CompressionCodec:
+    """Encodes/decodes column payloads using the configured algorithm and dictionary"""
+
+    def __init__(self, algorithm: str = "zlib", level: int = 6, min_size: int = 256, dictionary: Optional[bytes] = None):
+        if algorithm == "zstd" and zstandard is None:
+            logger.warning("STORAGE_COMPRESSION=zstd but zstandard is not installed; falling back to zlib")
+            algorithm = "zlib"
+        self.algorithm = algorithm
+        self.level = level
+        self.min_size = min_size
+        self.dictionary = dictionary
+        self.dictionary_id = zlib.crc32(dictionary) if dictionary else 0
+
+        if algorithm == "zstd":
+            zstd_dict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            self._zstd_compressor = zstandard.ZstdCompressor(level=level, dict_data=zstd_dict)
+            self._zstd_decompressor = zstandard.ZstdDecompressor(dict_data=zstd_dict)
+
+    def encode(self, raw: bytes) -> bytes:
+        """Compress raw bytes; small values and algorithm 'none' are stored as-is"""
+        if self.algorithm == "none" or len(raw) < self.min_size:
+            return raw
+
+        if self.algorithm == "zstd":
+            codec, body = CODEC_ZSTD, self._zstd_compressor.compress(raw)
+        else:
+            compressor = zlib.compressobj(self.level, zdict=self.dictionary) if self.dictionary else zlib.compressobj(self.level)
+            codec, body = CODEC_ZLIB, compressor.compress(raw) + compressor.flush()
+
+        return MAGIC + codec + struct.pack(">I", self.dictionary_id) + body
+
+    def decode(self, stored: Any) -> Optional[str]:
+        """Return the stored value as text, decompressing it if needed"""
+        if stored is None:
+            return None
+        if isinstance(stored, str):
+            return stored
+        stored = bytes(stored)
+        if not is_compressed(stored):
+            return stored.decode("utf-8")
+
+        codec = stored[len(MAGIC):len(MAGIC) + 1]
+        (dictionary_id,) = struct.unpack(">I", stored[len(MAGIC) + 1:HEADER_SIZE])
+        body = stored[HEADER_SIZE:]
+        if dictionary_id and dictionary_id != self.dictionary_id:
+            raise ValueError("Value was compressed with a different dictionary than the one configured")
+
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("Value is zstd-compressed but zstandard is not installed")
+            if dictionary_id:
+                return self._zstd_decompressor.decompress(body).decode("utf-8")
+            return zstandard.ZstdDecompressor().decompress(body).decode("utf-8")
+
+        decompressor = zlib.decompressobj(zdict=self.dictionary) if dictionary_id else zlib.decompressobj()
+        return (decompressor.decompress(body) + decompressor.flush()).decode("utf-8")
+
+def is_compressed(value: Any) -> bool:
+    """Check whether a raw column value carries the compression header"""
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:len(MAGIC)]) == MAGIC
+
+def train_dictionary(samples: List[bytes], size: int = 32 * 1024) -> bytes:
+    """
+    Build a shared dictionary from sample values. zstd has a real trainer; for zlib the
+    dictionary is simply the most recent sample content, which zlib matches against best.
+    """
+    if zstandard is not None and settings.STORAGE_COMPRESSION == "zstd":
+        return zstandard.train_dictionary(size, samples).as_bytes()
+    return b"".join(samples)[-size:]
+
+def _load_dictionary() -> Optional[bytes]:
+    path = settings.STORAGE_COMPRESSION_DICTIONARY
+    if not path:
+        return None
+    try:
+        return Path(path).read_bytes()
+    except OSError as e:
+        logger.warning(f"Could not read compression dictionary {path}: {e}")
+        return None
+
+codec = CompressionCodec(
+    algorithm=settings.STORAGE_COMPRESSION,
+    level=settings.STORAGE_COMPRESSION_LEVEL,
+    min_size=settings.STORAGE_COMPRESSION_MIN_BYTES,
+    dictionary=_load_dictionary()
+)
+
+class CompressedJSON(TypeDecorator):
+    """JSON column stored as (optionally) compressed bytes"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return codec.encode(json_dumps(value).encode("utf-8"))
+
+    def process_result_value(self, value, dialect):
+        text = codec.decode(value)
+        return json_loads(text) if text is not None else None
+
+class CompressedText(TypeDecorator):
+    """Text column stored as (optionally) compressed bytes"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return codec.encode(value.encode("utf-8"))
+
+    def process_result_value(self, value, dialect):
+        return codec.decode(value)
@@ -31,9 +31,91 @@ class Settings(BaseSettings):
 
     # Google Gemini API (for Google ADK agent)
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
+    # Load Google ADK and the agents in the background after startup instead of on the first agent request
+    AGENT_WARM_ON_STARTUP: bool = True
+
+    # Concurrent LLM calls per worker (queued fairly across users beyond that); calls
+    # waiting longer than the timeout fail with 503
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_QUEUE_TIMEOUT_SECONDS: int = 120
+
+    # Retries of provider calls on 429/5xx/timeouts: exponential backoff with jitter (or the
+    # provider's Retry-After), at most LLM_RETRY_ATTEMPTS attempts within the deadline
+    LLM_RETRY_ATTEMPTS: int = 4
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 20.0
+    LLM_RETRY_DEADLINE_SECONDS: float = 180.0
+
+    # Storage compression for large JSON/Text columns ("zlib", "zstd" or "none")
+    STORAGE_COMPRESSION: str = "zlib"
+    STORAGE_COMPRESSION_LEVEL: int = 6
+    STORAGE_COMPRESSION_MIN_BYTES: int = 256  # Smaller values are stored uncompressed
+    STORAGE_COMPRESSION_DICTIONARY: str = ""  # Optional path to a shared dictionary file
+
+    # Use orjson for API responses and JSON columns (requires the orjson package)
+    FAST_JSON: bool = False
+
+    # Delta sync: tombstones older than this are purged and older cursors get a full resync
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # Push events for connected clients: "memory" (single worker) or "redis" (needs the redis package)
+    EVENT_BACKEND: str = "memory"
+    EVENT_REDIS_URL: str = "redis://localhost:6379/0"
+    EVENT_REDIS_TIMEOUT_SECONDS: float = 2.0  # Connect and socket timeout of the Redis calls
+
+    # Admin analytics: totals and daily series are rebuilt in the background this often (0 = only on demand)
+    ANALYTICS_REFRESH_SECONDS: int = 300
+
+    # Database backups (POST /api/admin/backup). The first destination receives the backup,
+    # the others get copies (e.g. a mounted network drive); each keeps BACKUP_RETENTION files
+    BACKUP_DESTINATIONS: List[str] = ["./backups"]
+    BACKUP_COMPRESSION: str = "gzip"  # "gzip" or "none"
+    BACKUP_RETENTION: int = 7
+    BACKUP_PAGES_PER_STEP: int = 1024  # SQLite pages copied per step; writers can run between steps
+
+    # Continuous SQLite backup: ship new WAL frames to <first destination>/wal every interval.
+    # Each generation starts from a snapshot; BACKUP_RETENTION generations are kept
+    BACKUP_WAL_SHIPPING: bool = False
+    BACKUP_WAL_INTERVAL_SECONDS: int = 10
+    BACKUP_WAL_CHECKPOINT_BYTES: int = 16 * 1024 * 1024  # Checkpoint once the WAL is this large
+    # Safety net: app connections checkpoint at this size themselves if the shipper is not
+    # keeping up (stopped, or failing); the shipper then starts a new generation
+    BACKUP_WAL_SAFETY_CHECKPOINT_BYTES: int = 256 * 1024 * 1024
+    BACKUP_WAL_GENERATION_HOURS: int = 24
+
+    # Users and project owners confirmed by a query are trusted for this long without
+    # asking the database again (per worker; 0 = only within a request)
+    IDENTITY_CACHE_TTL_SECONDS: int = 30
+
+    # Rate limits per user (token bucket per class: refill per minute, burst capacity).
+    # "memory" keeps buckets per worker; "redis" shares them (needs the redis package)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_LLM_PER_MINUTE: int = 6  # /api/agent/conversate and /api/agent/roadmap
+    RATE_LIMIT_LLM_BURST: int = 5
+    RATE_LIMIT_WRITE_PER_MINUTE: int = 120
+    RATE_LIMIT_WRITE_BURST: int = 60
+    RATE_LIMIT_READ_PER_MINUTE: int = 600
+    RATE_LIMIT_READ_BURST: int = 120
 
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
+    SECRET_KEY_PREVIOUS: List[str] = []  # Still accepted for tokens while rotating SECRET_KEY
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 12 * 60
+    # Startup refuses the default SECRET_KEY (anyone could sign superuser tokens with it)
+    # unless this is set, for local development only
+    ALLOW_DEFAULT_SECRET_KEY: bool = False
+    # Development shortcuts: accept ?user_id= from clients that send no token, and logins
+    # without a password. Never in production; never allowed with the default SECRET_KEY
+    AUTH_ALLOW_USER_ID_PARAM: bool = False
+
+    # Password hashing (scrypt): N = 2**LOG_N, memory per hash = 128 * R * N bytes (16 MiB).
+    # Raising the cost rehashes each user's password at their next login
+    PASSWORD_SCRYPT_LOG_N: int = 14
+    PASSWORD_SCRYPT_R: int = 8
+    PASSWORD_SCRYPT_P: int = 1
+    PASSWORD_HASH_WORKERS: int = min(4, os.cpu_count() or 1)  # Hashes in parallel; more logins wait in line
     
     # Conversation Settings
     MAX_CONVERSATION_TURNS: int = 50
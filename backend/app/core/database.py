@@ -1,17 +1,33 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.serialization import json_dumps, json_loads
 
 # Import all database models to ensure they are registered with SQLAlchemy
-from app.models.database import Base, User, Project, Task, Conversation, Message, Roadmap, Feedback
+from app.models.database import Base, User, Project, Task, Conversation, Message, Roadmap, Feedback, Epic, Story, RoadmapVersion, Tombstone, AnalyticsDaily, AnalyticsTotal
 
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False},  # Needed for SQLite
-    echo=settings.DEBUG  # Log SQL queries in debug mode
+    echo=settings.DEBUG,  # Log SQL queries in debug mode
+    json_serializer=json_dumps,  # orjson when FAST_JSON is enabled
+    json_deserializer=json_loads
 )
 
+if settings.BACKUP_WAL_SHIPPING and engine.url.get_backend_name() == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_wal(dbapi_connection, connection_record):
+        # WAL shipping copies frames before they are checkpointed, so checkpoints are
+        # left to the shipper (WalShippingService) instead of happening on commit. The
+        # large autocheckpoint is a safety net: while the shipper pins the WAL it cannot
+        # restart it, and if the shipper stops or keeps failing the WAL still stays bounded
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+        cursor.execute(f"PRAGMA wal_autocheckpoint={max(1, settings.BACKUP_WAL_SAFETY_CHECKPOINT_BYTES // page_size)}")
+        cursor.close()
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,33 @@
+"""
+ETag helpers for conditional requests.
+
+ETags are built from cheap version columns (updated_at, content hashes, row counts)
+so a route can answer If-None-Match with 304, or reject a stale If-Match with 412,
+without loading or decompressing the roadmap JSON.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+def make_etag(*parts: Any) -> str:
+    """Quoted ETag from the given version fields"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def _header_tags(header: str) -> list:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """If-None-Match check (weak comparison): True means the client copy is current"""
+    if not if_none_match or not etag:
+        return False
+    tags = _header_tags(if_none_match)
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+def precondition_failed(if_match: Optional[str], etag: Optional[str]) -> bool:
+    """If-Match check (strong comparison): True means the write must be rejected with 412"""
+    # A missing resource is reported as 404 by the route, not as a failed precondition
+    if not if_match or not etag:
+        return False
+    tags = _header_tags(if_match)
+    return "*" not in tags and etag not in tags
@@ -0,0 +1,212 @@
+"""
+Change events pushed to connected clients.
+
+Services call `event_bus.emit(db, user_id, "task.updated", ...)` while they write.
+Events are held on the session and only published once the transaction commits,
+so listeners never hear about changes that were rolled back. They are small
+notifications (type + ids); clients fetch the data itself through /api/sync.
+
+Backends:
+- "memory" (default): in-process queues. Works for a single worker and is the
+  stand-in for Redis in development and tests, with the same interface.
+- "redis": Redis pub/sub (optional `redis` package), for multiple workers.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.serialization import json_dumps
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:  # Optional dependency
+    redis = None
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+PENDING_EVENTS_KEY = "pending_events"
+
+class Subscription(ABC):
+    """A listener on one channel; get() waits for the next message"""
+
+    @abstractmethod
+    async def get(self) -> str:
+        ...
+
+    @abstractmethod
+    async def close(self) -> None:
+        ...
+
+class MemorySubscription(Subscription):
+    def __init__(self, backend: "MemoryBackend", channel: str, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self._backend = backend
+        self._channel = channel
+        self.queue = queue
+        self.loop = loop
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+    async def close(self) -> None:
+        self._backend.unsubscribe(self._channel, self)
+
+class MemoryBackend:
+    """In-process pub/sub; publish() is thread-safe and never blocks"""
+
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(self._offer, subscription.queue, message)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        subscription = MemorySubscription(self, channel, asyncio.Queue(self.QUEUE_SIZE), asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel: str, subscription: MemorySubscription) -> None:
+        with self._lock:
+            self._subscribers[channel].discard(subscription)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: str) -> None:
+        # A client that stops reading loses events rather than growing memory;
+        # the next /api/sync call catches it up
+        if not queue.full():
+            queue.put_nowait(message)
+
+class RedisSubscription(Subscription):
+    def __init__(self, client, pubsub):
+        self._client = client
+        self._pubsub = pubsub
+
+    async def get(self) -> str:
+        while True:
+            message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            if message and message["type"] == "message":
+                data = message["data"]
+                return data.decode("utf-8") if isinstance(data, bytes) else data
+
+    async def close(self) -> None:
+        await self._pubsub.close()
+        await self._client.close()
+
+class RedisBackend:
+    """
+    Redis pub/sub so events reach clients connected to any worker. publish() runs in
+    the after_commit hook, often on the event loop, so it only queues the message and
+    a background thread sends it. While Redis is slow or down the queue fills up and
+    further events are dropped; clients catch up through /api/sync.
+    """
+
+    QUEUE_SIZE = 10_000
+
+    def __init__(self, url: str, timeout_seconds: float):
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=timeout_seconds, socket_connect_timeout=timeout_seconds
+        )
+        self._queue: "queue.Queue[tuple]" = queue.Queue(self.QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: str) -> None:
+        self._start_publisher()
+        try:
+            self._queue.put_nowait((channel, message))
+        except queue.Full:
+            raise RuntimeError("the Redis publish queue is full") from None
+
+    async def subscribe(self, channel: str) -> Subscription:
+        # No socket_timeout: a subscription legitimately waits for a long time
+        client = aioredis.from_url(self.url, socket_connect_timeout=self.timeout_seconds)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        return RedisSubscription(client, pubsub)
+
+    def _start_publisher(self) -> None:
+        # Started on first use rather than at import, so each worker process gets its own
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_publisher, name="event-publisher", daemon=True)
+                self._thread.start()
+
+    def _run_publisher(self) -> None:
+        while True:
+            channel, message = self._queue.get()
+            try:
+                self._client.publish(channel, message)
+            except Exception as e:
+                logger.warning(f"Could not publish event to Redis: {e}")
+
+class EventBus:
+    """Per-user change events on top of a pub/sub backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def emit(self, db: Session, user_id: Optional[int], event_type: str, **data) -> None:
+        """Queue an event on the session; it is published when the session commits"""
+        if user_id is None:
+            return
+        db.info.setdefault(PENDING_EVENTS_KEY, []).append((user_id, event_type, data))
+
+    def publish(self, user_id: int, event_type: str, data: dict) -> None:
+        """Publish immediately; backend errors are logged, never raised into the request"""
+        message = json_dumps({"type": event_type, "data": data, "at": datetime.utcnow().isoformat()})
+        try:
+            self.backend.publish(self.channel(user_id), message)
+        except Exception as e:
+            logger.warning(f"Could not publish {event_type} event: {e}")
+
+    async def subscribe(self, user_id: int) -> Subscription:
+        return await self.backend.subscribe(self.channel(user_id))
+
+    @staticmethod
+    def channel(user_id: int) -> str:
+        return f"user:{user_id}"
+
+def _create_backend():
+    if settings.EVENT_BACKEND == "redis":
+        if redis is None:
+            logger.warning("EVENT_BACKEND=redis but the redis package is not installed; using in-memory events")
+        else:
+            return RedisBackend(settings.EVENT_REDIS_URL, settings.EVENT_REDIS_TIMEOUT_SECONDS)
+    return MemoryBackend()
+
+event_bus = EventBus(_create_backend())
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session) -> None:
+    for user_id, event_type, data in session.info.pop(PENDING_EVENTS_KEY, []):
+        event_bus.publish(user_id, event_type, data)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_events(session: Session, previous_transaction) -> None:
+    # Also fires when nothing was flushed yet; keep events if only a savepoint rolled back
+    if not session.in_transaction():
+        session.info.pop(PENDING_EVENTS_KEY, None)
@@ -0,0 +1,140 @@
+"""
+Cache for the "does this user exist (and are they a superuser) / does this user own
+this project" checks that start almost every request.
+
+Two layers:
+- request: kept on the session (`db.info`), so repeated checks within one request
+  are free even when the process layer is disabled.
+- process: a short-TTL dict shared by all requests of this worker
+  (IDENTITY_CACHE_TTL_SECONDS, 0 disables it).
+
+Only positive answers are cached, so a user or project created on another worker
+is visible immediately. Services call forget_user()/forget_project() when they
+delete (or deactivate) something: the entry is dropped at once and again after
+the commit, so a concurrent request cannot re-cache the row in between. Other
+workers notice within the TTL.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+REQUEST_CACHE_KEY = "identity_cache"
+PENDING_FORGET_KEY = "identity_cache_forget"
+
+class IdentityCache:
+    """Known users and project owners, per session and per process"""
+
+    MAX_ENTRIES = 50_000  # Per kind; expired entries are swept when this is reached
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._users: Dict[int, Tuple[bool, float]] = {}  # user_id -> (is superuser, expires at)
+        self._projects: Dict[int, Tuple[int, float]] = {}  # project_id -> (owner id, expires at)
+        self._lock = threading.Lock()
+
+    def has_user(self, db: Session, user_id: int) -> bool:
+        """True when the user is known to exist (False means "ask the database")"""
+        return self.is_superuser(db, user_id) is not None
+
+    def is_superuser(self, db: Session, user_id: int) -> Optional[bool]:
+        """Superuser flag of a known user (None means "ask the database")"""
+        scope = self._scope(db)
+        if ("user", user_id) in scope:
+            return scope[("user", user_id)]
+        with self._lock:
+            entry = self._users.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        scope[("user", user_id)] = entry[0]
+        return entry[0]
+
+    def remember_user(self, db: Session, user_id: int, is_superuser: bool) -> None:
+        self._scope(db)[("user", user_id)] = is_superuser
+        if self.ttl_seconds > 0:
+            with self._lock:
+                self._sweep(self._users, lambda entry: entry[1])
+                self._users[user_id] = (is_superuser, time.monotonic() + self.ttl_seconds)
+
+    def project_owner(self, db: Session, project_id: int) -> Optional[int]:
+        """Owner of the project if known (None means "ask the database")"""
+        scope = self._scope(db)
+        owner_id = scope.get(("project", project_id))
+        if owner_id is not None:
+            return owner_id
+        with self._lock:
+            entry = self._projects.get(project_id)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        scope[("project", project_id)] = entry[0]
+        return entry[0]
+
+    def remember_project(self, db: Session, project_id: int, owner_id: int) -> None:
+        self._scope(db)[("project", project_id)] = owner_id
+        if self.ttl_seconds > 0:
+            with self._lock:
+                self._sweep(self._projects, lambda entry: entry[1])
+                self._projects[project_id] = (owner_id, time.monotonic() + self.ttl_seconds)
+
+    def forget_user(self, db: Session, user_id: int) -> None:
+        """Drop a user and their projects now and again once the transaction commits"""
+        db.info.setdefault(PENDING_FORGET_KEY, []).append(("user", user_id))
+        self._forget(db, "user", user_id)
+
+    def forget_project(self, db: Session, project_id: int) -> None:
+        """Drop a project now and again once the transaction commits"""
+        db.info.setdefault(PENDING_FORGET_KEY, []).append(("project", project_id))
+        self._forget(db, "project", project_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+            self._projects.clear()
+
+    def _forget(self, db: Optional[Session], kind: str, key: int) -> None:
+        if db is not None:
+            scope = self._scope(db)
+            scope.pop((kind, key), None)
+            if kind == "user":
+                for entry in [entry for entry, owner_id in scope.items() if entry[0] == "project" and owner_id == key]:
+                    del scope[entry]
+        with self._lock:
+            if kind == "user":
+                self._users.pop(key, None)
+                for project_id in [project_id for project_id, entry in self._projects.items() if entry[0] == key]:
+                    del self._projects[project_id]
+            else:
+                self._projects.pop(key, None)
+
+    def _sweep(self, entries: dict, expires_at) -> None:
+        """Keep the cache bounded (caller holds the lock)"""
+        if len(entries) < self.MAX_ENTRIES:
+            return
+        now = time.monotonic()
+        for key in [key for key, value in entries.items() if expires_at(value) < now]:
+            del entries[key]
+        if len(entries) >= self.MAX_ENTRIES:
+            entries.clear()
+
+    @staticmethod
+    def _scope(db: Session) -> dict:
+        return db.info.setdefault(REQUEST_CACHE_KEY, {})
+
+identity_cache = IdentityCache(settings.IDENTITY_CACHE_TTL_SECONDS)
+
+@event.listens_for(Session, "after_commit")
+def _forget_committed(session: Session) -> None:
+    for kind, key in session.info.pop(PENDING_FORGET_KEY, []):
+        identity_cache._forget(session, kind, key)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back(session: Session, previous_transaction) -> None:
+    # A rolled-back delete leaves the rows in place; they are simply looked up again
+    if not session.in_transaction():
+        session.info.pop(PENDING_FORGET_KEY, None)
+        session.info.pop(REQUEST_CACHE_KEY, None)
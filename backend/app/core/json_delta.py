@@ -0,0 +1,89 @@
+"""
+Minimal structural diff/patch for JSON documents.
+
+A delta is a small dict describing how to turn document `a` into document `b`:
+    {"v": value}                       replace the whole value
+    {"d": {key: delta}, "r": [keys]}   recurse into changed dict keys, remove keys
+    {"l": {index: delta}, "n": length, "a": [items]}
+                                       recurse into list items, truncate to `n`,
+                                       append `a`
+Deltas only contain JSON types, so they can be stored with canonical_json.
+"""
+
+import copy
+from typing import Any, Optional
+
+def json_equal(a: Any, b: Any) -> bool:
+    """
+    Equality of JSON values including their types: Python's == treats True, 1 and 1.0
+    as equal, which would lose a change from one to another
+    """
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(json_equal(value, b[key]) for key, value in a.items())
+    if isinstance(a, list):
+        return len(a) == len(b) and all(json_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+def diff_json(a: Any, b: Any) -> Optional[dict]:
+    """Return a delta turning a into b, or None if they are equal (types included)"""
+    if json_equal(a, b):
+        return None
+
+    if isinstance(a, dict) and isinstance(b, dict):
+        changed = {}
+        for key, value in b.items():
+            if key not in a:
+                changed[key] = {"v": value}
+            else:
+                sub_delta = diff_json(a[key], value)
+                if sub_delta is not None:
+                    changed[key] = sub_delta
+        delta = {}
+        if changed:
+            delta["d"] = changed
+        removed = [key for key in a if key not in b]
+        if removed:
+            delta["r"] = removed
+        return delta
+
+    if isinstance(a, list) and isinstance(b, list):
+        common = min(len(a), len(b))
+        changed = {}
+        for index in range(common):
+            sub_delta = diff_json(a[index], b[index])
+            if sub_delta is not None:
+                changed[str(index)] = sub_delta
+        delta = {}
+        if changed:
+            delta["l"] = changed
+        if len(b) < len(a):
+            delta["n"] = len(b)
+        if len(b) > len(a):
+            delta["a"] = b[common:]
+        return delta
+
+    return {"v": b}
+
+def apply_json_delta(a: Any, delta: Optional[dict]) -> Any:
+    """Apply a delta produced by diff_json; the input document is not modified"""
+    if delta is None:
+        return copy.deepcopy(a)
+    if "v" in delta:
+        return copy.deepcopy(delta["v"])
+
+    if isinstance(a, dict):
+        result = {key: value for key, value in a.items() if key not in delta.get("r", [])}
+        for key, sub_delta in delta.get("d", {}).items():
+            result[key] = apply_json_delta(result.get(key), sub_delta)
+        return result
+
+    result = list(a)
+    for index, sub_delta in delta.get("l", {}).items():
+        result[int(index)] = apply_json_delta(result[int(index)], sub_delta)
+    if "n" in delta:
+        result = result[:delta["n"]]
+    if "a" in delta:
+        result.extend(copy.deepcopy(delta["a"]))
+    return result
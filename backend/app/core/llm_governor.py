@@ -0,0 +1,123 @@
+"""
+Process-wide limit on concurrent language-model calls, shared fairly between users.
+
+Every provider call (the ADK runners in the agent routes, and the Groq/OpenAI calls
+of AgentOrchestrator and RoadmapGenerationHandler) runs inside
+`async with llm_governor.slot(user_id):`. At most LLM_MAX_CONCURRENCY calls run at
+once; a burst beyond that waits instead of hitting provider rate limits and failing
+for everyone.
+
+Waiting calls are queued per user and slots are handed out round robin across
+users, so one user starting ten roadmap generations waits behind their own calls,
+not in front of everyone else's. A call that waits longer than
+LLM_QUEUE_TIMEOUT_SECONDS raises LlmBusyError (routes answer 503).
+
+The limit is per worker process. stats() reports capacity, running calls, queue
+depth and recent wait times (GET /api/admin/llm) for tuning it.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional, Tuple
+
+from app.core.config import settings
+
+class LlmBusyError(RuntimeError):
+    """Raised when a call waited too long for a free LLM slot"""
+
+class LlmGovernor:
+    """Semaphore with per-user FIFO queues served round robin"""
+
+    WAIT_SAMPLES = 1000  # Recent wait times kept for stats()
+
+    def __init__(self, capacity: int, queue_timeout_seconds: float):
+        self.capacity = capacity
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._active = 0
+        # user -> waiting (future, enqueued at); the first user is served next
+        self._queues: "OrderedDict[str, Deque[Tuple[asyncio.Future, float]]]" = OrderedDict()
+        self._waits: Deque[float] = deque(maxlen=self.WAIT_SAMPLES)
+        self._granted = 0
+        self._timed_out = 0
+
+    @asynccontextmanager
+    async def slot(self, user_id: Optional[object] = None):
+        """Hold one of the LLM slots for the duration of the block"""
+        await self.acquire(user_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, user_id: Optional[object] = None) -> None:
+        if self._active < self.capacity and not self._queues:
+            self._active += 1
+            self._record_wait(0.0)
+            return
+
+        key = str(user_id) if user_id is not None else "anonymous"
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append((future, time.monotonic()))
+        try:
+            await asyncio.wait_for(future, self.queue_timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                self.release()  # The slot arrived as we gave up; pass it on
+            else:
+                self._discard(key, future)
+            if isinstance(e, asyncio.TimeoutError):
+                self._timed_out += 1
+                raise LlmBusyError(
+                    f"All {self.capacity} LLM slots stayed busy for {self.queue_timeout_seconds}s"
+                )
+            raise
+
+    def release(self) -> None:
+        """Hand the slot to the next waiting user (round robin), or free it"""
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            future, enqueued_at = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if not future.done():
+                future.set_result(None)
+                self._record_wait(time.monotonic() - enqueued_at)
+                return
+        self._active -= 1
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+
+        def percentile(fraction: float) -> float:
+            return round(waits[min(len(waits) - 1, int(len(waits) * fraction))] * 1000, 1) if waits else 0.0
+
+        return {
+            "capacity": self.capacity,
+            "active": self._active,
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "queued_users": len(self._queues),
+            "granted": self._granted,
+            "timed_out": self._timed_out,
+            "wait_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)}
+        }
+
+    def _record_wait(self, seconds: float) -> None:
+        self._granted += 1
+        self._waits.append(seconds)
+
+    def _discard(self, key: str, future: asyncio.Future) -> None:
+        queue = self._queues.get(key)
+        if queue is None:
+            return
+        for entry in queue:
+            if entry[0] is future:
+                queue.remove(entry)
+                break
+        if not queue:
+            del self._queues[key]
+
+llm_governor = LlmGovernor(settings.LLM_MAX_CONCURRENCY, settings.LLM_QUEUE_TIMEOUT_SECONDS)
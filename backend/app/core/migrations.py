@@ -0,0 +1,112 @@
+"""
+Lightweight schema migrations.
+
+`Base.metadata.create_all` only creates missing tables, it never adds columns or
+indexes to tables that already exist, nor changes column types. New nullable (or
+defaulted) columns, indexes and column type changes are registered here and applied
+on startup so existing databases keep working.
+"""
+
+import logging
+from sqlalchemy import LargeBinary, inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# (table, column, column DDL) - columns must be nullable or have a default
+COLUMN_MIGRATIONS = [
+    ("projects", "roadmap_hash", "VARCHAR(64)"),
+    ("roadmaps", "roadmap_hash", "VARCHAR(64)"),
+    ("users", "project_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("projects", "has_roadmap", "BOOLEAN NOT NULL DEFAULT FALSE"),
+]
+
+# (table, column) -> statement filling a denormalized column right after it is added
+COLUMN_BACKFILLS = {
+    ("users", "project_count"): (
+        "UPDATE users SET project_count = "
+        "(SELECT COUNT(*) FROM projects WHERE projects.user_id = users.id)"
+    ),
+    ("projects", "has_roadmap"): (
+        "UPDATE projects SET has_roadmap = TRUE WHERE roadmap_data IS NOT NULL"
+    ),
+}
+
+# (table, column) stored with CompressedJSON / CompressedText. They bind bytes, so on
+# Postgres the json/text columns of databases created before compression are converted
+# to bytea (legacy uncompressed values are still read transparently)
+COMPRESSED_COLUMNS = [
+    ("projects", "roadmap_data"),
+    ("roadmaps", "roadmap_data"),
+    ("conversations", "specifications"),
+    ("messages", "content"),
+]
+
+# (index name, table, columns) - must match the Index declared on the model
+INDEX_MIGRATIONS = [
+    ("ix_projects_user_id_updated_at", "projects", ["user_id", "updated_at"]),
+    ("ix_tasks_project_id_updated_at", "tasks", ["project_id", "updated_at"]),
+    ("ix_roadmaps_user_id_updated_at", "roadmaps", ["user_id", "updated_at"]),
+    ("ix_conversations_user_id_updated_at", "conversations", ["user_id", "updated_at"]),
+    ("ix_users_email_lower", "users", ["lower(email)"]),
+    ("ix_users_first_name_lower", "users", ["lower(first_name)"]),
+    ("ix_users_last_name_lower", "users", ["lower(last_name)"]),
+    ("ix_users_is_active", "users", ["is_active"]),
+    ("ix_projects_name_lower", "projects", ["lower(name)"]),
+    ("ix_projects_status", "projects", ["status"]),
+    ("ix_projects_has_roadmap", "projects", ["has_roadmap"]),
+    ("ix_feedback_status", "feedback", ["status"]),
+    ("ix_feedback_feedback_type", "feedback", ["feedback_type"]),
+]
+
+def apply_migrations(engine: Engine) -> None:
+    """Add any registered columns and indexes that are missing from existing tables, convert compressed columns"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table, column, ddl in COLUMN_MIGRATIONS:
+            if table not in existing_tables:
+                continue
+            columns = {col["name"] for col in inspector.get_columns(table)}
+            if column in columns:
+                continue
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+            logger.info(f"Added column {table}.{column}")
+            if (table, column) in COLUMN_BACKFILLS:
+                conn.execute(text(COLUMN_BACKFILLS[(table, column)]))
+                logger.info(f"Backfilled {table}.{column}")
+
+        if conn.dialect.name == "postgresql":
+            for table, column in COMPRESSED_COLUMNS:
+                if table not in existing_tables:
+                    continue
+                column_type = next(col["type"] for col in inspector.get_columns(table) if col["name"] == column)
+                if isinstance(column_type, LargeBinary):
+                    continue
+                # Rewrites the table, so the first start after upgrading can take a while
+                conn.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE bytea "
+                    f"USING convert_to({column}::text, 'UTF8')"
+                ))
+                logger.info(f"Converted {table}.{column} to bytea for compressed storage")
+
+        for name, table, columns in INDEX_MIGRATIONS:
+            if table not in existing_tables:
+                continue
+            if name in _index_names(conn, inspector, table):
+                continue
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+            logger.info(f"Added index {name}")
+
+
+def _index_names(conn, inspector, table: str) -> set:
+    """Names of the indexes on a table, including expression indexes"""
+    if conn.dialect.name == "sqlite":
+        # SQLAlchemy skips expression-based indexes when reflecting SQLite
+        rows = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+            {"table": table}
+        )
+        return {row[0] for row in rows}
+    return {index["name"] for index in inspector.get_indexes(table)}
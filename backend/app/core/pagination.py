@@ -0,0 +1,32 @@
+"""
+Helpers for listings that must stay fast on large tables.
+
+Pages are keyset-based (`before_id`): each page is an index range scan ending at the
+previous page's last id, so page 1000 costs the same as page 1 (OFFSET would read and
+discard every earlier row). Searches are case-insensitive prefix matches written as a
+range over lower(column), which an index on lower(column) can serve; LIKE 'x%' cannot
+use an index in SQLite because LIKE is case-insensitive there.
+"""
+
+from typing import List, Optional, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Query
+
+def prefix_match(*columns, term: str):
+    """Filter matching rows where any of the columns starts with term, ignoring case"""
+    prefix = term.strip().lower()
+    # Smallest string greater than every string starting with prefix
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return or_(*(
+        (func.lower(column) >= prefix) & (func.lower(column) < upper)
+        for column in columns
+    ))
+
+def keyset_page(query: Query, id_column, limit: int, before_id: Optional[int] = None) -> Tuple[List, Optional[int]]:
+    """Newest-first page of rows; returns (rows, before_id of the next page or None)"""
+    if before_id is not None:
+        query = query.filter(id_column < before_id)
+    rows = query.order_by(id_column.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
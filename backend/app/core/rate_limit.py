@@ -0,0 +1,196 @@
+"""
+Per-user rate limiting with token buckets.
+
+Every /api request takes a token from the caller's bucket for its class:
+- "llm": agent calls that run the language model (a few per minute)
+- "write": other POST/PUT/PATCH/DELETE requests
+- "read": everything else
+Each class has its own budget (RATE_LIMIT_<CLASS>_PER_MINUTE refill, _BURST capacity),
+so a user generating roadmaps does not run out of reads, and one heavy user cannot
+take the LLM capacity or the database from everyone else. An empty bucket answers
+429 with Retry-After (seconds until a token is back).
+
+Callers are identified by their access token (verified in CPU), else the user_id
+query param when AUTH_ALLOW_USER_ID_PARAM is on (development), else the client address.
+
+Stores:
+- "memory" (default): buckets in this process. Works for a single worker and is the
+  stand-in for Redis in development and tests, with the same interface.
+- "redis": buckets in Redis (optional `redis` package), shared by all workers; the
+  update is one Lua script, so concurrent requests cannot both take the last token.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.core.security import token_signer
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+class Budget(NamedTuple):
+    capacity: float  # Burst size
+    refill_per_second: float
+
+class MemoryBucketStore:
+    """Token buckets in a dict; take() is thread-safe and never waits"""
+
+    MAX_BUCKETS = 100_000
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}  # key -> (tokens, updated at, full at)
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, budget: Budget) -> float:
+        """Take a token; returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (budget.capacity, now, now))
+            tokens = min(budget.capacity, tokens + (now - updated_at) * budget.refill_per_second)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / budget.refill_per_second
+            if not wait:
+                tokens -= 1
+            if len(self._buckets) >= self.MAX_BUCKETS and key not in self._buckets:
+                self._sweep(now)
+            self._buckets[key] = (tokens, now, now + (budget.capacity - tokens) / budget.refill_per_second)
+            return wait
+
+    def _sweep(self, now: float) -> None:
+        """Drop buckets that have refilled completely; a missing bucket is a full one"""
+        for key in [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+class RedisBucketStore:
+    """Token buckets in Redis hashes, shared by every worker"""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated_at = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+    local wait = 0
+    if tokens < 1 then
+        wait = (1 - tokens) / rate
+    else
+        tokens = tokens - 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str):
+        self._client = aioredis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, budget: Budget) -> float:
+        wait = await self._script(
+            keys=[f"ratelimit:{key}"],
+            args=[budget.capacity, budget.refill_per_second, time.time()]
+        )
+        return float(wait)
+
+class RateLimiter:
+    """Picks the budget and bucket for a request"""
+
+    CLASSES = ("llm", "write", "read")
+    LLM_ROUTES = {("POST", "/api/agent/conversate"), ("POST", "/api/agent/roadmap")}
+    WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, store):
+        self.store = store
+        self.budgets = {
+            name: Budget(
+                capacity=getattr(settings, f"RATE_LIMIT_{name.upper()}_BURST"),
+                refill_per_second=getattr(settings, f"RATE_LIMIT_{name.upper()}_PER_MINUTE") / 60
+            )
+            for name in self.CLASSES
+        }
+
+    def classify(self, method: str, path: str) -> Optional[str]:
+        """Budget class of a request, or None when it is not limited"""
+        if method == "OPTIONS" or not path.startswith("/api/") or path.endswith("/health"):
+            return None
+        if (method, path.rstrip("/")) in self.LLM_ROUTES:
+            return "llm"
+        return "write" if method in self.WRITE_METHODS else "read"
+
+    async def check(self, request_class: str, caller: str) -> float:
+        """0 if the request may proceed, else seconds to wait; store errors let requests through"""
+        try:
+            return await self.store.take(f"{request_class}:{caller}", self.budgets[request_class])
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable, not limiting: {e}")
+            return 0.0
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 when the caller's bucket for the route is empty"""
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            return await self.app(scope, receive, send)
+
+        request_class = self.limiter.classify(scope["method"], scope["path"])
+        if request_class is None:
+            return await self.app(scope, receive, send)
+
+        retry_after = await self.limiter.check(request_class, self._caller(scope))
+        if retry_after <= 0:
+            return await self.app(scope, receive, send)
+
+        body = json.dumps({"detail": f"Rate limit exceeded for {request_class} requests; retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def _caller(scope) -> str:
+        headers = dict(scope.get("headers") or [])
+        query = dict(
+            part.partition("=")[::2] for part in scope.get("query_string", b"").decode("latin-1").split("&")
+        )
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            token = query.get("access_token")
+        if token:
+            try:
+                return f"user:{token_signer.verify(token.strip()).user_id}"
+            except Exception:
+                pass  # The route answers 401; limit by address meanwhile
+        elif settings.AUTH_ALLOW_USER_ID_PARAM and query.get("user_id", "").isdigit():
+            return f"user:{query['user_id']}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+def _create_store():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if aioredis is None:
+            logger.warning("RATE_LIMIT_BACKEND=redis but the redis package is not installed; using in-memory buckets")
+        else:
+            return RedisBucketStore(settings.RATE_LIMIT_REDIS_URL)
+    return MemoryBucketStore()
+
+rate_limiter = RateLimiter(_create_store())
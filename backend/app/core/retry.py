@@ -0,0 +1,123 @@
+"""
+Retries with exponential backoff and jitter for calls to external providers.
+
+`await llm_retry.call(attempt, name="...")` runs `attempt` (a coroutine function)
+until it succeeds, the error is not worth retrying, LLM_RETRY_ATTEMPTS attempts
+have run, or LLM_RETRY_DEADLINE_SECONDS have passed since the first one; the last
+error is then raised as it was. Retried: 408, 409, 425, 429 and 5xx responses,
+timeouts and connection errors. Anything else (bad request, auth, our own bugs)
+fails at once.
+
+The wait before attempt n is random in [0, min(max delay, base * 2**n)] ("full
+jitter", so clients that failed together do not retry together), or the
+provider's Retry-After when it sends one. Each attempt should take its own LLM
+slot (see llm_governor) so a call sleeping between attempts does not hold one.
+
+Counters for every call name are kept for stats() (GET /api/admin/llm).
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError"}  # openai, without importing it here
+
+def status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a provider error (openai: status_code, google-genai: code)"""
+    for attribute in ("status_code", "code", "status"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    return None
+
+def is_retryable(error: BaseException) -> bool:
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    return (
+        isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError))
+        or type(error).__name__ in RETRYABLE_ERROR_NAMES
+    )
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay asked for by the provider (Retry-After / retry-after-ms headers), if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            # HTTP-date form
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    """Retry loop plus per-name counters"""
+
+    def __init__(self, attempts: int, base_delay: float, max_delay: float, deadline_seconds: float):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline_seconds = deadline_seconds
+        self._counters = defaultdict(lambda: defaultdict(int))
+
+    async def call(self, attempt: Callable[[], Awaitable[T]], name: str = "call") -> T:
+        counters = self._counters[name]
+        counters["calls"] += 1
+        deadline = time.monotonic() + self.deadline_seconds
+        for number in range(max(1, self.attempts)):
+            remaining = deadline - time.monotonic()
+            try:
+                result = await asyncio.wait_for(attempt(), remaining)
+            except Exception as error:
+                code = status_code(error)
+                if not is_retryable(error):
+                    counters["failed"] += 1
+                    raise
+                counters[f"error_{code or type(error).__name__}"] += 1
+
+                delay = retry_after_seconds(error)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** number))
+                if number + 1 >= max(1, self.attempts) or time.monotonic() + delay >= deadline:
+                    counters["gave_up"] += 1
+                    raise
+
+                counters["retries"] += 1
+                counters["retry_wait_ms"] += int(delay * 1000)
+                logger.warning(f"{name} failed ({code or type(error).__name__}), retry {number + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if number:
+                counters["recovered"] += 1
+            return result
+
+    def stats(self) -> dict:
+        return {name: dict(counters) for name, counters in self._counters.items()}
+
+llm_retry = RetryPolicy(
+    settings.LLM_RETRY_ATTEMPTS,
+    settings.LLM_RETRY_BASE_DELAY_SECONDS,
+    settings.LLM_RETRY_MAX_DELAY_SECONDS,
+    settings.LLM_RETRY_DEADLINE_SECONDS
+)
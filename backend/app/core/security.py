@@ -0,0 +1,104 @@
+"""
+Signed access tokens.
+
+Tokens are JWTs (HS256) signed with Settings.SECRET_KEY and carry the user id and
+superuser flag, so verifying one is a few microseconds of CPU and no database
+query. The HMAC keys are prepared once; the header is fixed, so a token with any
+other header (e.g. "alg": "none") fails the comparison before its payload is read.
+
+Stateless means a token stays valid until it expires (ACCESS_TOKEN_EXPIRE_MINUTES);
+routes still check that the user exists, which the identity cache answers without
+a query on the hot path, so deleted users are locked out. To rotate the secret, move
+the old value to SECRET_KEY_PREVIOUS: its tokens keep verifying until they expire.
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+from typing import List, NamedTuple
+
+from app.core.config import settings
+from app.core.serialization import json_dumps, json_loads
+
+class TokenError(ValueError):
+    """Raised for a malformed, forged or expired token"""
+
+class TokenClaims(NamedTuple):
+    user_id: int
+    is_superuser: bool
+    issued_at: int
+    expires_at: int
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+class TokenSigner:
+    """Issues and verifies HS256 JWTs"""
+
+    HEADER = _b64encode(b'{"alg":"HS256","typ":"JWT"}')
+
+    def __init__(self, secret: str, previous_secrets: List[str], lifetime_seconds: int):
+        self.lifetime_seconds = lifetime_seconds
+        # hmac.new() hashes the key into its pads each time; copy() of a keyed object skips that
+        self._keys = [
+            hmac.new(secret.encode(), digestmod=hashlib.sha256)
+            for secret in [secret, *previous_secrets] if secret
+        ]
+
+    def issue(self, user_id: int, is_superuser: bool = False) -> str:
+        now = int(time.time())
+        payload = _b64encode(json_dumps({
+            "sub": str(user_id),
+            "su": bool(is_superuser),
+            "iat": now,
+            "exp": now + self.lifetime_seconds
+        }).encode())
+        signing_input = f"{self.HEADER}.{payload}"
+        return f"{signing_input}.{_b64encode(self._sign(self._keys[0], signing_input))}"
+
+    def verify(self, token: str) -> TokenClaims:
+        # Headers are decoded as latin-1, so anything may arrive; a JWT is always ASCII
+        if not token.isascii():
+            raise TokenError("Malformed token")
+        header, _, rest = token.partition(".")
+        payload, _, signature = rest.partition(".")
+        if not hmac.compare_digest(header, self.HEADER) or not payload or not signature:
+            raise TokenError("Malformed token")
+
+        signing_input = f"{header}.{payload}"
+        try:
+            signature = _b64decode(signature)
+        except ValueError:
+            raise TokenError("Malformed token")
+        if not any(hmac.compare_digest(self._sign(key, signing_input), signature) for key in self._keys):
+            raise TokenError("Invalid token signature")
+
+        try:
+            claims = json_loads(_b64decode(payload))
+            result = TokenClaims(
+                user_id=int(claims["sub"]),
+                is_superuser=bool(claims.get("su", False)),
+                issued_at=int(claims["iat"]),
+                expires_at=int(claims["exp"])
+            )
+        except (ValueError, KeyError, TypeError):
+            raise TokenError("Malformed token")
+        if result.expires_at <= time.time():
+            raise TokenError("Token expired")
+        return result
+
+    @staticmethod
+    def _sign(key, signing_input: str) -> bytes:
+        mac = key.copy()
+        mac.update(signing_input.encode("ascii"))
+        return mac.digest()
+
+token_signer = TokenSigner(
+    settings.SECRET_KEY,
+    settings.SECRET_KEY_PREVIOUS,
+    settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
@@ -0,0 +1,35 @@
+import hashlib
+import json
+from typing import Any, Optional
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+# orjson is only used when FAST_JSON is enabled and the package is installed
+FAST_JSON_ENABLED = settings.FAST_JSON and orjson is not None
+
+def json_dumps(data: Any) -> str:
+    """Serialize data to JSON, using orjson when FAST_JSON is enabled"""
+    if FAST_JSON_ENABLED:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, ensure_ascii=False)
+
+def json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes, using orjson when FAST_JSON is enabled"""
+    if FAST_JSON_ENABLED:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def canonical_json(data: Any) -> str:
+    """Serialize data to a stable JSON string (sorted keys, no whitespace)"""
+    # Always stdlib so stored hashes do not change when FAST_JSON is toggled
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+def compute_roadmap_hash(roadmap_data: Optional[dict]) -> Optional[str]:
+    """SHA-256 of the canonical roadmap JSON, used to skip no-op roadmap writes"""
+    if roadmap_data is None:
+        return None
+    return hashlib.sha256(canonical_json(roadmap_data).encode("utf-8")).hexdigest()
@@ -1,8 +1,13 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import agent, auth, projects, admin, feedback
-from app.core.config import settings
-from app.core.database import engine
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.api.routes import agent, auth, projects, admin, feedback, sync, events, search
+from app.api.dependencies import get_current_superuser
+from app.core.config import settings, Settings
+from app.core.database import engine, SessionLocal
+from app.core.migrations import apply_migrations
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.serialization import FAST_JSON_ENABLED
 from app.models.database import Base
 import logging
 
@@ -18,9 +23,13 @@ app = FastAPI(
     description="AI-powered project roadmap generator",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse if FAST_JSON_ENABLED else JSONResponse
 )
 
+# Added before CORS so that CORS wraps it and 429 responses carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 # CORS - make this more specific for production
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +37,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
     allow_headers=["*"],
+    # ETag for If-None-Match / If-Match, admin paging, Retry-After on 429
+    expose_headers=["ETag", "X-Total-Count", "X-Next-Before-Id", "Retry-After"],
 )
 
 # Create database tables on startup
@@ -35,14 +46,64 @@ app.add_middleware(
 async def startup_event():
     logger.info("Checking database tables...")
     Base.metadata.create_all(bind=engine)
+    apply_migrations(engine)
     logger.info("Database tables verified successfully")
+    
+    if settings.SECRET_KEY == Settings.model_fields["SECRET_KEY"].default:
+        if settings.AUTH_ALLOW_USER_ID_PARAM or not settings.ALLOW_DEFAULT_SECRET_KEY:
+            raise RuntimeError(
+                "SECRET_KEY is the default value, so anyone can sign access tokens (superuser ones "
+                "included); set SECRET_KEY in .env. For local development only, ALLOW_DEFAULT_SECRET_KEY=true "
+                "starts anyway (not together with AUTH_ALLOW_USER_ID_PARAM)"
+            )
+        logger.warning("SECRET_KEY is the default value (ALLOW_DEFAULT_SECRET_KEY); never run this in production")
+    
+    from app.services import sync_service
+    db = SessionLocal()
+    try:
+        purged = sync_service.purge_tombstones(db)
+        if purged:
+            logger.info(f"Purged {purged} expired sync tombstones")
+    finally:
+        db.close()
+    
+    from app.services import search_service
+    search_service.setup(engine)
+    
+    from app.services import analytics_service
+    analytics_service.start()
+    
+    if settings.BACKUP_WAL_SHIPPING:
+        from app.services import wal_shipping_service
+        if wal_shipping_service.start():
+            logger.info("Continuous WAL backup started")
+    
+    if settings.AGENT_WARM_ON_STARTUP:
+        # Runs once startup has finished, so the server accepts requests meanwhile
+        from app.core.agent_runtime import agent_runtime
+        agent_runtime.warm()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.services import analytics_service, password_service
+    analytics_service.stop()
+    password_service.stop()
+    
+    if settings.BACKUP_WAL_SHIPPING:
+        from app.services import wal_shipping_service
+        wal_shipping_service.stop()
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(agent.router, prefix="/api/agent", tags=["agent"])
 app.include_router(projects.router, prefix="/api", tags=["projects"])
-app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(
+    admin.router, prefix="/api/admin", tags=["admin"], dependencies=[Depends(get_current_superuser)]
+)
 app.include_router(feedback.router, prefix="/api/feedback", tags=["feedback"])
+app.include_router(sync.router, prefix="/api", tags=["sync"])
+app.include_router(events.router, prefix="/api", tags=["events"])
+app.include_router(search.router, prefix="/api", tags=["search"])
 
 @app.get("/")
 async def root():
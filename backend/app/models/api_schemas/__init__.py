@@ -1,15 +1,18 @@
 # API schemas package - Pydantic models for request/response validation
 from .user import UserBase, UserCreate, UserUpdate, User, UserResponse, LoginRequest, LoginResponse, ChangePasswordRequest, ChangePasswordResponse
 from .project import ProjectBase, ProjectCreate, ProjectUpdate, Project, ProjectResponse
-from .task import TaskBase, TaskCreate, TaskUpdate, Task, TaskResponse, TasksByType
+from .task import TaskBase, TaskCreate, TaskUpdate, Task, TaskResponse, TasksByType, TaskBulkCreate, TaskBulkUpdateItem, TaskBulkUpdate, TaskBulkIds, TaskBulkResult, TaskBulkResponse
 from .conversation import ConversationState, ChatMessage, ChatRequest, ChatResponse
 from .roadmap import (
     Roadmap, Epic, Story, Architecture,
-    UpdateEpic, ExpandEpicRequest,
+    UpdateEpic, StoryUpdate, AppendStoriesRequest, ExpandEpicRequest, RoadmapVersionInfo,
     # Backward compatibility aliases
     RoadmapNode, SubTask, ProjectSpecification
 )
 from .feedback import FeedbackBase, FeedbackCreate, FeedbackUpdate, Feedback, FeedbackResponse
+from .sync import SyncResponse, SyncRoadmap, SyncConversation, SyncDeletion
+from .transfer import TransferProject, TransferTask, ProjectTransferLine, ProjectImportError, ProjectImportResponse
+from .search import SearchResult, SearchResponse
 
 __all__ = [
     # User schemas
@@ -19,12 +22,19 @@ __all__ = [
     "ProjectBase", "ProjectCreate", "ProjectUpdate", "Project", "ProjectResponse",
     # Task schemas
     "TaskBase", "TaskCreate", "TaskUpdate", "Task", "TaskResponse", "TasksByType",
+    "TaskBulkCreate", "TaskBulkUpdateItem", "TaskBulkUpdate", "TaskBulkIds", "TaskBulkResult", "TaskBulkResponse",
     # Conversation schemas
     "ConversationState", "ChatMessage", "ChatRequest", "ChatResponse",
     # Roadmap schemas (new)
-    "Roadmap", "Epic", "Story", "Architecture", "UpdateEpic", "ExpandEpicRequest",
+    "Roadmap", "Epic", "Story", "Architecture", "UpdateEpic", "StoryUpdate", "AppendStoriesRequest", "ExpandEpicRequest", "RoadmapVersionInfo",
     # Roadmap schemas (backward compatibility)
     "RoadmapNode", "SubTask", "ProjectSpecification",
     # Feedback schemas
-    "FeedbackBase", "FeedbackCreate", "FeedbackUpdate", "Feedback", "FeedbackResponse"
+    "FeedbackBase", "FeedbackCreate", "FeedbackUpdate", "Feedback", "FeedbackResponse",
+    # Sync schemas
+    "SyncResponse", "SyncRoadmap", "SyncConversation", "SyncDeletion",
+    # Project import/export schemas
+    "TransferProject", "TransferTask", "ProjectTransferLine", "ProjectImportError", "ProjectImportResponse",
+    # Search schemas
+    "SearchResult", "SearchResponse"
 ]
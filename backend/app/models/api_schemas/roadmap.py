@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from enum import Enum
+from datetime import datetime
 
 class Story(BaseModel):
     """Individual story within an epic"""
@@ -49,8 +50,26 @@ class UpdateEpic(BaseModel):
     stories: Optional[List[Story]] = None
     priority: Optional[str] = None
 
+class StoryUpdate(BaseModel):
+    """Request model for updating a single story"""
+    title: Optional[str] = None
+    acceptance_criteria: Optional[List[str]] = None
+    completed: Optional[bool] = None
+
+class AppendStoriesRequest(BaseModel):
+    """Request model for appending stories to an existing epic"""
+    stories: List[Story]
+
 class ExpandEpicRequest(BaseModel):
     """Request to expand an epic with additional stories/details"""
     epic_id: int
     expansion_details: str
     context: Optional[str] = None
+
+class RoadmapVersionInfo(BaseModel):
+    """Summary of one stored roadmap version"""
+    version: int
+    is_snapshot: bool
+    size_bytes: int
+    roadmap_hash: Optional[str] = None
+    created_at: datetime
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class SearchResult(BaseModel):
+    """
+    One match. `id` is the row id of projects, tasks and messages and the roadmap id
+    of epics and stories; `parent_id` is a story's epic or a message's conversation.
+    The highlight and snippet are HTML-escaped with matches wrapped in <mark>.
+    """
+    kind: str  # project, epic, story, task, message
+    id: int
+    parent_id: Optional[int] = None
+    project_id: Optional[int] = None
+    title: str
+    title_highlight: str
+    snippet: str
+    score: float
+
+class SearchResponse(BaseModel):
+    """Ranked search results, best match first"""
+    query: str
+    results: List[SearchResult]
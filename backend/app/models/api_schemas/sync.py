@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from .project import ProjectResponse
+from .task import TaskResponse
+
+class SyncRoadmap(BaseModel):
+    """Agent session roadmap that changed since the cursor"""
+    id: int
+    conversation_id: Optional[int] = None
+    roadmap_data: Optional[dict] = None
+    roadmap_hash: Optional[str] = None
+    updated_at: datetime
+
+class SyncConversation(BaseModel):
+    """Conversation metadata that changed since the cursor"""
+    id: int
+    session_id: str
+    project_id: Optional[int] = None
+    project_name: Optional[str] = None
+    current_phase: Optional[str] = None
+    is_specification_complete: bool = False
+    updated_at: datetime
+
+class SyncDeletion(BaseModel):
+    """A deleted row; deleting a project also removes its tasks"""
+    entity_type: str  # "project", "task", "roadmap", "conversation"
+    entity_id: int
+    deleted_at: datetime
+
+class SyncResponse(BaseModel):
+    """Changes since the cursor; pass `cursor` back as `since` on the next call"""
+    cursor: datetime
+    full: bool  # True when everything was returned and the client should replace its cache
+    projects: List[ProjectResponse] = []
+    tasks: List[TaskResponse] = []
+    roadmaps: List[SyncRoadmap] = []
+    conversations: List[SyncConversation] = []
+    deleted: List[SyncDeletion] = []
@@ -44,3 +44,31 @@ class TasksByType(BaseModel):
     """Model for grouping tasks by type"""
     daily_todos: List[TaskResponse] = []
     your_ideas: List[TaskResponse] = []
+
+class TaskBulkCreate(BaseModel):
+    """Tasks to create in one transaction"""
+    tasks: List[TaskCreate]
+
+class TaskBulkUpdateItem(TaskUpdate):
+    """Partial update for one task in a bulk request"""
+    id: int
+
+class TaskBulkUpdate(BaseModel):
+    """Partial updates to apply in one transaction"""
+    tasks: List[TaskBulkUpdateItem]
+
+class TaskBulkIds(BaseModel):
+    """Task ids for bulk complete/archive/delete"""
+    task_ids: List[int]
+    completed: bool = True  # Only used by bulk complete (False reopens the tasks)
+
+class TaskBulkResult(BaseModel):
+    """Outcome for one item of a bulk request, in request order"""
+    id: Optional[int] = None
+    status: str  # "created", "updated", "deleted", "not_found", "invalid"
+    error: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+class TaskBulkResponse(BaseModel):
+    """Per-item results of a bulk request"""
+    results: List[TaskBulkResult]
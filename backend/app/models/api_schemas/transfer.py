@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from .project import ProjectBase
+from .roadmap import Roadmap
+from .task import TaskBase
+
+class TransferProject(ProjectBase):
+    """Project fields of an NDJSON export line (the exported id is informational)"""
+    created_at: Optional[datetime] = None
+
+class TransferTask(TaskBase):
+    """Task of an NDJSON export line"""
+    archive: bool = False
+    created_at: Optional[datetime] = None
+
+class ProjectTransferLine(BaseModel):
+    """One line of a project export: the project, its roadmap and all of its tasks"""
+    project: TransferProject
+    roadmap: Optional[Roadmap] = None
+    tasks: List[TransferTask] = []
+
+class ProjectImportError(BaseModel):
+    """A line that could not be imported"""
+    line: int
+    error: str
+
+class ProjectImportResponse(BaseModel):
+    """Outcome of an NDJSON import"""
+    imported: int
+    failed: int
+    errors: List[ProjectImportError]  # The first errors only, see ProjectTransferService.MAX_ERRORS
+    # Set (with status 500) when a chunk could not be written: nothing from this line on
+    # was imported, so the import can be resumed from it
+    stopped_at_line: Optional[int] = None
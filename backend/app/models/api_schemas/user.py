@@ -42,11 +42,15 @@ class UserResponse(BaseModel):
 class LoginRequest(BaseModel):
     """Login request model"""
     email: EmailStr
+    password: Optional[str] = None  # May be omitted in development (AUTH_ALLOW_USER_ID_PARAM)
 
 class LoginResponse(BaseModel):
     """Login response model"""
     user: UserResponse
     message: str
+    access_token: str  # Send as "Authorization: Bearer <token>"
+    token_type: str = "bearer"
+    expires_in: int  # Seconds
 
 class ChangePasswordRequest(BaseModel):
     """Change password request model"""
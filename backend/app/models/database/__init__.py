@@ -7,6 +7,11 @@ from .conversation import Conversation
 from .message import Message
 from .roadmap import Roadmap
 from .feedback import Feedback
+from .epic import Epic
+from .story import Story
+from .roadmap_version import RoadmapVersion
+from .tombstone import Tombstone
+from .analytics import AnalyticsDaily, AnalyticsTotal
 
 __all__ = [
     "Base",
@@ -16,5 +21,11 @@ __all__ = [
     "Conversation",
     "Message",
     "Roadmap",
-    "Feedback"
+    "Feedback",
+    "Epic",
+    "Story",
+    "RoadmapVersion",
+    "Tombstone",
+    "AnalyticsDaily",
+    "AnalyticsTotal"
 ]
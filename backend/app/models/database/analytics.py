@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime
+from .base import Base
+from datetime import datetime
+
+class AnalyticsDaily(Base):
+    """One metric for one day (e.g. signups on 2024-05-01), rebuilt by AnalyticsService"""
+    __tablename__ = "analytics_daily"
+    
+    day = Column(Date, primary_key=True)
+    metric = Column(String(50), primary_key=True)  # "signups", "projects_created", ...
+    value = Column(Integer, nullable=False, default=0)
+
+class AnalyticsTotal(Base):
+    """Current value of a dashboard total (e.g. total_users), refreshed by AnalyticsService"""
+    __tablename__ = "analytics_totals"
+    
+    metric = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
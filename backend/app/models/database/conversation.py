@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
+from app.core.compression import CompressedJSON
 from datetime import datetime
 
 class Conversation(Base):
@@ -11,12 +12,16 @@ class Conversation(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True, index=True)  # Link to project
     project_name = Column(String, nullable=True)
-    specifications = Column(JSON, nullable=True)  # Store project specs as JSON
+    specifications = Column(CompressedJSON, nullable=True)  # Store project specs as JSON
     current_phase = Column(String, default="discovery")  # discovery, confirmation, generation
     is_specification_complete = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_conversations_user_id_updated_at", "user_id", "updated_at"),  # Delta sync
+    )
+    
     # Relationships
     user = relationship("User", back_populates="conversations")
     project = relationship("Project", back_populates="conversations")
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class Epic(Base):
+    """Normalized copy of a roadmap epic (the roadmap-local id lives in epic_id)"""
+    __tablename__ = "epics"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    epic_id = Column(Integer, nullable=False)  # Epic.id inside the roadmap JSON
+    name = Column(String, nullable=False)
+    priority = Column(String, nullable=True)  # P0, P1, P2
+    description = Column(Text, nullable=True)
+    position = Column(Integer, default=0)  # Order of the epic within the roadmap
+    
+    __table_args__ = (
+        Index("ix_epics_project_id_epic_id", "project_id", "epic_id"),
+    )
+    
+    # Relationships
+    project = relationship("Project", back_populates="epics")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 from datetime import datetime
@@ -15,5 +15,11 @@ class Feedback(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Admin listing filters; rows come back in id order within each value
+        Index("ix_feedback_status", "status"),
+        Index("ix_feedback_feedback_type", "feedback_type"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="feedback")
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from .base import Base
+from app.core.compression import CompressedText
 from datetime import datetime
 
 class Message(Base):
@@ -9,7 +10,7 @@ class Message(Base):
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"), index=True)
     role = Column(String)  # "user" or "assistant"
-    content = Column(Text)
+    content = Column(CompressedText)
     action_type = Column(String, nullable=True)  # "chat", "edit", "expand"
     timestamp = Column(DateTime, default=datetime.utcnow)
     
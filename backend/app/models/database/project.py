@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from .base import Base
+from app.core.compression import CompressedJSON
 from datetime import datetime
 
 class Project(Base):
@@ -11,11 +12,23 @@ class Project(Base):
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     status = Column(String, default="draft")  # draft, active, completed, archived
-    roadmap_data = Column(JSON, nullable=True)  # Store roadmap nodes as JSON
+    roadmap_data = Column(CompressedJSON, nullable=True)  # Store roadmap nodes as JSON
+    roadmap_hash = Column(String(64), nullable=True)  # Canonical hash of roadmap_data
+    has_roadmap = Column(Boolean, nullable=False, default=False, server_default="0")  # roadmap_data is not None
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_projects_user_id_updated_at", "user_id", "updated_at"),  # Delta sync
+        # Admin listing: case-insensitive name prefix search and filters
+        Index("ix_projects_name_lower", func.lower(name)),
+        Index("ix_projects_status", "status"),
+        Index("ix_projects_has_roadmap", "has_roadmap"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="projects")
     conversations = relationship("Conversation", back_populates="project")
     tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    epics = relationship("Epic", back_populates="project", cascade="all, delete-orphan")
+    stories = relationship("Story", back_populates="project", cascade="all, delete-orphan")
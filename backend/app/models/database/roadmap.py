@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
+from app.core.compression import CompressedJSON
 from datetime import datetime
 
 class Roadmap(Base):
@@ -9,10 +10,16 @@ class Roadmap(Base):
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"), index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # Direct user association
-    roadmap_data = Column(JSON)  # Store the full roadmap JSON
+    roadmap_data = Column(CompressedJSON)  # Store the full roadmap JSON
+    roadmap_hash = Column(String(64), nullable=True)  # Canonical hash of roadmap_data
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_roadmaps_user_id_updated_at", "user_id", "updated_at"),  # Delta sync
+    )
+    
     # Relationships
     user = relationship("User", back_populates="roadmaps")
     conversation = relationship("Conversation", back_populates="roadmaps")
+    versions = relationship("RoadmapVersion", back_populates="roadmap", cascade="all, delete-orphan")
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, LargeBinary, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from .base import Base
+from datetime import datetime
+
+class RoadmapVersion(Base):
+    """One saved revision of a roadmap: a full snapshot or a delta from the previous version"""
+    __tablename__ = "roadmap_versions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    roadmap_id = Column(Integer, ForeignKey("roadmaps.id"), nullable=False)
+    version = Column(Integer, nullable=False)  # 1-based, increasing per roadmap
+    is_snapshot = Column(Boolean, default=False)
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed JSON (snapshot or delta)
+    roadmap_hash = Column(String(64), nullable=True)  # Hash of the full roadmap at this version
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_roadmap_versions_roadmap_id_version", "roadmap_id", "version", unique=True),
+    )
+    
+    # Relationships
+    roadmap = relationship("Roadmap", back_populates="versions")
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Boolean, JSON, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class Story(Base):
+    """Normalized copy of a roadmap story, addressable by (project_id, story_id)"""
+    __tablename__ = "stories"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    epic_id = Column(Integer, nullable=False)  # Roadmap-local id of the parent epic
+    story_id = Column(Integer, nullable=False)  # Story.id inside the roadmap JSON
+    title = Column(String, nullable=False)
+    acceptance_criteria = Column(JSON, nullable=True)
+    completed = Column(Boolean, default=False)
+    position = Column(Integer, default=0)  # Order of the story across the whole roadmap
+    
+    __table_args__ = (
+        Index("ix_stories_project_id_epic_id", "project_id", "epic_id"),
+        Index("ix_stories_project_id_story_id", "project_id", "story_id"),
+    )
+    
+    # Relationships
+    project = relationship("Project", back_populates="stories")
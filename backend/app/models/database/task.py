@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, Boolean, String, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, Boolean, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 from datetime import datetime
@@ -15,5 +15,9 @@ class Task(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     archive = Column(Boolean, default=False)
     
+    __table_args__ = (
+        Index("ix_tasks_project_id_updated_at", "project_id", "updated_at"),  # Delta sync
+    )
+    
     # Relationships
     project = relationship("Project", back_populates="tasks")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from .base import Base
+from datetime import datetime
+
+class Tombstone(Base):
+    """Record of a deleted row, so delta sync can tell clients what to remove"""
+    __tablename__ = "tombstones"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)  # Owner of the deleted row (no FK: outlives the row)
+    entity_type = Column(String, nullable=False)  # "project", "task", "roadmap", "conversation"
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
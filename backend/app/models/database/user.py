@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from .base import Base
 from datetime import datetime
@@ -13,9 +13,18 @@ class User(Base):
     password_hash = Column(String, nullable=True)  # Nullable for dev dummy user
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False) 
+    project_count = Column(Integer, nullable=False, default=0, server_default="0")  # Maintained by the project writes
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Admin listing: case-insensitive prefix search and the is_active filter
+        Index("ix_users_email_lower", func.lower(email)),
+        Index("ix_users_first_name_lower", func.lower(first_name)),
+        Index("ix_users_last_name_lower", func.lower(last_name)),
+        Index("ix_users_is_active", "is_active"),
+    )
+    
     # Relationships
     conversations = relationship("Conversation", back_populates="user")
     roadmaps = relationship("Roadmap", back_populates="user")
@@ -4,6 +4,15 @@ from .project_service import ProjectService
 from .task_service import TaskService
 from .feedback_service import FeedbackService
 from .database_service import DatabaseService
+from .roadmap_service import RoadmapService
+from .roadmap_version_service import RoadmapVersionService
+from .sync_service import SyncService
+from .project_transfer_service import ProjectTransferService
+from .backup_service import BackupService
+from .wal_shipping_service import WalShippingService
+from .analytics_service import AnalyticsService
+from .search_service import SearchService
+from .password_service import PasswordService
 
 # Create singleton instances
 user_service = UserService()
@@ -11,11 +20,29 @@ project_service = ProjectService()
 task_service = TaskService()
 feedback_service = FeedbackService()
 database_service = DatabaseService()
+roadmap_service = RoadmapService()
+roadmap_version_service = RoadmapVersionService()
+sync_service = SyncService()
+project_transfer_service = ProjectTransferService()
+backup_service = BackupService()
+wal_shipping_service = WalShippingService()
+analytics_service = AnalyticsService()
+search_service = SearchService()
+password_service = PasswordService()
 
 __all__ = [
     "user_service",
     "project_service",
     "task_service",
     "feedback_service",
-    "database_service"
+    "database_service",
+    "roadmap_service",
+    "roadmap_version_service",
+    "sync_service",
+    "project_transfer_service",
+    "backup_service",
+    "wal_shipping_service",
+    "analytics_service",
+    "search_service",
+    "password_service"
 ]
\ No newline at end of file
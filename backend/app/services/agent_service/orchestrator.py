@@ -10,6 +10,8 @@ from openai import AsyncOpenAI
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.llm_governor import llm_governor
+from app.core.retry import llm_retry
 from app.models.api_schemas import ChatMessage, ConversationState
 from .tools import get_agent_tools
 from .roadmap_generation import RoadmapGenerationHandler
@@ -23,15 +25,16 @@ class AgentOrchestrator:
         groq_key = settings.GROQ_API_KEY
         openai_key = settings.OPENAI_API_KEY
         
+        # max_retries=0: failed calls are retried by llm_retry, which gives up the LLM slot while it waits
         if groq_key and groq_key != "":
-            self.client = AsyncOpenAI(api_key=groq_key, base_url="https://api.groq.com/openai/v1")
+            self.client = AsyncOpenAI(api_key=groq_key, base_url="https://api.groq.com/openai/v1", max_retries=0)
             self.client_mode = "groq"
             self.model = settings.GROQ_MODEL
             self.max_tokens = 8000  # GROQ token limit
             self.temperature = 0.1  # Lower temperature for more consistent responses
             print("⚡️ Using GROQ API key")
         elif openai_key and openai_key != "":
-            self.client = AsyncOpenAI(api_key=openai_key)
+            self.client = AsyncOpenAI(api_key=openai_key, max_retries=0)
             self.client_mode = "openai"
             self.model = settings.OPENAI_MODEL
             self.max_tokens = settings.OPENAI_MAX_TOKENS
@@ -121,14 +124,18 @@ Use the ask_clarifying_question function to gather project information.""", conv
             messages.append({"role": msg.role, "content": msg.content})
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=available_tools,
-                tool_choice="auto",
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
-            )
+            async def attempt():
+                async with llm_governor.slot(conversation_state.user_id):
+                    return await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        tools=available_tools,
+                        tool_choice="auto",
+                        max_tokens=self.max_tokens,
+                        temperature=self.temperature
+                    )
+
+            response = await llm_retry.call(attempt, name="roadmap_conversation")
             
             # Process the response
             message = response.choices[0].message
@@ -8,6 +8,8 @@ import uuid
 from datetime import datetime
 from typing import Dict, Tuple, Optional
 from openai import AsyncOpenAI
+from app.core.llm_governor import llm_governor
+from app.core.retry import llm_retry
 
 from app.models.api_schemas import (
     ProjectSpecification, RoadmapNode, Roadmap, 
@@ -487,14 +489,18 @@ Focus on making students understand the big picture and feel excited about what
         messages.append({"role": "user", "content": f"Generate a project overview for the setup node '{setup_node_id}'"})
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=[tool for tool in self.tools if tool["function"]["name"] == "generate_project_overview"],
-                tool_choice={"type": "function", "function": {"name": "generate_project_overview"}},
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
-            )
+            async def attempt():
+                async with llm_governor.slot(conversation_state.user_id):
+                    return await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        tools=[tool for tool in self.tools if tool["function"]["name"] == "generate_project_overview"],
+                        tool_choice={"type": "function", "function": {"name": "generate_project_overview"}},
+                        max_tokens=self.max_tokens,
+                        temperature=self.temperature
+                    )
+
+            response = await llm_retry.call(attempt, name="project_overview")
             
             # Process the response
             message = response.choices[0].message
@@ -702,14 +708,18 @@ Focus on actionable steps that remove friction and maintain development momentum
         messages.append({"role": "user", "content": f"Generate subtasks for '{next_node.title}'"})
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=[tool for tool in self.tools if tool["function"]["name"] == "generate_node_subtasks"],
-                tool_choice={"type": "function", "function": {"name": "generate_node_subtasks"}},
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
-            )
+            async def attempt():
+                async with llm_governor.slot(conversation_state.user_id):
+                    return await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        tools=[tool for tool in self.tools if tool["function"]["name"] == "generate_node_subtasks"],
+                        tool_choice={"type": "function", "function": {"name": "generate_node_subtasks"}},
+                        max_tokens=self.max_tokens,
+                        temperature=self.temperature
+                    )
+
+            response = await llm_retry.call(attempt, name="node_subtasks")
             
             # Process the response
             message = response.choices[0].message
@@ -0,0 +1,147 @@
+import logging
+import threading
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.models.database import User, Project, Roadmap, Conversation, AnalyticsDaily, AnalyticsTotal
+from app.core.config import settings
+from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+class AnalyticsService:
+    """
+    Rollups behind /api/admin/analytics.
+
+    Totals and per-day series are rebuilt in the background every
+    ANALYTICS_REFRESH_SECONDS, so the endpoint reads a handful of small rows instead of
+    counting the users/projects/roadmaps/conversations tables on every request. The
+    series count rows by creation date (UTC); after the first refresh only the buckets
+    from the day before the previous refresh onwards are recomputed (however long ago
+    it was), so older buckets keep the rows as they were counted even if some were
+    deleted later.
+    """
+
+    # metric -> model whose rows are counted by created_at
+    SERIES = {
+        "signups": User,
+        "projects_created": Project,
+        "roadmaps_generated": Roadmap,
+        "conversations_started": Conversation,
+    }
+    MAX_SERIES_DAYS = 365
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self, db: Session, full: bool = False) -> None:
+        """Recompute the totals and the daily buckets since the last refresh (or, with full, all)"""
+        now = datetime.utcnow()
+        since = None
+        last_refreshed_at = db.query(func.min(AnalyticsTotal.refreshed_at)).scalar()
+        if not full and last_refreshed_at is not None and db.query(AnalyticsDaily.day).first() is not None:
+            # The day before too: rows committed just after midnight may carry the previous date
+            since = last_refreshed_at.date() - timedelta(days=1)
+
+        daily = []
+        for metric, model in self.SERIES.items():
+            day_column = func.date(model.created_at)
+            query = db.query(day_column, func.count(model.id)).filter(model.created_at.isnot(None))
+            if since is not None:
+                query = query.filter(model.created_at >= datetime.combine(since, datetime.min.time()))
+            for day, count in query.group_by(day_column):
+                daily.append({"day": self._to_date(day), "metric": metric, "value": count})
+
+        total_projects, active_projects, projects_with_roadmaps = db.query(
+            func.count(Project.id),
+            func.coalesce(func.sum(case((Project.status == "active", 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Project.has_roadmap == True, 1), else_=0)), 0)
+        ).one()
+        totals = {
+            "total_users": db.query(func.count(User.id)).scalar(),
+            "total_projects": total_projects,
+            "active_projects": active_projects,
+            "projects_with_roadmaps": projects_with_roadmaps,
+            "total_roadmaps": db.query(func.count(Roadmap.id)).scalar(),
+            "total_conversations": db.query(func.count(Conversation.id)).scalar(),
+        }
+
+        stale = db.query(AnalyticsDaily)
+        if since is not None:
+            stale = stale.filter(AnalyticsDaily.day >= since)
+        stale.delete(synchronize_session=False)
+        if daily:
+            db.bulk_insert_mappings(AnalyticsDaily, daily)
+        db.query(AnalyticsTotal).delete(synchronize_session=False)
+        db.bulk_insert_mappings(AnalyticsTotal, [
+            {"metric": metric, "value": int(value or 0), "refreshed_at": now}
+            for metric, value in totals.items()
+        ])
+        db.commit()
+
+    def get_analytics(self, db: Session, days: int = 30) -> dict:
+        """Totals plus `days` daily buckets per series; refreshes first if nothing was computed yet"""
+        totals = db.query(AnalyticsTotal).all()
+        if not totals:
+            self.refresh(db, full=True)
+            totals = db.query(AnalyticsTotal).all()
+
+        values = {total.metric: total.value for total in totals}
+        active_projects = values.get("active_projects", 0)
+        projects_with_roadmaps = values.get("projects_with_roadmaps", 0)
+        return {
+            **values,
+            "roadmap_completion_rate": (projects_with_roadmaps / active_projects) * 100 if active_projects > 0 else 0,
+            "refreshed_at": min(total.refreshed_at for total in totals),
+            "series": self.get_series(db, days)
+        }
+
+    def get_series(self, db: Session, days: int) -> Dict[str, List[dict]]:
+        """Daily counts for the last `days` days (today included), zero-filled"""
+        days = max(1, min(days, self.MAX_SERIES_DAYS))
+        start = datetime.utcnow().date() - timedelta(days=days - 1)
+        counts = {
+            (row.metric, row.day): row.value
+            for row in db.query(AnalyticsDaily).filter(AnalyticsDaily.day >= start)
+        }
+        dates = [start + timedelta(days=offset) for offset in range(days)]
+        return {
+            metric: [{"date": day.isoformat(), "count": counts.get((metric, day), 0)} for day in dates]
+            for metric in self.SERIES
+        }
+
+    def start(self) -> None:
+        """Refresh in a background thread every ANALYTICS_REFRESH_SECONDS"""
+        if settings.ANALYTICS_REFRESH_SECONDS <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="analytics-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        from app.core.database import SessionLocal
+
+        while True:
+            db = SessionLocal()
+            try:
+                self.refresh(db)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Analytics refresh failed: {e}")
+            finally:
+                db.close()
+            if self._stop.wait(settings.ANALYTICS_REFRESH_SECONDS):
+                return
+
+    @staticmethod
+    def _to_date(value) -> date:
+        # SQLite's date() returns text, PostgreSQL returns a date
+        return value if isinstance(value, date) else date.fromisoformat(value)
@@ -0,0 +1,249 @@
+import base64
+import gzip
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import engine
+from app.models.database import Base
+
+logger = logging.getLogger(__name__)
+
+def compress_file(path: str) -> str:
+    """Compress a file according to BACKUP_COMPRESSION; returns the path of the result"""
+    if settings.BACKUP_COMPRESSION != "gzip":
+        return path
+    compressed = f"{path}.gz"
+    with open(path, "rb") as source, gzip.open(f"{compressed}.partial", "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    os.replace(f"{compressed}.partial", compressed)
+    os.remove(path)
+    return compressed
+
+def open_backup_file(path: str):
+    """Open a backup file for reading, decompressing .gz files"""
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+class BackupInProgressError(RuntimeError):
+    """Raised when a backup is requested while another one is still running"""
+
+class BackupService:
+    """
+    Online database backups.
+
+    SQLite databases are copied with the SQLite backup API a few pages at a time, which
+    yields a consistent snapshot while the app keeps serving writes (copying the live
+    file can capture a half-written transaction). Other databases are written as a
+    logical NDJSON dump, streamed table by table inside one repeatable-read transaction.
+
+    A backup is verified before it is kept: the SQLite copy must pass an integrity check
+    and every table must be readable; a dump is read back and its row counts compared.
+    It is then compressed (BACKUP_COMPRESSION), copied to every BACKUP_DESTINATIONS
+    directory, and files beyond BACKUP_RETENTION are removed from each of them.
+
+    create_backup() blocks; routes run it in a worker thread and `status` reports progress.
+    """
+
+    FILE_PREFIX = "roadmap_backup_"
+    STEP_SLEEP_SECONDS = 0.005  # Pause between backup steps so writers get the database
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = {"state": "idle"}
+
+    def database_path(self) -> Optional[str]:
+        """Path of the SQLite database file, or None for other databases and in-memory SQLite"""
+        url = engine.url
+        if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+            return None
+        return os.path.abspath(url.database)
+
+    def create_backup(self) -> dict:
+        """Back up, verify, compress, copy and rotate; returns a summary of the backup"""
+        if not self._lock.acquire(blocking=False):
+            raise BackupInProgressError("A backup is already running")
+
+        started_at = datetime.utcnow()
+        self.status = {"state": "running", "started_at": started_at.isoformat(), "progress": 0.0}
+        destination = settings.BACKUP_DESTINATIONS[0]
+        name = f"{self.FILE_PREFIX}{started_at.strftime('%Y%m%d_%H%M%S_%f')}"
+        try:
+            os.makedirs(destination, exist_ok=True)
+
+            db_path = self.database_path()
+            if db_path:
+                method = "sqlite_backup"
+                backup_path, tables = self.sqlite_snapshot(db_path, os.path.join(destination, f"{name}.db"), self._on_progress)
+            else:
+                method = "logical_dump"
+                backup_path, tables = self._logical_dump(os.path.join(destination, f"{name}.ndjson"))
+
+            backup_path = compress_file(backup_path)
+            copies = self._copy_to_destinations(backup_path)
+            for directory in settings.BACKUP_DESTINATIONS:
+                self._rotate(directory)
+
+            result = {
+                "backup_file": os.path.basename(backup_path),
+                "backup_path": os.path.abspath(backup_path),
+                "copies": copies,
+                "method": method,
+                "compression": settings.BACKUP_COMPRESSION,
+                "size_bytes": os.path.getsize(backup_path),
+                "tables": tables,
+                "verified": True,
+                "created_at": started_at.isoformat(),
+                "duration_seconds": round((datetime.utcnow() - started_at).total_seconds(), 3)
+            }
+            self.status = {"state": "completed", "progress": 100.0, **result}
+            logger.info(f"Backup written to {result['backup_path']} ({result['size_bytes']} bytes)")
+            return result
+
+        except Exception as e:
+            self.status = {"state": "failed", "started_at": started_at.isoformat(), "error": str(e)}
+            self._remove_partial_files(destination, name)
+            raise
+        finally:
+            self._lock.release()
+
+    def list_backups(self) -> List[dict]:
+        """Backups in the primary destination, newest first"""
+        directory = settings.BACKUP_DESTINATIONS[0]
+        return [
+            {
+                "backup_file": name,
+                "size_bytes": os.path.getsize(os.path.join(directory, name)),
+                "modified_at": datetime.utcfromtimestamp(os.path.getmtime(os.path.join(directory, name))).isoformat()
+            }
+            for name in reversed(self._backup_files(directory))
+        ]
+
+    def sqlite_snapshot(self, db_path: str, path: str, progress=None):
+        """Copy a live SQLite database with the backup API and verify the copy; returns (path, row counts)"""
+        partial = f"{path}.partial"
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(partial)
+        try:
+            source.backup(
+                target,
+                pages=settings.BACKUP_PAGES_PER_STEP,
+                progress=progress,
+                sleep=self.STEP_SLEEP_SECONDS
+            )
+            # The copy inherits WAL mode from the source; a standalone file should not
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            target.close()
+            source.close()
+
+        try:
+            tables = self.verify_sqlite(partial)
+        except Exception:
+            os.remove(partial)
+            raise
+        os.replace(partial, path)
+        return path, tables
+
+    def _on_progress(self, status: int, remaining: int, total: int) -> None:
+        if total:
+            self.status["progress"] = round((total - remaining) * 100.0 / total, 1)
+            self.status["pages_total"] = total
+
+    def verify_sqlite(self, path: str) -> Dict[str, int]:
+        """Open the copy read-only, check its integrity and read every table; returns row counts"""
+        connection = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            result = connection.execute("PRAGMA integrity_check").fetchone()[0]
+            if result != "ok":
+                raise RuntimeError(f"Backup failed the integrity check: {result}")
+
+            existing = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            missing = [table.name for table in Base.metadata.sorted_tables if table.name not in existing]
+            if missing:
+                raise RuntimeError(f"Backup is missing tables: {', '.join(missing)}")
+
+            return {
+                table.name: connection.execute(f'SELECT COUNT(*) FROM "{table.name}"').fetchone()[0]
+                for table in Base.metadata.sorted_tables
+            }
+        finally:
+            connection.close()
+
+    def _logical_dump(self, path: str):
+        """One JSON line per row ({"table": ..., "row": {...}}), parents before children"""
+        partial = f"{path}.partial"
+        tables = Base.metadata.sorted_tables
+        counts = {}
+
+        # One transaction so the dump is a single snapshot
+        with engine.connect().execution_options(isolation_level="REPEATABLE READ") as connection, \
+                open(partial, "w", encoding="utf-8") as output:
+            for position, table in enumerate(tables):
+                count = 0
+                rows = connection.execution_options(yield_per=1000).execute(select(table))
+                for row in rows:
+                    output.write(json.dumps({"table": table.name, "row": dict(row._mapping)}, default=self._json_default) + "\n")
+                    count += 1
+                counts[table.name] = count
+                self.status["progress"] = round((position + 1) * 100.0 / len(tables), 1)
+
+        self._verify_dump(partial, counts)
+        os.replace(partial, path)
+        return path, counts
+
+    def _verify_dump(self, path: str, counts: Dict[str, int]) -> None:
+        """Read the dump back and compare its row counts with what was written"""
+        read_counts = dict.fromkeys(counts, 0)
+        with open(path, encoding="utf-8") as dump:
+            for line in dump:
+                read_counts[json.loads(line)["table"]] += 1
+        if read_counts != counts:
+            raise RuntimeError("Backup dump row counts do not match the database")
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, bytes):
+            return base64.b64encode(value).decode("ascii")
+        return str(value)
+
+    def _copy_to_destinations(self, path: str) -> List[str]:
+        copies = []
+        for directory in settings.BACKUP_DESTINATIONS[1:]:
+            os.makedirs(directory, exist_ok=True)
+            copy = os.path.join(directory, os.path.basename(path))
+            shutil.copyfile(path, f"{copy}.partial")
+            os.replace(f"{copy}.partial", copy)
+            copies.append(os.path.abspath(copy))
+        return copies
+
+    def _backup_files(self, directory: str) -> List[str]:
+        """Finished backups in a directory, oldest first (names sort by timestamp)"""
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            name for name in os.listdir(directory)
+            if name.startswith(self.FILE_PREFIX) and not name.endswith(".partial")
+        )
+
+    def _remove_partial_files(self, directory: str, name: str) -> None:
+        if not os.path.isdir(directory):
+            return
+        for leftover in os.listdir(directory):
+            if leftover.startswith(name) and leftover.endswith(".partial"):
+                os.remove(os.path.join(directory, leftover))
+
+    def _rotate(self, directory: str) -> None:
+        if settings.BACKUP_RETENTION <= 0:
+            return
+        for name in self._backup_files(directory)[:-settings.BACKUP_RETENTION]:
+            os.remove(os.path.join(directory, name))
+            logger.info(f"Removed old backup {name}")
@@ -1,6 +1,10 @@
 from sqlalchemy.orm import Session
 from app.models.database import Conversation, Message, Roadmap as RoadmapDB
 from app.models.api_schemas import ConversationState, ChatMessage, Roadmap
+from app.core.serialization import compute_roadmap_hash
+from app.core.etag import make_etag
+from app.core.events import event_bus
+from sqlalchemy import func
 from typing import Optional
 import json
 from datetime import datetime
@@ -60,7 +64,9 @@ class DatabaseService:
             return False
     
     def save_roadmap(self, db: Session, conversation_id: int, roadmap: Roadmap, user_id: int) -> bool:
-        """Save or update roadmap in database"""
+        """Save or update roadmap in database (skips the write when the content is unchanged)"""
+        from app.services import roadmap_version_service, roadmap_service
+        
         try:
             # Find existing roadmap or create new one
             db_roadmap = db.query(RoadmapDB).filter(
@@ -68,17 +74,27 @@ class DatabaseService:
             ).first()
 
             roadmap_data = roadmap.dict()
+            roadmap_hash = compute_roadmap_hash(roadmap_data)
 
             if not db_roadmap:
                 db_roadmap = RoadmapDB(
                     conversation_id=conversation_id,
                     user_id=user_id,
-                    roadmap_data=roadmap_data
+                    roadmap_data=roadmap_data,
+                    roadmap_hash=roadmap_hash
                 )
                 db.add(db_roadmap)
-            else:
+                db.flush()
+                roadmap_version_service.record_version(db, db_roadmap.id, None, roadmap_data, roadmap_hash)
+                event_bus.emit(db, user_id, "roadmap.updated", roadmap_id=db_roadmap.id, conversation_id=conversation_id)
+            elif db_roadmap.roadmap_hash != roadmap_hash:
+                # Keep the previous content as a delta in the version history
+                previous_data = roadmap_service.get_conversation_roadmap(db, db_roadmap)
+                roadmap_version_service.record_version(db, db_roadmap.id, previous_data, roadmap_data, roadmap_hash)
                 db_roadmap.roadmap_data = roadmap_data
+                db_roadmap.roadmap_hash = roadmap_hash
                 db_roadmap.updated_at = datetime.utcnow()
+                event_bus.emit(db, user_id, "roadmap.updated", roadmap_id=db_roadmap.id, conversation_id=conversation_id)
 
             # ALSO update the project's roadmap_data if this conversation is linked to a project
             db_conversation = db.query(Conversation).filter(
@@ -91,11 +107,18 @@ class DatabaseService:
                     Project.id == db_conversation.project_id
                 ).first()
 
-                if db_project:
+                if db_project and db_project.roadmap_hash != roadmap_hash:
                     db_project.roadmap_data = roadmap_data
+                    db_project.roadmap_hash = roadmap_hash
+                    db_project.has_roadmap = True
                     db_project.updated_at = datetime.utcnow()
+                    roadmap_service.sync_project_roadmap(db, db_project.id, roadmap_data)
+                    # Other conversations of the project (this roadmap already has the hash)
+                    roadmap_service.project_roadmap_replaced(db, db_project.id, roadmap_data, roadmap_hash)
+                    event_bus.emit(db, db_project.user_id, "roadmap.updated", project_id=db_project.id)
                     print(f"✅ Updated project {db_project.id} with roadmap data")
 
+            # Nothing is flushed when both hashes matched, so this commit writes no rows
             db.commit()
             return True
 
@@ -106,6 +129,8 @@ class DatabaseService:
     
     def save_messages(self, db: Session, conversation_id: int, messages: list[ChatMessage]) -> bool:
         """Save messages to database (only new ones)"""
+        from app.services import search_service
+        
         try:
             # Get existing message count
             existing_count = db.query(Message).filter(
@@ -115,6 +140,7 @@ class DatabaseService:
             # Save only new messages
             new_messages = messages[existing_count:]
             
+            db_messages = []
             for msg in new_messages:
                 db_message = Message(
                     conversation_id=conversation_id,
@@ -124,7 +150,10 @@ class DatabaseService:
                     timestamp=datetime.fromisoformat(msg.timestamp) if msg.timestamp else datetime.utcnow()
                 )
                 db.add(db_message)
+                db_messages.append(db_message)
             
+            db.flush()
+            search_service.index_messages(db, [message.id for message in db_messages])
             db.commit()
             return True
             
@@ -135,6 +164,8 @@ class DatabaseService:
     
     def load_conversation_state(self, db: Session, session_id: str) -> Optional[ConversationState]:
         """Load conversation state from database"""
+        from app.services import roadmap_service
+        
         try:
             # Get conversation
             db_conversation = db.query(Conversation).filter(
@@ -164,8 +195,9 @@ class DatabaseService:
             ).first()
             
             current_roadmap = None
-            if db_roadmap and db_roadmap.roadmap_data:
-                current_roadmap = Roadmap(**db_roadmap.roadmap_data)
+            roadmap_data = roadmap_service.get_conversation_roadmap(db, db_roadmap) if db_roadmap else None
+            if roadmap_data:
+                current_roadmap = Roadmap(**roadmap_data)
             
             # Build conversation state
             from app.models.agent import ProjectSpecification
@@ -190,6 +222,8 @@ class DatabaseService:
     
     def load_roadmap(self, db: Session, session_id: str) -> Optional[Roadmap]:
         """Load roadmap for a session"""
+        from app.services import roadmap_service
+        
         try:
             # Get conversation
             db_conversation = db.query(Conversation).filter(
@@ -204,8 +238,9 @@ class DatabaseService:
                 RoadmapDB.conversation_id == db_conversation.id
             ).first()
             
-            if db_roadmap and db_roadmap.roadmap_data:
-                return Roadmap(**db_roadmap.roadmap_data)
+            roadmap_data = roadmap_service.get_conversation_roadmap(db, db_roadmap) if db_roadmap else None
+            if roadmap_data:
+                return Roadmap(**roadmap_data)
             
             return None
             
@@ -213,6 +248,42 @@ class DatabaseService:
             print(f"Error loading roadmap: {e}")
             return None
     
+    def get_roadmap_id(self, db: Session, session_id: str) -> Optional[int]:
+        """Get the roadmap row id for a session without loading the roadmap JSON"""
+        row = db.query(RoadmapDB.id).join(
+            Conversation, RoadmapDB.conversation_id == Conversation.id
+        ).filter(Conversation.session_id == session_id).first()
+        return row.id if row else None
+    
+    def get_roadmap_etag(self, db: Session, session_id: str) -> Optional[str]:
+        """ETag for a session's roadmap, computed without loading the roadmap JSON"""
+        row = db.query(RoadmapDB.id, RoadmapDB.updated_at, RoadmapDB.roadmap_hash).join(
+            Conversation, RoadmapDB.conversation_id == Conversation.id
+        ).filter(Conversation.session_id == session_id).first()
+        if not row:
+            return None
+        return make_etag(row.id, row.updated_at, row.roadmap_hash)
+    
+    def get_conversation_etag(self, db: Session, session_id: str) -> Optional[str]:
+        """ETag for a conversation state: conversation row, message log and roadmap version"""
+        db_conversation = db.query(Conversation.id, Conversation.updated_at).filter(
+            Conversation.session_id == session_id
+        ).first()
+        if not db_conversation:
+            return None
+        
+        # Messages are append-only, so count and last id identify the log
+        message_count, last_message_id = db.query(func.count(Message.id), func.max(Message.id)).filter(
+            Message.conversation_id == db_conversation.id
+        ).one()
+        roadmap = db.query(RoadmapDB.updated_at, RoadmapDB.roadmap_hash).filter(
+            RoadmapDB.conversation_id == db_conversation.id
+        ).first()
+        return make_etag(
+            db_conversation.id, db_conversation.updated_at, message_count, last_message_id,
+            roadmap.updated_at if roadmap else None, roadmap.roadmap_hash if roadmap else None
+        )
+    
     def delete_conversation(self, db: Session, session_id: str) -> bool:
         """Delete conversation and all associated data"""
         try:
@@ -225,11 +296,21 @@ class DatabaseService:
                 return False
             
             # Delete messages
+            from app.services import search_service
+            search_service.remove_conversation(db, db_conversation.id)
             db.query(Message).filter(
                 Message.conversation_id == db_conversation.id
             ).delete()
             
-            # Delete roadmap
+            # Delete roadmap and its version history
+            from app.services import roadmap_version_service, sync_service
+            roadmap_ids = [row.id for row in db.query(RoadmapDB.id).filter(
+                RoadmapDB.conversation_id == db_conversation.id
+            )]
+            roadmap_version_service.delete_versions(db, roadmap_ids)
+            sync_service.record_deletion(db, db_conversation.user_id, "roadmap", roadmap_ids)
+            sync_service.record_deletion(db, db_conversation.user_id, "conversation", [db_conversation.id])
+            event_bus.emit(db, db_conversation.user_id, "conversation.deleted", conversation_id=db_conversation.id)
             db.query(RoadmapDB).filter(
                 RoadmapDB.conversation_id == db_conversation.id
             ).delete()
@@ -269,16 +350,19 @@ class DatabaseService:
     
     def get_user_roadmaps(self, db: Session, user_id: int) -> list:
         """Get all roadmaps for a user"""
+        from app.services import roadmap_service
+        
         try:
             roadmaps = db.query(RoadmapDB).filter(
                 RoadmapDB.user_id == user_id
             ).order_by(RoadmapDB.updated_at.desc()).all()
             
+            contents = roadmap_service.get_conversation_roadmaps(db, roadmaps)
             return [
                 {
                     "id": roadmap.id,
                     "conversation_id": roadmap.conversation_id,
-                    "roadmap_data": roadmap.roadmap_data,
+                    "roadmap_data": contents[roadmap.id],
                     "created_at": roadmap.created_at.isoformat(),
                     "updated_at": roadmap.updated_at.isoformat()
                 }
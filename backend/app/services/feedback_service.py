@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Session
 from app.models.database import Feedback as FeedbackDB, User as UserDB
 from app.models.api_schemas import FeedbackCreate, FeedbackUpdate, FeedbackResponse
-from typing import List, Optional
+from app.core.pagination import keyset_page
+from sqlalchemy import func
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 class FeedbackService:
@@ -18,26 +20,39 @@ class FeedbackService:
         
         db.add(db_feedback)
         db.commit()
-        db.refresh(db_feedback)
         
-        return self._to_response(db_feedback, db)
+        return self.get_feedback_by_id(db, db_feedback.id)
     
-    def get_all_feedback(self, db: Session) -> List[FeedbackResponse]:
-        """Get all feedback (admin use)"""
-        db_feedback_list = db.query(FeedbackDB).order_by(FeedbackDB.created_at.desc()).all()
-        return [self._to_response(feedback, db) for feedback in db_feedback_list]
+    def get_all_feedback(
+        self,
+        db: Session,
+        status: Optional[str] = None,
+        feedback_type: Optional[str] = None,
+        limit: int = 100,
+        before_id: Optional[int] = None
+    ) -> Tuple[List[FeedbackResponse], int, Optional[int]]:
+        """Newest-first page of feedback (admin use); returns (feedback, total matching, next before_id)"""
+        query = self._response_query(db)
+        if status is not None:
+            query = query.filter(FeedbackDB.status == status)
+        if feedback_type is not None:
+            query = query.filter(FeedbackDB.feedback_type == feedback_type)
+        
+        total = query.with_entities(func.count(FeedbackDB.id)).scalar()
+        rows, next_before_id = keyset_page(query, FeedbackDB.id, limit, before_id)
+        return [self._to_response(row) for row in rows], total, next_before_id
     
     def get_user_feedback(self, db: Session, user_id: int) -> List[FeedbackResponse]:
         """Get feedback for a specific user"""
-        db_feedback_list = db.query(FeedbackDB).filter(FeedbackDB.user_id == user_id).order_by(FeedbackDB.created_at.desc()).all()
-        return [self._to_response(feedback, db) for feedback in db_feedback_list]
+        rows = self._response_query(db).filter(FeedbackDB.user_id == user_id).order_by(FeedbackDB.id.desc()).all()
+        return [self._to_response(row) for row in rows]
     
     def get_feedback_by_id(self, db: Session, feedback_id: int) -> Optional[FeedbackResponse]:
         """Get feedback by ID"""
-        db_feedback = db.query(FeedbackDB).filter(FeedbackDB.id == feedback_id).first()
-        if not db_feedback:
+        row = self._response_query(db).filter(FeedbackDB.id == feedback_id).first()
+        if not row:
             return None
-        return self._to_response(db_feedback, db)
+        return self._to_response(row)
     
     def update_feedback(self, db: Session, feedback_id: int, feedback_update: FeedbackUpdate) -> Optional[FeedbackResponse]:
         """Update feedback (admin use)"""
@@ -53,9 +68,8 @@ class FeedbackService:
         
         db_feedback.updated_at = datetime.utcnow()
         db.commit()
-        db.refresh(db_feedback)
         
-        return self._to_response(db_feedback, db)
+        return self.get_feedback_by_id(db, feedback_id)
     
     def delete_feedback(self, db: Session, feedback_id: int) -> bool:
         """Delete feedback"""
@@ -67,22 +81,35 @@ class FeedbackService:
         db.commit()
         return True
     
-    def _to_response(self, db_feedback: FeedbackDB, db: Session) -> FeedbackResponse:
-        """Convert database feedback to response model"""
-        # Get user info
-        user = db.query(UserDB).filter(UserDB.id == db_feedback.user_id).first()
-        user_email = user.email if user else None
-        user_name = f"{user.first_name} {user.last_name}" if user and user.first_name and user.last_name else None
+    def _response_query(self, db: Session):
+        """Feedback columns with the author's email and name, fetched in the same query"""
+        return db.query(
+            FeedbackDB.id,
+            FeedbackDB.user_id,
+            FeedbackDB.feedback_type,
+            FeedbackDB.message,
+            FeedbackDB.status,
+            FeedbackDB.admin_notes,
+            FeedbackDB.created_at,
+            FeedbackDB.updated_at,
+            UserDB.email.label("user_email"),
+            UserDB.first_name.label("user_first_name"),
+            UserDB.last_name.label("user_last_name")
+        ).outerjoin(UserDB, FeedbackDB.user_id == UserDB.id)
+    
+    def _to_response(self, row) -> FeedbackResponse:
+        """Convert a _response_query row to the response model"""
+        user_name = f"{row.user_first_name} {row.user_last_name}" if row.user_first_name and row.user_last_name else None
         
         return FeedbackResponse(
-            id=db_feedback.id,
-            user_id=db_feedback.user_id,
-            feedback_type=db_feedback.feedback_type,
-            message=db_feedback.message,
-            status=db_feedback.status,
-            admin_notes=db_feedback.admin_notes,
-            created_at=db_feedback.created_at,
-            updated_at=db_feedback.updated_at,
-            user_email=user_email,
+            id=row.id,
+            user_id=row.user_id,
+            feedback_type=row.feedback_type,
+            message=row.message,
+            status=row.status,
+            admin_notes=row.admin_notes,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            user_email=row.user_email,
             user_name=user_name
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,99 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from app.core.config import settings
+
+SCRYPT_HASH = re.compile(r"^\$scrypt\$ln=(\d+),r=(\d+),p=(\d+)\$([A-Za-z0-9+/]+)\$([A-Za-z0-9+/]+)$")
+LEGACY_SHA256_HASH = re.compile(r"^[0-9a-f]{64}$")
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+class PasswordService:
+    """
+    Password hashing with scrypt (memory-hard, in the standard library).
+
+    Hashes are stored as "$scrypt$ln=<log2 N>,r=<r>,p=<p>$<salt>$<hash>", so the cost
+    (PASSWORD_SCRYPT_*) can be raised later: verify() reports hashes made with other
+    parameters, and the legacy formats (unsalted sha256 hex, and plain text stored by
+    older admin-created users), as needing a rehash, which login does transparently.
+
+    One hash takes tens of milliseconds of CPU. The async methods run it in a pool of
+    PASSWORD_HASH_WORKERS threads (scrypt releases the GIL, so they run in parallel)
+    so a login never stalls the event loop; the pool size also caps the CPU and memory
+    (128 * r * N bytes per hash) that a burst of logins can take.
+    """
+
+    SALT_BYTES = 16
+    HASH_BYTES = 32
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured cost (blocking; see hash_async)"""
+        log_n, r, p = settings.PASSWORD_SCRYPT_LOG_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P
+        salt = os.urandom(self.SALT_BYTES)
+        digest = self._scrypt(password, salt, log_n, r, p)
+        return f"$scrypt$ln={log_n},r={r},p={p}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password: str, stored_hash: Optional[str]) -> Tuple[bool, bool]:
+        """Check a password against a stored hash; returns (matches, needs_rehash) (blocking)"""
+        if not stored_hash or password is None:
+            return False, False
+
+        match = SCRYPT_HASH.match(stored_hash)
+        if match:
+            log_n, r, p = (int(value) for value in match.group(1, 2, 3))
+            digest = self._scrypt(password, _b64decode(match.group(4)), log_n, r, p)
+            matches = hmac.compare_digest(digest, _b64decode(match.group(5)))
+            current = (log_n, r, p) == (
+                settings.PASSWORD_SCRYPT_LOG_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P
+            )
+            return matches, matches and not current
+
+        if LEGACY_SHA256_HASH.match(stored_hash):
+            candidate = hashlib.sha256(password.encode()).hexdigest()
+        else:
+            candidate = password
+        matches = hmac.compare_digest(candidate.encode(), stored_hash.encode())
+        return matches, matches
+
+    async def hash_async(self, password: str) -> str:
+        """hash() in the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._pool(), self.hash, password)
+
+    async def verify_async(self, password: str, stored_hash: Optional[str]) -> Tuple[bool, bool]:
+        """verify() in the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._pool(), self.verify, password, stored_hash)
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    def _scrypt(self, password: str, salt: bytes, log_n: int, r: int, p: int) -> bytes:
+        n = 1 << log_n
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p,
+            maxmem=128 * r * (n + p) + 1024 * 1024, dklen=self.HASH_BYTES
+        )
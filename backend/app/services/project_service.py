@@ -1,7 +1,13 @@
 from sqlalchemy.orm import Session
-from app.models.database import Project as ProjectDB, Task as TaskDB
+from app.models.database import Project as ProjectDB, Task as TaskDB, User as UserDB
 from app.models.api_schemas import ProjectCreate, ProjectUpdate, Roadmap, TasksByType, TaskResponse
-from typing import List, Optional
+from app.core.serialization import compute_roadmap_hash
+from app.core.etag import make_etag, precondition_failed
+from app.core.events import event_bus
+from app.core.pagination import prefix_match, keyset_page
+from app.core.identity_cache import identity_cache
+from sqlalchemy import func
+from typing import List, Optional, Tuple
 from datetime import datetime
 import json
 
@@ -10,6 +16,8 @@ class ProjectService:
     
     def create_project(self, db: Session, project_data: ProjectCreate, user_id: int) -> ProjectDB:
         """Create a new project for a user with default tasks"""
+        from app.services import user_service, search_service
+        
         db_project = ProjectDB(
             user_id=user_id,
             name=project_data.name,
@@ -17,6 +25,7 @@ class ProjectService:
             status=project_data.status
         )
         db.add(db_project)
+        user_service.adjust_project_count(db, user_id, 1)
         db.commit()
         db.refresh(db_project)
         
@@ -43,6 +52,9 @@ class ProjectService:
             )
             db.add(db_task)
         
+        search_service.index_projects(db, [db_project.id])
+        search_service.index_tasks(db, project_ids=[db_project.id])
+        event_bus.emit(db, user_id, "project.created", project_id=db_project.id)
         db.commit()
         return db_project
     
@@ -54,13 +66,18 @@ class ProjectService:
     
     def get_project(self, db: Session, project_id: int, user_id: int) -> Optional[ProjectDB]:
         """Get a specific project by ID for a user"""
-        return db.query(ProjectDB).filter(
+        db_project = db.query(ProjectDB).filter(
             ProjectDB.id == project_id,
             ProjectDB.user_id == user_id
         ).first()
+        if db_project:
+            identity_cache.remember_project(db, project_id, user_id)
+        return db_project
     
     def update_project(self, db: Session, project_id: int, user_id: int, project_update: ProjectUpdate) -> Optional[ProjectDB]:
         """Update a project"""
+        from app.services import search_service
+        
         db_project = self.get_project(db, project_id, user_id)
         if not db_project:
             return None
@@ -74,38 +91,165 @@ class ProjectService:
             db_project.status = project_update.status
         if project_update.roadmap_data is not None:
             # Convert Pydantic model to dict for JSON storage
-            db_project.roadmap_data = project_update.roadmap_data.dict()
+            self._set_roadmap(db, db_project, project_update.roadmap_data.dict())
         
         db_project.updated_at = datetime.utcnow()
+        search_service.index_projects(db, [project_id])
+        event_bus.emit(db, user_id, "project.updated", project_id=project_id)
         db.commit()
         db.refresh(db_project)
         return db_project
     
     def delete_project(self, db: Session, project_id: int, user_id: int) -> bool:
         """Delete a project"""
+        from app.services import sync_service, user_service, search_service
+        
         db_project = self.get_project(db, project_id, user_id)
         if not db_project:
             return False
         
+        # Its tasks go with it; clients drop them when they see the project tombstone
+        sync_service.record_deletion(db, user_id, "project", [project_id])
+        event_bus.emit(db, user_id, "project.deleted", project_id=project_id)
+        search_service.remove_projects(db, [project_id])
+        identity_cache.forget_project(db, project_id)
         db.delete(db_project)
+        user_service.adjust_project_count(db, user_id, -1)
         db.commit()
         return True
     
-    def update_project_roadmap(self, db: Session, project_id: int, user_id: int, roadmap: Roadmap) -> Optional[ProjectDB]:
-        """Update the roadmap for a project"""
+    def update_project_roadmap(self, db: Session, project_id: int, user_id: int, roadmap: Roadmap) -> Tuple[Optional[ProjectDB], bool]:
+        """
+        Update the roadmap for a project; returns (project, whether anything was written).
+        Nothing is written or committed when the roadmap is unchanged; the caller decides
+        what to do with its own pending changes then.
+        """
         db_project = self.get_project(db, project_id, user_id)
         if not db_project:
-            return None
+            return None, False
+        
+        if not self._set_roadmap(db, db_project, roadmap.dict()):
+            return db_project, False
         
-        db_project.roadmap_data = roadmap.dict()
         db_project.updated_at = datetime.utcnow()
+        event_bus.emit(db, user_id, "roadmap.updated", project_id=project_id)
         db.commit()
         db.refresh(db_project)
-        return db_project
+        return db_project, True
+    
+    def _set_roadmap(self, db: Session, db_project: ProjectDB, roadmap_data: dict) -> bool:
+        """
+        Assign roadmap data, its hash and normalized rows, and version the roadmaps of the
+        project's conversations; returns False if the content is unchanged
+        """
+        from app.services import roadmap_service
+        
+        roadmap_hash = compute_roadmap_hash(roadmap_data)
+        if db_project.roadmap_hash == roadmap_hash:
+            return False
+        
+        db_project.roadmap_data = roadmap_data
+        db_project.roadmap_hash = roadmap_hash
+        db_project.has_roadmap = True
+        roadmap_service.sync_project_roadmap(db, db_project.id, roadmap_data)
+        roadmap_service.project_roadmap_replaced(db, db_project.id, roadmap_data, roadmap_hash)
+        return True
+    
+    def list_all_projects(
+        self,
+        db: Session,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        has_roadmap: Optional[bool] = None,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+        before_id: Optional[int] = None
+    ) -> Tuple[List, int, Optional[int]]:
+        """Newest-first page of all projects with their owner, for the admin panel (roadmap_data is not loaded)"""
+        query = db.query(
+            ProjectDB.id,
+            ProjectDB.name,
+            ProjectDB.description,
+            ProjectDB.status,
+            ProjectDB.has_roadmap,
+            ProjectDB.created_at,
+            ProjectDB.updated_at,
+            UserDB.first_name,
+            UserDB.last_name,
+            UserDB.email
+        ).join(UserDB, ProjectDB.user_id == UserDB.id)
+        if search:
+            query = query.filter(prefix_match(ProjectDB.name, term=search))
+        if status is not None:
+            query = query.filter(ProjectDB.status == status)
+        if has_roadmap is not None:
+            query = query.filter(ProjectDB.has_roadmap == has_roadmap)
+        if user_id is not None:
+            query = query.filter(ProjectDB.user_id == user_id)
+        
+        total = query.with_entities(func.count(ProjectDB.id)).scalar()
+        projects, next_before_id = keyset_page(query, ProjectDB.id, limit, before_id)
+        return projects, total, next_before_id
+    
+    def get_project_etag(self, db: Session, project_id: int, user_id: int) -> Optional[str]:
+        """ETag for a project response, computed from version columns without loading roadmap_data"""
+        version = self._get_project_version(db, project_id, user_id)
+        return version[0] if version else None
+    
+    def claim_if_match(self, db: Session, project_id: int, user_id: int, if_match: Optional[str]) -> Optional[bool]:
+        """
+        Check an If-Match header before a write to the project, atomically: when it
+        holds, the project's updated_at is bumped with UPDATE ... WHERE updated_at =
+        <the value the ETag was built from>, so of two writers carrying the same ETag
+        only the first one updates a row and the other gets False. The write must
+        follow in the same transaction (the caller commits; a rollback drops the claim).
+        Returns None when the project does not exist, True without If-Match.
+        """
+        version = self._get_project_version(db, project_id, user_id)
+        if version is None:
+            return None
+        etag, updated_at = version
+        if not if_match:
+            return True
+        if precondition_failed(if_match, etag):
+            return False
+        claimed = db.query(ProjectDB).filter(
+            ProjectDB.id == project_id,
+            ProjectDB.updated_at == updated_at
+        ).update({ProjectDB.updated_at: datetime.utcnow()}, synchronize_session=False)
+        return claimed == 1
+    
+    def _get_project_version(self, db: Session, project_id: int, user_id: int) -> Optional[Tuple[str, Optional[datetime]]]:
+        """(ETag, updated_at it was built from), or None if the user has no such project"""
+        project = db.query(ProjectDB.updated_at, ProjectDB.roadmap_hash).filter(
+            ProjectDB.id == project_id,
+            ProjectDB.user_id == user_id
+        ).first()
+        if not project:
+            return None
+        
+        # The response embeds the active tasks, so their state is part of the version
+        task_count, task_updated_at = db.query(func.count(TaskDB.id), func.max(TaskDB.updated_at)).filter(
+            TaskDB.project_id == project_id,
+            TaskDB.archive != True
+        ).one()
+        etag = make_etag(project_id, project.updated_at, project.roadmap_hash, task_count, task_updated_at)
+        return etag, project.updated_at
     
     def project_exists(self, db: Session, project_id: int, user_id: int) -> bool:
-        """Check if a project exists for a user"""
-        return self.get_project(db, project_id, user_id) is not None
+        """Check if a project exists for a user (cached; see app.core.identity_cache)"""
+        return self.get_owner_id(db, project_id) == user_id
+    
+    def get_owner_id(self, db: Session, project_id: int) -> Optional[int]:
+        """User who owns a project, or None if there is no such project (cached)"""
+        owner_id = identity_cache.project_owner(db, project_id)
+        if owner_id is not None:
+            return owner_id
+        row = db.query(ProjectDB.user_id).filter(ProjectDB.id == project_id).first()
+        if row is None:
+            return None
+        identity_cache.remember_project(db, project_id, row.user_id)
+        return row.user_id
     
     def get_project_with_tasks(self, db: Session, project_id: int, user_id: int) -> Optional[ProjectDB]:
         """Get a project with its tasks included"""
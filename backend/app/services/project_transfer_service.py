@@ -0,0 +1,149 @@
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from app.models.database import Project as ProjectDB, Task as TaskDB, Epic as EpicDB, Story as StoryDB
+from app.models.api_schemas import ProjectTransferLine
+from app.core.events import event_bus
+from app.core.serialization import compute_roadmap_hash, json_dumps, json_loads
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+from datetime import datetime
+
+class ProjectTransferService:
+    """
+    Project export/import as NDJSON: one line per project holding the project, its
+    roadmap and all of its tasks (archived ones included).
+
+    Both directions work in chunks of CHUNK_SIZE projects, so memory use depends on
+    the chunk size and not on how many projects are moved. Export reads projects
+    through a streaming cursor (yield_per) and loads roadmaps and tasks per chunk.
+    Import inserts each chunk with a few multi-row statements and commits it.
+    """
+
+    CHUNK_SIZE = 200  # Projects per export fetch and per import transaction
+    MAX_ERRORS = 100  # Line errors reported back by an import
+
+    def export_projects(self, db: Session, user_id: int) -> Iterator[str]:
+        """Yield the user's projects as NDJSON, one chunk of lines at a time"""
+        from app.services import roadmap_service
+
+        query = select(ProjectDB).where(
+            ProjectDB.user_id == user_id
+        ).order_by(ProjectDB.id).execution_options(yield_per=self.CHUNK_SIZE)
+
+        # The session's identity map only holds weak references, so each chunk's rows
+        # are released once the next chunk replaces them
+        for projects in db.execute(query).scalars().partitions():
+            roadmaps = roadmap_service.get_project_roadmaps(db, projects)
+            tasks = self._tasks_by_project(db, [project.id for project in projects])
+            yield "".join(
+                json_dumps(self._export_line(project, roadmaps[project.id], tasks[project.id])) + "\n"
+                for project in projects
+            )
+
+    def import_lines(self, db: Session, user_id: int, lines: List[Tuple[int, bytes]]) -> dict:
+        """
+        Import one chunk of (line number, NDJSON line) pairs in a single transaction.
+        Lines that fail to parse or validate are skipped and reported; the rest are inserted.
+        """
+        from app.services import roadmap_service, task_service, user_service, search_service
+
+        entries, errors = [], []
+        for line_number, line in lines:
+            try:
+                entry = ProjectTransferLine(**json_loads(line))
+                for task in entry.tasks:
+                    if task.task_type not in task_service.TASK_TYPES:
+                        raise ValueError("Task type must be 'daily-todos' or 'your-ideas'")
+                entries.append(entry)
+            except ValidationError as e:
+                error = e.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                errors.append({"line": line_number, "error": f"{location}: {error['msg']}"})
+            except (ValueError, TypeError) as e:
+                errors.append({"line": line_number, "error": str(e) or "Invalid JSON"})
+
+        if not entries:
+            return {"imported": 0, "errors": errors}
+
+        now = datetime.utcnow()
+        project_rows = []
+        for entry in entries:
+            roadmap_data = entry.roadmap.dict() if entry.roadmap is not None else None
+            project_rows.append({
+                "user_id": user_id,
+                "name": entry.project.name,
+                "description": entry.project.description,
+                "status": entry.project.status,
+                "roadmap_data": roadmap_data,
+                "roadmap_hash": compute_roadmap_hash(roadmap_data),
+                "has_roadmap": roadmap_data is not None,
+                "created_at": entry.project.created_at or now,
+                "updated_at": now
+            })
+
+        # One multi-row INSERT; ids are assigned in row order, so sorted ids follow the entries
+        project_ids = sorted(db.execute(insert(ProjectDB).values(project_rows).returning(ProjectDB.id)).scalars())
+
+        task_rows, epic_rows, story_rows = [], [], []
+        for project_id, entry, project_row in zip(project_ids, entries, project_rows):
+            task_rows.extend({
+                "project_id": project_id,
+                "text": task.text,
+                "completed": task.completed,
+                "task_type": task.task_type,
+                "archive": task.archive,
+                "created_at": task.created_at or now,
+                "updated_at": now
+            } for task in entry.tasks)
+            epics, stories = roadmap_service.roadmap_rows(project_id, project_row["roadmap_data"])
+            epic_rows.extend(epics)
+            story_rows.extend(stories)
+
+        if task_rows:
+            db.bulk_insert_mappings(TaskDB, task_rows)
+        if epic_rows:
+            db.bulk_insert_mappings(EpicDB, epic_rows)
+        if story_rows:
+            db.bulk_insert_mappings(StoryDB, story_rows)
+
+        user_service.adjust_project_count(db, user_id, len(project_ids))
+        search_service.index_projects(db, project_ids)
+        search_service.index_roadmaps(db, project_ids)
+        search_service.index_tasks(db, project_ids=project_ids)
+        event_bus.emit(db, user_id, "project.created", project_ids=project_ids)
+        db.commit()
+        return {"imported": len(project_ids), "errors": errors}
+
+    def _tasks_by_project(self, db: Session, project_ids: List[int]) -> Dict[int, List[TaskDB]]:
+        """All tasks (archived included) of a chunk of projects in one query"""
+        tasks_by_project = defaultdict(list)
+        tasks = db.query(TaskDB).filter(
+            TaskDB.project_id.in_(project_ids)
+        ).order_by(TaskDB.project_id, TaskDB.id).all()
+        for task in tasks:
+            tasks_by_project[task.project_id].append(task)
+        return tasks_by_project
+
+    def _export_line(self, project: ProjectDB, roadmap_data, tasks: List[TaskDB]) -> dict:
+        return {
+            "project": {
+                "id": project.id,
+                "name": project.name,
+                "description": project.description,
+                "status": project.status,
+                "created_at": project.created_at.isoformat() if project.created_at else None,
+                "updated_at": project.updated_at.isoformat() if project.updated_at else None
+            },
+            "roadmap": roadmap_data,
+            "tasks": [
+                {
+                    "text": task.text,
+                    "completed": task.completed,
+                    "task_type": task.task_type,
+                    "archive": task.archive or False,
+                    "created_at": task.created_at.isoformat() if task.created_at else None
+                }
+                for task in tasks
+            ]
+        }
@@ -0,0 +1,445 @@
+import logging
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.database import (
+    Project as ProjectDB, Epic as EpicDB, Story as StoryDB,
+    Conversation as ConversationDB, Roadmap as RoadmapDB
+)
+from app.models.api_schemas import Story, StoryUpdate, UpdateEpic
+from app.core.events import event_bus
+from app.core.serialization import compute_roadmap_hash
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class RoadmapService:
+    """Service for the normalized epics/stories tables that back project roadmaps"""
+
+    def sync_project_roadmap(self, db: Session, project_id: int, roadmap_data: Optional[dict]) -> None:
+        """Replace the normalized epic/story rows of a project (caller commits)"""
+        from app.services import search_service
+
+        db.query(StoryDB).filter(StoryDB.project_id == project_id).delete(synchronize_session=False)
+        db.query(EpicDB).filter(EpicDB.project_id == project_id).delete(synchronize_session=False)
+
+        epics, stories = self.roadmap_rows(project_id, roadmap_data)
+        if epics:
+            db.bulk_insert_mappings(EpicDB, epics)
+        if stories:
+            db.bulk_insert_mappings(StoryDB, stories)
+        search_service.index_roadmaps(db, [project_id])
+
+    def roadmap_rows(self, project_id: int, roadmap_data: Optional[dict]) -> Tuple[List[dict], List[dict]]:
+        """
+        Epic and story row mappings for a roadmap dict, ready for a bulk insert. Legacy
+        roadmaps (roadmapNodes/subtasks, as get_stories reads them) are accepted too.
+        Rows replace the blob's epics in the compatibility view, so a roadmap is
+        normalized completely or not at all: if any epic or story has no integer id it
+        cannot be addressed by row, no rows are returned and the project keeps being
+        served from its JSON blob.
+        """
+        epics, stories = [], []
+        if not roadmap_data:
+            return epics, stories
+
+        story_position = 0
+        epic_entries = roadmap_data.get("epics") or roadmap_data.get("roadmapNodes") or []
+        for epic_position, epic in enumerate(epic_entries):
+            epic_id = self._roadmap_id(epic)
+            if epic_id is None:
+                return self._unaddressable(project_id, "an epic")
+            epics.append({
+                "project_id": project_id,
+                "epic_id": epic_id,
+                "name": epic.get("name") or epic.get("title") or "",
+                "priority": epic.get("priority"),
+                "description": epic.get("description"),
+                "position": epic_position
+            })
+            for story in epic.get("stories") or epic.get("subtasks") or []:
+                story_id = self._roadmap_id(story)
+                if story_id is None:
+                    return self._unaddressable(project_id, f"a story of epic {epic_id}")
+                stories.append({
+                    "project_id": project_id,
+                    "epic_id": epic_id,
+                    "story_id": story_id,
+                    "title": story.get("title") or story.get("name") or "",
+                    "acceptance_criteria": story.get("acceptance_criteria") or [],
+                    "completed": bool(story.get("completed", False)),
+                    "position": story_position
+                })
+                story_position += 1
+
+        return epics, stories
+
+    @staticmethod
+    def _unaddressable(project_id: int, entry: str) -> Tuple[List[dict], List[dict]]:
+        logger.warning(f"Roadmap of project {project_id} is not normalized: {entry} has no integer id")
+        return [], []
+
+    @staticmethod
+    def _roadmap_id(entry) -> Optional[int]:
+        """Roadmap-local id of an epic or story dict (int or digit string), else None"""
+        value = entry.get("id") if isinstance(entry, dict) else None
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, int):
+            return value
+        if isinstance(value, str) and value.strip().isdigit():
+            return int(value)
+        return None
+
+    def is_normalized(self, db: Session, project_id: int) -> bool:
+        """Check whether a project's roadmap has been copied into the epics table"""
+        return db.query(EpicDB.id).filter(EpicDB.project_id == project_id).first() is not None
+
+    def get_project_roadmap(self, db: Session, db_project: ProjectDB) -> Optional[dict]:
+        """Compatibility view: build the roadmap dict for a single project"""
+        return self.get_project_roadmaps(db, [db_project]).get(db_project.id)
+
+    def get_project_roadmaps(self, db: Session, projects: List[ProjectDB]) -> Dict[int, Optional[dict]]:
+        """
+        Compatibility view: build roadmap dicts (Roadmap schema shape) for several projects
+        with two queries. Project info and architecture come from roadmap_data, epics and
+        stories from the normalized tables. Projects that were never normalized fall back to
+        the JSON blob. Stored roadmaps were validated on the way in, so the dicts are returned
+        as-is and only validated once, against the route's response_model.
+        """
+        project_ids = [project.id for project in projects if project.roadmap_data]
+
+        epics_by_project = defaultdict(list)
+        stories_by_epic = defaultdict(list)
+        if project_ids:
+            epic_rows = db.query(EpicDB).filter(
+                EpicDB.project_id.in_(project_ids)
+            ).order_by(EpicDB.position).all()
+            for epic in epic_rows:
+                epics_by_project[epic.project_id].append(epic)
+
+            story_rows = db.query(StoryDB).filter(
+                StoryDB.project_id.in_(project_ids)
+            ).order_by(StoryDB.position).all()
+            for story in story_rows:
+                stories_by_epic[(story.project_id, story.epic_id)].append(story)
+
+        roadmaps = {}
+        for project in projects:
+            if not project.roadmap_data:
+                roadmaps[project.id] = None
+                continue
+
+            roadmap_data = dict(project.roadmap_data)
+            if epics_by_project[project.id]:
+                # Legacy blobs keep their epics under roadmapNodes; the rows replace them
+                roadmap_data.pop("roadmapNodes", None)
+                roadmap_data["epics"] = [
+                    {
+                        "id": epic.epic_id,
+                        "name": epic.name,
+                        "priority": epic.priority,
+                        "description": epic.description,
+                        "stories": [
+                            self._story_to_dict(story)
+                            for story in stories_by_epic[(project.id, epic.epic_id)]
+                        ]
+                    }
+                    for epic in epics_by_project[project.id]
+                ]
+            roadmaps[project.id] = roadmap_data
+
+        return roadmaps
+
+    def get_conversation_roadmap(self, db: Session, db_roadmap: RoadmapDB) -> Optional[dict]:
+        """Content of a single agent session roadmap, see get_conversation_roadmaps"""
+        return self.get_conversation_roadmaps(db, [db_roadmap]).get(db_roadmap.id)
+
+    def get_conversation_roadmaps(self, db: Session, roadmaps: List[RoadmapDB]) -> Dict[int, Optional[dict]]:
+        """
+        Content of agent session roadmaps by roadmap id. Row-level edits of a project's
+        epics and stories do not rewrite the JSON of the roadmaps of its conversations;
+        they clear their roadmap_hash instead. Such a roadmap is served from the project's
+        compatibility view until the next full save rewrites its JSON.
+        """
+        contents = {roadmap.id: roadmap.roadmap_data for roadmap in roadmaps}
+        stale = {roadmap.conversation_id: roadmap.id for roadmap in roadmaps if roadmap.roadmap_hash is None}
+        if not stale:
+            return contents
+
+        linked = db.query(ConversationDB.id, ProjectDB).join(
+            ProjectDB, ConversationDB.project_id == ProjectDB.id
+        ).filter(ConversationDB.id.in_(list(stale))).all()
+        normalized = {
+            row.project_id for row in db.query(EpicDB.project_id).filter(
+                EpicDB.project_id.in_([project.id for _, project in linked])
+            ).distinct()
+        }
+        projects = [project for _, project in linked if project.id in normalized]
+        views = self.get_project_roadmaps(db, projects)
+        for conversation_id, project in linked:
+            if project.id in normalized:
+                contents[stale[conversation_id]] = views[project.id]
+        return contents
+
+    def get_stories(self, db: Session, project_id: int, story_ids: List[int]) -> List[dict]:
+        """Get stories by roadmap id using the (project_id, story_id) index"""
+        if not story_ids:
+            return []
+
+        if self.is_normalized(db, project_id):
+            stories = db.query(StoryDB).filter(
+                StoryDB.project_id == project_id,
+                StoryDB.story_id.in_(story_ids)
+            ).order_by(StoryDB.position).all()
+            return [self._story_to_dict(story) for story in stories]
+
+        # Fall back to walking the JSON blob for projects that were never normalized
+        db_project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+        if not db_project or not db_project.roadmap_data:
+            return []
+
+        wanted = set(story_ids)
+        roadmap_data = db_project.roadmap_data
+        epics = roadmap_data.get("epics", []) or roadmap_data.get("roadmapNodes", [])
+        return [
+            story
+            for epic in epics
+            for story in (epic.get("stories", []) or epic.get("subtasks", []))
+            if story.get("id") in wanted
+        ]
+
+    def get_story(self, db: Session, project_id: int, story_id: int) -> Optional[StoryDB]:
+        """Get a single normalized story row"""
+        return db.query(StoryDB).filter(
+            StoryDB.project_id == project_id,
+            StoryDB.story_id == story_id
+        ).first()
+
+    def ensure_normalized(self, db: Session, project_id: int) -> bool:
+        """
+        Normalize a project's roadmap before a row-level write; False if it has no
+        roadmap or one that cannot be normalized (see roadmap_rows)
+        """
+        if self.is_normalized(db, project_id):
+            return True
+
+        db_project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+        if not db_project or not db_project.roadmap_data:
+            return False
+
+        epics, _ = self.roadmap_rows(project_id, db_project.roadmap_data)
+        if not epics:
+            return False
+        self.sync_project_roadmap(db, project_id, db_project.roadmap_data)
+        db.flush()
+        return True
+
+    def update_story(self, db: Session, project_id: int, story_id: int, story_update: StoryUpdate) -> Optional[dict]:
+        """Update one story row (e.g. toggle completed) without rewriting any roadmap JSON"""
+        from app.services import search_service
+
+        if not self.ensure_normalized(db, project_id):
+            return None
+
+        db_story = self.get_story(db, project_id, story_id)
+        if not db_story:
+            return None
+
+        if story_update.title is not None:
+            db_story.title = story_update.title
+        if story_update.acceptance_criteria is not None:
+            db_story.acceptance_criteria = story_update.acceptance_criteria
+        if story_update.completed is not None:
+            db_story.completed = story_update.completed
+
+        self._roadmap_changed(db, project_id)
+        search_service.index_stories(db, project_id, [story_id])
+        db.commit()
+        db.refresh(db_story)
+        return self._story_to_dict(db_story)
+
+    def update_epic(self, db: Session, project_id: int, epic_update: UpdateEpic) -> Optional[dict]:
+        """Update one epic row and, if given, replace only that epic's stories"""
+        from app.services import search_service
+
+        if not self.ensure_normalized(db, project_id):
+            return None
+
+        db_epic = db.query(EpicDB).filter(
+            EpicDB.project_id == project_id,
+            EpicDB.epic_id == epic_update.id
+        ).first()
+        if not db_epic:
+            return None
+
+        if epic_update.name is not None:
+            db_epic.name = epic_update.name
+        if epic_update.description is not None:
+            db_epic.description = epic_update.description
+        if epic_update.priority is not None:
+            db_epic.priority = epic_update.priority
+        if epic_update.stories is not None:
+            self._check_story_ids(db, project_id, epic_update.stories, exclude_epic_id=epic_update.id)
+            db.query(StoryDB).filter(
+                StoryDB.project_id == project_id,
+                StoryDB.epic_id == epic_update.id
+            ).delete(synchronize_session=False)
+            self._insert_stories(db, project_id, epic_update.id, epic_update.stories)
+
+        self._roadmap_changed(db, project_id)
+        search_service.index_epics(db, project_id, [epic_update.id], with_stories=epic_update.stories is not None)
+        db.commit()
+        return self._epic_to_dict(db, db_epic)
+
+    def append_stories(self, db: Session, project_id: int, epic_id: int, stories: List[Story]) -> Optional[dict]:
+        """Append stories to the end of an epic"""
+        from app.services import search_service
+
+        if not self.ensure_normalized(db, project_id):
+            return None
+
+        db_epic = db.query(EpicDB).filter(
+            EpicDB.project_id == project_id,
+            EpicDB.epic_id == epic_id
+        ).first()
+        if not db_epic:
+            return None
+
+        self._check_story_ids(db, project_id, stories)
+        self._insert_stories(db, project_id, epic_id, stories)
+
+        self._roadmap_changed(db, project_id)
+        search_service.index_stories(db, project_id, [story.id for story in stories])
+        db.commit()
+        return self._epic_to_dict(db, db_epic)
+
+    def project_roadmap_replaced(self, db: Session, project_id: int, roadmap_data: dict, roadmap_hash: str) -> None:
+        """
+        Bring the roadmaps of a project's conversations up to date after the project's
+        whole roadmap was replaced: each one with different content gets the new JSON,
+        a history version and a roadmap.updated event (caller commits)
+        """
+        from app.services import roadmap_version_service
+
+        linked_roadmaps = db.query(RoadmapDB).join(
+            ConversationDB, ConversationDB.id == RoadmapDB.conversation_id
+        ).filter(ConversationDB.project_id == project_id).all()
+        now = datetime.utcnow()
+        for db_roadmap in linked_roadmaps:
+            if db_roadmap.roadmap_hash == roadmap_hash:
+                continue
+            # The history head, not the JSON: a stale roadmap's JSON predates its last versions
+            previous_data = roadmap_version_service.get_latest(db, db_roadmap.id)
+            roadmap_version_service.record_version(db, db_roadmap.id, previous_data, roadmap_data, roadmap_hash)
+            db_roadmap.roadmap_data = roadmap_data
+            db_roadmap.roadmap_hash = roadmap_hash
+            db_roadmap.updated_at = now
+            event_bus.emit(
+                db, db_roadmap.user_id, "roadmap.updated",
+                roadmap_id=db_roadmap.id, conversation_id=db_roadmap.conversation_id
+            )
+
+    def _check_story_ids(self, db: Session, project_id: int, stories: List[Story], exclude_epic_id: Optional[int] = None) -> None:
+        """Story ids are unique across a roadmap; raise ValueError on a collision"""
+        new_ids = [story.id for story in stories]
+        if len(new_ids) != len(set(new_ids)):
+            raise ValueError("Duplicate story ids in request")
+        if not new_ids:
+            return
+
+        query = db.query(StoryDB.story_id).filter(
+            StoryDB.project_id == project_id,
+            StoryDB.story_id.in_(new_ids)
+        )
+        if exclude_epic_id is not None:
+            query = query.filter(StoryDB.epic_id != exclude_epic_id)
+        taken = [row.story_id for row in query]
+        if taken:
+            raise ValueError(f"Story ids already exist in this roadmap: {sorted(taken)}")
+
+    def _insert_stories(self, db: Session, project_id: int, epic_id: int, stories: List[Story]) -> None:
+        """Insert story rows after every existing story of the project"""
+        last_position = db.query(func.max(StoryDB.position)).filter(
+            StoryDB.project_id == project_id
+        ).scalar()
+        next_position = (last_position if last_position is not None else -1) + 1
+
+        db.bulk_insert_mappings(StoryDB, [
+            {
+                "project_id": project_id,
+                "epic_id": epic_id,
+                "story_id": story.id,
+                "title": story.title,
+                "acceptance_criteria": story.acceptance_criteria,
+                "completed": story.completed,
+                "position": next_position + offset
+            }
+            for offset, story in enumerate(stories)
+        ])
+
+    def _roadmap_changed(self, db: Session, project_id: int) -> None:
+        """
+        Record a row-level change of a project's epics or stories without rewriting any
+        roadmap JSON: the project and the roadmaps of its conversations only get a NULL
+        roadmap_hash (their JSON is older than the rows, see get_conversation_roadmaps)
+        and a new updated_at. Each conversation roadmap also gets a history version, and
+        the roadmap.updated events are queued.
+        """
+        from app.services import roadmap_version_service
+
+        db.flush()
+        now = datetime.utcnow()
+        project = db.query(ProjectDB.user_id).filter(ProjectDB.id == project_id).first()
+        if not project:
+            return
+        db.query(ProjectDB).filter(ProjectDB.id == project_id).update(
+            {"roadmap_hash": None, "updated_at": now}, synchronize_session=False
+        )
+        event_bus.emit(db, project.user_id, "roadmap.updated", project_id=project_id)
+
+        linked_roadmaps = db.query(RoadmapDB.id, RoadmapDB.user_id, RoadmapDB.conversation_id).join(
+            ConversationDB, ConversationDB.id == RoadmapDB.conversation_id
+        ).filter(ConversationDB.project_id == project_id).all()
+        if not linked_roadmaps:
+            return
+
+        # The history stores the content of each version, so it needs the whole view
+        db_project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+        roadmap_data = self.get_project_roadmap(db, db_project)
+        roadmap_hash = compute_roadmap_hash(roadmap_data)
+        for roadmap in linked_roadmaps:
+            previous_data = roadmap_version_service.get_latest(db, roadmap.id)
+            roadmap_version_service.record_version(db, roadmap.id, previous_data, roadmap_data, roadmap_hash)
+            event_bus.emit(
+                db, roadmap.user_id, "roadmap.updated",
+                roadmap_id=roadmap.id, conversation_id=roadmap.conversation_id
+            )
+        db.query(RoadmapDB).filter(
+            RoadmapDB.id.in_([roadmap.id for roadmap in linked_roadmaps])
+        ).update({"roadmap_hash": None, "updated_at": now}, synchronize_session=False)
+
+    def _epic_to_dict(self, db: Session, db_epic: EpicDB) -> dict:
+        """Convert an epic row and its stories to the Epic schema shape"""
+        stories = db.query(StoryDB).filter(
+            StoryDB.project_id == db_epic.project_id,
+            StoryDB.epic_id == db_epic.epic_id
+        ).order_by(StoryDB.position).all()
+
+        return {
+            "id": db_epic.epic_id,
+            "name": db_epic.name,
+            "priority": db_epic.priority,
+            "description": db_epic.description,
+            "stories": [self._story_to_dict(story) for story in stories]
+        }
+
+    def _story_to_dict(self, db_story: StoryDB) -> dict:
+        """Convert a story row to the Story schema shape"""
+        return {
+            "id": db_story.story_id,
+            "title": db_story.title,
+            "acceptance_criteria": db_story.acceptance_criteria or [],
+            "completed": bool(db_story.completed)
+        }
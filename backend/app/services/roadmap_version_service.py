@@ -0,0 +1,156 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.database import RoadmapVersion as RoadmapVersionDB
+from app.core.json_delta import diff_json, apply_json_delta
+from app.core.serialization import canonical_json, json_loads
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import copy
+import threading
+import zlib
+
+class RoadmapVersionService:
+    """
+    Roadmap history stored as a full snapshot every SNAPSHOT_INTERVAL versions and
+    compressed deltas in between. Reconstructed versions are kept in a small LRU cache
+    so replays can start from the closest cached version instead of the snapshot.
+    """
+
+    SNAPSHOT_INTERVAL = 20
+    CACHE_SIZE = 128
+
+    def __init__(self):
+        self._cache: "OrderedDict[Tuple[int, int], dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record_version(self, db: Session, roadmap_id: int, previous_data: Optional[dict], roadmap_data: dict, roadmap_hash: Optional[str] = None) -> RoadmapVersionDB:
+        """Append a new version for a roadmap (caller commits)"""
+        last_version = db.query(func.max(RoadmapVersionDB.version)).filter(
+            RoadmapVersionDB.roadmap_id == roadmap_id
+        ).scalar() or 0
+        version = last_version + 1
+
+        # Snapshot on the first version, every SNAPSHOT_INTERVAL versions, and whenever the
+        # stored history does not start from previous_data (e.g. roadmaps saved before versioning)
+        is_snapshot = last_version == 0 or previous_data is None or (version - 1) % self.SNAPSHOT_INTERVAL == 0
+        content = roadmap_data if is_snapshot else diff_json(previous_data, roadmap_data)
+
+        db_version = RoadmapVersionDB(
+            roadmap_id=roadmap_id,
+            version=version,
+            is_snapshot=is_snapshot,
+            payload=self._encode(content),
+            roadmap_hash=roadmap_hash
+        )
+        db.add(db_version)
+        return db_version
+
+    def list_versions(self, db: Session, roadmap_id: int) -> List[dict]:
+        """List the versions of a roadmap, newest first"""
+        versions = db.query(RoadmapVersionDB).filter(
+            RoadmapVersionDB.roadmap_id == roadmap_id
+        ).order_by(RoadmapVersionDB.version.desc()).all()
+
+        return [
+            {
+                "version": v.version,
+                "is_snapshot": bool(v.is_snapshot),
+                "size_bytes": len(v.payload),
+                "roadmap_hash": v.roadmap_hash,
+                "created_at": v.created_at
+            }
+            for v in versions
+        ]
+
+    def get_version(self, db: Session, roadmap_id: int, version: int) -> Optional[dict]:
+        """Reconstruct a version by replaying deltas from the nearest snapshot or cached version"""
+        cached = self._cache_get(roadmap_id, version)
+        if cached is not None:
+            return cached
+
+        snapshot_version = db.query(func.max(RoadmapVersionDB.version)).filter(
+            RoadmapVersionDB.roadmap_id == roadmap_id,
+            RoadmapVersionDB.version <= version,
+            RoadmapVersionDB.is_snapshot == True
+        ).scalar()
+        if snapshot_version is None:
+            return None
+
+        start_version, data = self._closest_cached(roadmap_id, snapshot_version, version)
+
+        rows = db.query(RoadmapVersionDB).filter(
+            RoadmapVersionDB.roadmap_id == roadmap_id,
+            RoadmapVersionDB.version > (start_version if data is not None else snapshot_version - 1),
+            RoadmapVersionDB.version <= version
+        ).order_by(RoadmapVersionDB.version).all()
+        if not rows or rows[-1].version != version:
+            return None
+
+        for row in rows:
+            content = self._decode(row.payload)
+            data = content if row.is_snapshot else apply_json_delta(data, content)
+
+        self._cache_put(roadmap_id, version, data)
+        return data
+
+    def get_latest(self, db: Session, roadmap_id: int) -> Optional[dict]:
+        """Content of the newest version, or None for a roadmap without history"""
+        version = db.query(func.max(RoadmapVersionDB.version)).filter(
+            RoadmapVersionDB.roadmap_id == roadmap_id
+        ).scalar()
+        return self.get_version(db, roadmap_id, version) if version else None
+
+    def diff_versions(self, db: Session, roadmap_id: int, from_version: int, to_version: int) -> Optional[dict]:
+        """Structural delta between two versions ({} when they are identical)"""
+        old = self.get_version(db, roadmap_id, from_version)
+        new = self.get_version(db, roadmap_id, to_version)
+        if old is None or new is None:
+            return None
+        return diff_json(old, new) or {}
+
+    def delete_versions(self, db: Session, roadmap_ids: List[int]) -> None:
+        """Delete the history of the given roadmaps and evict them from the cache (caller commits)"""
+        if not roadmap_ids:
+            return
+        db.query(RoadmapVersionDB).filter(
+            RoadmapVersionDB.roadmap_id.in_(roadmap_ids)
+        ).delete(synchronize_session=False)
+        # SQLite can reuse the ids of deleted roadmaps, so stale cache entries must go too
+        with self._lock:
+            for key in [key for key in self._cache if key[0] in roadmap_ids]:
+                del self._cache[key]
+
+    def clear_cache(self) -> None:
+        """Drop every reconstructed version"""
+        with self._lock:
+            self._cache.clear()
+
+    def _encode(self, content) -> bytes:
+        return zlib.compress(canonical_json(content).encode("utf-8"), 9)
+
+    def _decode(self, payload: bytes):
+        return json_loads(zlib.decompress(payload))
+
+    def _cache_get(self, roadmap_id: int, version: int) -> Optional[dict]:
+        with self._lock:
+            data = self._cache.get((roadmap_id, version))
+            if data is None:
+                return None
+            self._cache.move_to_end((roadmap_id, version))
+            return copy.deepcopy(data)
+
+    def _cache_put(self, roadmap_id: int, version: int, data: dict) -> None:
+        with self._lock:
+            self._cache[(roadmap_id, version)] = copy.deepcopy(data)
+            self._cache.move_to_end((roadmap_id, version))
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _closest_cached(self, roadmap_id: int, low: int, high: int) -> Tuple[int, Optional[dict]]:
+        """Highest cached version in [low, high], or (low, None) when nothing is cached"""
+        with self._lock:
+            candidates = [v for (r, v) in self._cache if r == roadmap_id and low <= v <= high]
+            if not candidates:
+                return low, None
+            best = max(candidates)
+            return best, copy.deepcopy(self._cache[(roadmap_id, best)])
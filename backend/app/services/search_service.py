@@ -0,0 +1,447 @@
+import html
+import logging
+import re
+import unicodedata
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, Text, bindparam, delete, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from app.models.database import (
+    Project as ProjectDB, Epic as EpicDB, Story as StoryDB, Task as TaskDB,
+    Conversation as ConversationDB, Message as MessageDB
+)
+from typing import Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"[^\W_]+")
+
+def tokenize(value: str) -> List[str]:
+    """Lowercase words without diacritics, split like FTS5's unicode61 tokenizer"""
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    return TOKEN.findall("".join(char for char in decomposed if not unicodedata.combining(char)))
+
+# Derived data, so it lives outside Base.metadata: create_all() never creates it and
+# setup() knows when it has to build it from scratch
+search_metadata = MetaData()
+search_documents = Table(
+    "search_documents", search_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("kind", String(16), nullable=False),  # project, epic, story, task, message
+    Column("object_id", Integer, nullable=False),  # Row id; roadmap-local id for epics and stories
+    Column("parent_id", Integer, nullable=True),  # Epic of a story, conversation of a message
+    Column("user_id", Integer, nullable=False),
+    Column("project_id", Integer, nullable=True),
+    Column("title", Text, nullable=False, default=""),
+    Column("body", Text, nullable=False, default=""),
+    Index("ix_search_documents_kind_object_id", "kind", "object_id"),
+    Index("ix_search_documents_kind_parent_id", "kind", "parent_id"),
+    Index("ix_search_documents_project_id", "project_id"),
+    Index("ix_search_documents_user_id", "user_id"),
+)
+
+class SearchUnavailableError(RuntimeError):
+    """Raised when searching without a search index"""
+
+class SqliteSearchBackend:
+    """
+    FTS5 index over search_documents (external content, so the text is stored once).
+    Triggers keep the index in step with the table. user_id is an indexed FTS column,
+    so a user's query is a doclist intersection inside FTS instead of a filter over
+    every matching row of every user.
+
+    Every term is matched as a prefix (answered by the prefix indexes up to 6
+    characters, by a term range scan beyond that). Matches are ranked inside FTS with
+    bm25(), title matches weighted TITLE_WEIGHT times body matches, so the best match
+    is found among all of the user's matches, however old.
+    """
+
+    TITLE_WEIGHT = 10.0
+
+    def create(self, conn: Connection) -> None:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "user_id, title, body, content='search_documents', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6')"
+        ))
+
+    def create_triggers(self, conn: Connection) -> None:
+        conn.execute(text(
+            "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+            "INSERT INTO search_index(rowid, user_id, title, body) VALUES (new.id, new.user_id, new.title, new.body); "
+            "END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+            "INSERT INTO search_index(search_index, rowid, user_id, title, body) "
+            "VALUES ('delete', old.id, old.user_id, old.title, old.body); "
+            "END"
+        ))
+
+    def finish_load(self, conn: Connection) -> None:
+        """Index rows bulk-loaded before the triggers existed, then keep it current"""
+        conn.execute(text("INSERT INTO search_index(search_index) VALUES ('rebuild')"))
+        self.create_triggers(conn)
+
+    def drop(self, conn: Connection) -> None:
+        conn.execute(text("DROP TRIGGER IF EXISTS search_documents_ai"))
+        conn.execute(text("DROP TRIGGER IF EXISTS search_documents_ad"))
+        conn.execute(text("DROP TABLE IF EXISTS search_index"))
+
+    def search(self, conn: Connection, user_id: int, terms: List[str], kinds: Optional[Sequence[str]],
+               project_id: Optional[int], limit: int, marks: Sequence[str]) -> List[dict]:
+        # Every term is quoted, so user input cannot inject FTS5 syntax
+        phrases = " ".join(f'"{term}"*' for term in terms)
+        params = {
+            "match": f'user_id : "{user_id}" AND {{title body}} : ({phrases})',
+            "start": marks[0],
+            "end": marks[1],
+            "ranking": f"bm25(0.0, {self.TITLE_WEIGHT}, 1.0)",
+            "limit": limit
+        }
+        filters = ""
+        if kinds:
+            filters += " AND d.kind IN :kinds"
+            params["kinds"] = list(kinds)
+        if project_id is not None:
+            filters += " AND d.project_id = :project_id"
+            params["project_id"] = project_id
+
+        # rank is bm25() with per-column weights (the user_id column does not count);
+        # lower is better
+        statement = text(
+            "SELECT d.kind, d.object_id, d.parent_id, d.project_id, d.title, "
+            "highlight(search_index, 1, :start, :end) AS title_highlight, "
+            "snippet(search_index, 2, :start, :end, '…', 16) AS snippet, "
+            "-search_index.rank AS score "
+            "FROM search_index JOIN search_documents d ON d.id = search_index.rowid "
+            f"WHERE search_index MATCH :match AND search_index.rank MATCH :ranking{filters} "
+            "ORDER BY search_index.rank LIMIT :limit"
+        )
+        if kinds:
+            statement = statement.bindparams(bindparam("kinds", expanding=True))
+        return [dict(row._mapping) for row in conn.execute(statement, params)]
+
+class PostgresSearchBackend:
+    """
+    Stored tsvector (title weighted above body) with a GIN index; user_id has its
+    own b-tree index, and the planner combines the two.
+    """
+
+    LANGUAGE = "english"
+
+    def create(self, conn: Connection) -> None:
+        conn.execute(text(
+            "ALTER TABLE search_documents ADD COLUMN tsv tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{self.LANGUAGE}', title), 'A') || "
+            f"setweight(to_tsvector('{self.LANGUAGE}', body), 'B')) STORED"
+        ))
+
+    def finish_load(self, conn: Connection) -> None:
+        # Building the GIN index once is much faster than updating it per row
+        conn.execute(text("CREATE INDEX ix_search_documents_tsv ON search_documents USING GIN (tsv)"))
+
+    def drop(self, conn: Connection) -> None:
+        pass  # The column and its index go with the table
+
+    def search(self, conn: Connection, user_id: int, terms: List[str], kinds: Optional[Sequence[str]],
+               project_id: Optional[int], limit: int, marks: Sequence[str]) -> List:
+        params = {
+            "user_id": user_id,
+            "tsquery": " & ".join(f"'{term}':*" for term in terms),
+            "highlight_options": f'StartSel="{marks[0]}", StopSel="{marks[1]}", HighlightAll=true',
+            "snippet_options": f'StartSel="{marks[0]}", StopSel="{marks[1]}", MaxWords=24, MinWords=8',
+            "limit": limit
+        }
+        filters = ""
+        if kinds:
+            filters += " AND d.kind IN :kinds"
+            params["kinds"] = list(kinds)
+        if project_id is not None:
+            filters += " AND d.project_id = :project_id"
+            params["project_id"] = project_id
+
+        # Rank and cut in the inner query so ts_headline only runs on the returned rows
+        statement = text(
+            "SELECT r.kind, r.object_id, r.parent_id, r.project_id, r.title, "
+            f"ts_headline('{self.LANGUAGE}', r.title, r.query, :highlight_options) AS title_highlight, "
+            f"ts_headline('{self.LANGUAGE}', r.body, r.query, :snippet_options) AS snippet, "
+            "r.score "
+            "FROM ("
+            "SELECT d.kind, d.object_id, d.parent_id, d.project_id, d.title, d.body, q.query, "
+            "ts_rank_cd(d.tsv, q.query) AS score "
+            f"FROM search_documents d, to_tsquery('{self.LANGUAGE}', :tsquery) AS q(query) "
+            f"WHERE d.user_id = :user_id AND d.tsv @@ q.query{filters} "
+            "ORDER BY score DESC LIMIT :limit"
+            ") r ORDER BY r.score DESC"
+        )
+        if kinds:
+            statement = statement.bindparams(bindparam("kinds", expanding=True))
+        return [dict(row._mapping) for row in conn.execute(statement, params)]
+
+class SearchService:
+    """
+    Full-text search over a user's projects, roadmap epics and stories (including
+    acceptance criteria), tasks and chat messages.
+
+    Each searchable row has a document in search_documents. Services call the
+    index_*/remove_* hooks in the same transaction as their writes, so the index
+    commits (or rolls back) with the data. Hooks re-read the source rows, which keeps
+    them independent of how the caller changed them. Archived tasks are not indexed.
+
+    setup() builds the index on startup when it does not exist yet; rebuild() drops
+    and rebuilds it (POST /api/admin/search/rebuild). Without the index (or without
+    FTS5 in the SQLite build) the hooks do nothing and search() raises.
+    """
+
+    KINDS = ("project", "epic", "story", "task", "message")
+    MAX_TERMS = 8
+    MIN_TERM_LENGTH = 2
+    MAX_RESULTS = 50
+    CHUNK_SIZE = 1000
+    # Private-use characters mark matches in the database output; the text is
+    # HTML-escaped afterwards and the marks become <mark> tags
+    MARKS = ("\ue000", "\ue001")
+
+    def __init__(self):
+        self._ready: Optional[bool] = None
+
+    def setup(self, engine: Engine) -> None:
+        """Build the index if the database does not have one yet"""
+        from app.core.database import SessionLocal
+
+        with engine.connect() as conn:
+            if inspect(conn).has_table("search_documents"):
+                self._ready = True
+                return
+
+        db = SessionLocal()
+        try:
+            count = self.rebuild(db)
+            logger.info(f"Built the search index ({count} documents)")
+        except Exception as e:
+            db.rollback()
+            self._ready = False
+            search_documents.drop(engine, checkfirst=True)  # So the next start tries again
+            logger.warning(f"Search is disabled, the index could not be built: {e}")
+        finally:
+            db.close()
+
+    def rebuild(self, db: Session) -> int:
+        """Drop and rebuild the whole index from the source tables; returns the document count"""
+        conn = db.connection()
+        backend = self._backend(conn)
+        backend.drop(conn)
+        search_documents.drop(conn, checkfirst=True)
+        search_documents.create(conn)
+        backend.create(conn)
+
+        count = 0
+        for documents in (
+            self._project_documents(db),
+            self._roadmap_documents(db),
+            self._task_documents(db),
+            self._message_documents(db),
+        ):
+            count += self._insert(db, documents)
+
+        backend.finish_load(conn)
+        db.commit()
+        self._ready = True
+        return count
+
+    def index_projects(self, db: Session, project_ids: List[int]) -> None:
+        """(Re)index the name and description of projects"""
+        if not project_ids or not self._is_ready(db):
+            return
+        self._delete(db, (search_documents.c.kind == "project") & search_documents.c.object_id.in_(project_ids))
+        self._insert(db, self._project_documents(db, ProjectDB.id.in_(project_ids)))
+
+    def index_roadmaps(self, db: Session, project_ids: List[int]) -> None:
+        """(Re)index the epics and stories of projects"""
+        if not project_ids or not self._is_ready(db):
+            return
+        self._delete(db, search_documents.c.kind.in_(("epic", "story")) & search_documents.c.project_id.in_(project_ids))
+        self._insert(db, self._roadmap_documents(db, project_ids))
+
+    def index_epics(self, db: Session, project_id: int, epic_ids: List[int], with_stories: bool = False) -> None:
+        """(Re)index single epics of a project and, with with_stories, all of their stories"""
+        if not epic_ids or not self._is_ready(db):
+            return
+        in_project = search_documents.c.project_id == project_id
+        self._delete(db, (search_documents.c.kind == "epic") & in_project & search_documents.c.object_id.in_(epic_ids))
+        self._insert(db, self._epic_documents(db, (EpicDB.project_id == project_id) & EpicDB.epic_id.in_(epic_ids)))
+        if with_stories:
+            self._delete(db, (search_documents.c.kind == "story") & in_project & search_documents.c.parent_id.in_(epic_ids))
+            self._insert(db, self._story_documents(db, (StoryDB.project_id == project_id) & StoryDB.epic_id.in_(epic_ids)))
+
+    def index_stories(self, db: Session, project_id: int, story_ids: List[int]) -> None:
+        """(Re)index single stories of a project by roadmap-local id"""
+        if not story_ids or not self._is_ready(db):
+            return
+        self._delete(
+            db,
+            (search_documents.c.kind == "story") & (search_documents.c.project_id == project_id)
+            & search_documents.c.object_id.in_(story_ids)
+        )
+        self._insert(db, self._story_documents(db, (StoryDB.project_id == project_id) & StoryDB.story_id.in_(story_ids)))
+
+    def index_tasks(self, db: Session, task_ids: Optional[List[int]] = None, project_ids: Optional[List[int]] = None) -> None:
+        """(Re)index tasks by id or all tasks of projects"""
+        if not (task_ids or project_ids) or not self._is_ready(db):
+            return
+        if task_ids:
+            document_filter, task_filter = search_documents.c.object_id.in_(task_ids), TaskDB.id.in_(task_ids)
+        else:
+            document_filter, task_filter = search_documents.c.project_id.in_(project_ids), TaskDB.project_id.in_(project_ids)
+        self._delete(db, (search_documents.c.kind == "task") & document_filter)
+        self._insert(db, self._task_documents(db, task_filter))
+
+    def index_messages(self, db: Session, message_ids: List[int]) -> None:
+        """Index new chat messages"""
+        if not message_ids or not self._is_ready(db):
+            return
+        self._delete(db, (search_documents.c.kind == "message") & search_documents.c.object_id.in_(message_ids))
+        self._insert(db, self._message_documents(db, MessageDB.id.in_(message_ids)))
+
+    def remove_tasks(self, db: Session, task_ids: List[int]) -> None:
+        if task_ids and self._is_ready(db):
+            self._delete(db, (search_documents.c.kind == "task") & search_documents.c.object_id.in_(task_ids))
+
+    def remove_projects(self, db: Session, project_ids: List[int]) -> None:
+        """Remove projects with their epics, stories and tasks (messages belong to conversations)"""
+        if project_ids and self._is_ready(db):
+            self._delete(db, (search_documents.c.kind != "message") & search_documents.c.project_id.in_(project_ids))
+
+    def remove_conversation(self, db: Session, conversation_id: int) -> None:
+        if self._is_ready(db):
+            self._delete(db, (search_documents.c.kind == "message") & (search_documents.c.parent_id == conversation_id))
+
+    def remove_user(self, db: Session, user_id: int) -> None:
+        if self._is_ready(db):
+            self._delete(db, search_documents.c.user_id == user_id)
+
+    def search(self, db: Session, user_id: int, query: str, kinds: Optional[Sequence[str]] = None,
+               project_id: Optional[int] = None, limit: int = 20) -> List[dict]:
+        """Best matches first, with matches in the title and a body snippet wrapped in <mark>"""
+        if not self._is_ready(db):
+            raise SearchUnavailableError("The search index is not available")
+
+        terms = [term for term in tokenize(query) if len(term) >= self.MIN_TERM_LENGTH][:self.MAX_TERMS]
+        if not terms:
+            return []
+
+        conn = db.connection()
+        rows = self._backend(conn).search(
+            conn, user_id, terms, kinds, project_id, max(1, min(limit, self.MAX_RESULTS)), self.MARKS
+        )
+        return [
+            {
+                "kind": row["kind"],
+                "id": row["object_id"],
+                "parent_id": row["parent_id"],
+                "project_id": row["project_id"],
+                "title": row["title"],
+                "title_highlight": self._highlight(row["title_highlight"]),
+                "snippet": self._highlight(row["snippet"]),
+                "score": round(float(row["score"]), 4)
+            }
+            for row in rows
+        ]
+
+    def _is_ready(self, db: Session) -> bool:
+        if self._ready is None:
+            self._ready = inspect(db.connection()).has_table("search_documents")
+        return self._ready
+
+    def _backend(self, conn: Connection):
+        if conn.dialect.name == "postgresql":
+            return PostgresSearchBackend()
+        return SqliteSearchBackend()
+
+    def _highlight(self, value: Optional[str]) -> str:
+        escaped = html.escape(value or "", quote=False)
+        return escaped.replace(self.MARKS[0], "<mark>").replace(self.MARKS[1], "</mark>")
+
+    def _delete(self, db: Session, condition) -> None:
+        # Pending ORM changes are not autoflushed; flush so the source rows are current
+        db.flush()
+        db.execute(delete(search_documents).where(condition))
+
+    def _insert(self, db: Session, documents: Iterator[dict]) -> int:
+        count = 0
+        chunk = []
+        for document in documents:
+            chunk.append(document)
+            if len(chunk) >= self.CHUNK_SIZE:
+                db.execute(search_documents.insert(), chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            db.execute(search_documents.insert(), chunk)
+            count += len(chunk)
+        return count
+
+    def _project_documents(self, db: Session, condition=None) -> Iterator[dict]:
+        query = db.query(ProjectDB.id, ProjectDB.user_id, ProjectDB.name, ProjectDB.description)
+        if condition is not None:
+            query = query.filter(condition)
+        for row in query.yield_per(self.CHUNK_SIZE):
+            yield self._document("project", row.id, None, row.user_id, row.id, row.name, row.description)
+
+    def _roadmap_documents(self, db: Session, project_ids: Optional[List[int]] = None) -> Iterator[dict]:
+        if project_ids is None:
+            yield from self._epic_documents(db)
+            yield from self._story_documents(db)
+        else:
+            yield from self._epic_documents(db, EpicDB.project_id.in_(project_ids))
+            yield from self._story_documents(db, StoryDB.project_id.in_(project_ids))
+
+    def _epic_documents(self, db: Session, condition=None) -> Iterator[dict]:
+        query = db.query(EpicDB.epic_id, EpicDB.project_id, ProjectDB.user_id, EpicDB.name, EpicDB.description) \
+            .join(ProjectDB, EpicDB.project_id == ProjectDB.id)
+        if condition is not None:
+            query = query.filter(condition)
+        for row in query.yield_per(self.CHUNK_SIZE):
+            yield self._document("epic", row.epic_id, None, row.user_id, row.project_id, row.name, row.description)
+
+    def _story_documents(self, db: Session, condition=None) -> Iterator[dict]:
+        query = db.query(StoryDB.story_id, StoryDB.epic_id, StoryDB.project_id, ProjectDB.user_id,
+                         StoryDB.title, StoryDB.acceptance_criteria) \
+            .join(ProjectDB, StoryDB.project_id == ProjectDB.id)
+        if condition is not None:
+            query = query.filter(condition)
+        for row in query.yield_per(self.CHUNK_SIZE):
+            criteria = "\n".join(str(item) for item in row.acceptance_criteria or [])
+            yield self._document("story", row.story_id, row.epic_id, row.user_id, row.project_id, row.title, criteria)
+
+    def _task_documents(self, db: Session, condition=None) -> Iterator[dict]:
+        query = db.query(TaskDB.id, TaskDB.project_id, ProjectDB.user_id, TaskDB.text) \
+            .join(ProjectDB, TaskDB.project_id == ProjectDB.id) \
+            .filter(TaskDB.archive != True)
+        if condition is not None:
+            query = query.filter(condition)
+        for row in query.yield_per(self.CHUNK_SIZE):
+            yield self._document("task", row.id, None, row.user_id, row.project_id, row.text, None)
+
+    def _message_documents(self, db: Session, condition=None) -> Iterator[dict]:
+        query = db.query(MessageDB.id, MessageDB.conversation_id, ConversationDB.user_id,
+                         ConversationDB.project_id, MessageDB.content) \
+            .join(ConversationDB, MessageDB.conversation_id == ConversationDB.id) \
+            .filter(ConversationDB.user_id.isnot(None))
+        if condition is not None:
+            query = query.filter(condition)
+        for row in query.yield_per(self.CHUNK_SIZE):
+            yield self._document("message", row.id, row.conversation_id, row.user_id, row.project_id, None, row.content)
+
+    @staticmethod
+    def _document(kind: str, object_id: int, parent_id: Optional[int], user_id: int,
+                  project_id: Optional[int], title: Optional[str], body: Optional[str]) -> dict:
+        return {
+            "kind": kind,
+            "object_id": object_id,
+            "parent_id": parent_id,
+            "user_id": user_id,
+            "project_id": project_id,
+            "title": title or "",
+            "body": body or ""
+        }
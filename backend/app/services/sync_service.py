@@ -0,0 +1,78 @@
+from sqlalchemy.orm import Session, defer
+from app.models.database import Project as ProjectDB, Task as TaskDB, Roadmap as RoadmapDB, Conversation, Tombstone
+from app.core.config import settings
+from typing import List, Optional
+from datetime import datetime, timedelta
+
+class SyncService:
+    """
+    Delta sync for the dashboard: rows created, updated or deleted since a cursor.
+
+    The cursor is the server time at which the previous sync started. Changes are read
+    from the updated_at columns, deletions from the tombstones table. A small overlap is
+    subtracted from the cursor so rows written by a request that was still in flight
+    when the previous sync ran are not missed; clients upsert by id, so repeats are harmless.
+    """
+
+    OVERLAP = timedelta(seconds=5)
+
+    def record_deletion(self, db: Session, user_id: int, entity_type: str, entity_ids: List[int]) -> None:
+        """Write tombstones for deleted rows (caller commits)"""
+        if not entity_ids:
+            return
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(Tombstone, [
+            {"user_id": user_id, "entity_type": entity_type, "entity_id": entity_id, "deleted_at": now}
+            for entity_id in entity_ids
+        ])
+
+    def get_changes(self, db: Session, user_id: int, since: Optional[datetime]) -> dict:
+        """
+        Collect changed rows for a user. With no cursor, or one older than the tombstone
+        retention window, everything is returned and `full` is set so the client replaces
+        its cache instead of merging.
+        """
+        from app.services import roadmap_service
+
+        cursor = datetime.utcnow()
+        retention_start = cursor - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        full = since is None or since < retention_start
+        changed_since = None if full else since - self.OVERLAP
+
+        projects_query = db.query(ProjectDB).filter(ProjectDB.user_id == user_id)
+        tasks_query = db.query(TaskDB).join(ProjectDB, TaskDB.project_id == ProjectDB.id).filter(ProjectDB.user_id == user_id)
+        roadmaps_query = db.query(RoadmapDB).filter(RoadmapDB.user_id == user_id)
+        conversations_query = db.query(Conversation).options(defer(Conversation.specifications)).filter(Conversation.user_id == user_id)
+        deleted = []
+
+        if changed_since is not None:
+            projects_query = projects_query.filter(ProjectDB.updated_at >= changed_since)
+            tasks_query = tasks_query.filter(TaskDB.updated_at >= changed_since)
+            roadmaps_query = roadmaps_query.filter(RoadmapDB.updated_at >= changed_since)
+            conversations_query = conversations_query.filter(Conversation.updated_at >= changed_since)
+            deleted = db.query(Tombstone).filter(
+                Tombstone.user_id == user_id,
+                Tombstone.deleted_at >= changed_since
+            ).order_by(Tombstone.deleted_at).all()
+
+        projects = projects_query.order_by(ProjectDB.id).all()
+        roadmaps = roadmaps_query.order_by(RoadmapDB.id).all()
+
+        return {
+            "cursor": cursor,
+            "full": full,
+            "projects": projects,
+            "project_roadmaps": roadmap_service.get_project_roadmaps(db, projects),
+            "tasks": tasks_query.order_by(TaskDB.id).all(),
+            "roadmaps": roadmaps,
+            "roadmap_contents": roadmap_service.get_conversation_roadmaps(db, roadmaps),
+            "conversations": conversations_query.order_by(Conversation.id).all(),
+            "deleted": deleted
+        }
+
+    def purge_tombstones(self, db: Session) -> int:
+        """Delete tombstones older than the retention window; returns the number removed"""
+        cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        count = db.query(Tombstone).filter(Tombstone.deleted_at < cutoff).delete(synchronize_session=False)
+        db.commit()
+        return count
@@ -1,14 +1,21 @@
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-from app.models.database import Task as TaskDB
-from app.models.api_schemas import TaskCreate, TaskUpdate
+from app.models.database import Task as TaskDB, Project as ProjectDB
+from app.core.events import event_bus
+from app.models.api_schemas import TaskCreate, TaskUpdate, TaskBulkUpdateItem
 from typing import List, Optional, Dict
 from datetime import datetime
 
 class TaskService:
     """Service for handling task CRUD operations"""
     
+    TASK_TYPES = ("daily-todos", "your-ideas")
+    BULK_LIMIT = 500  # Max items per bulk request
+    
     def create_task(self, db: Session, task_data: TaskCreate, project_id: int) -> TaskDB:
         """Create a new task for a project"""
+        from app.services import search_service
+        
         db_task = TaskDB(
             project_id=project_id,
             text=task_data.text,
@@ -16,6 +23,9 @@ class TaskService:
             task_type=task_data.task_type
         )
         db.add(db_task)
+        db.flush()
+        search_service.index_tasks(db, [db_task.id])
+        event_bus.emit(db, self._owner_id(db, project_id), "task.created", project_id=project_id, task_id=db_task.id)
         db.commit()
         db.refresh(db_task)
         return db_task
@@ -43,16 +53,40 @@ class TaskService:
         
         return tasks_by_type
     
-    def get_task(self, db: Session, task_id: int, project_id: int) -> Optional[TaskDB]:
-        """Get a specific task by ID for a project"""
-        return db.query(TaskDB).filter(
+    def get_projects_tasks(self, db: Session, project_ids: List[int]) -> Dict[int, Dict[str, List[TaskDB]]]:
+        """Get the non-archived tasks of several projects in one query, grouped by project and type"""
+        tasks_by_project = {project_id: {"daily-todos": [], "your-ideas": []} for project_id in project_ids}
+        if not project_ids:
+            return tasks_by_project
+        
+        tasks = db.query(TaskDB).filter(
+            TaskDB.project_id.in_(project_ids),
+            TaskDB.archive != True
+        ).order_by(TaskDB.created_at.asc()).all()
+        
+        for task in tasks:
+            if task.task_type in tasks_by_project[task.project_id]:
+                tasks_by_project[task.project_id][task.task_type].append(task)
+        
+        return tasks_by_project
+    
+    def get_task(self, db: Session, task_id: int, project_id: int, user_id: Optional[int] = None) -> Optional[TaskDB]:
+        """Get a specific task by ID for a project; with user_id, only if that user owns the project"""
+        query = db.query(TaskDB).filter(
             TaskDB.id == task_id,
             TaskDB.project_id == project_id
-        ).first()
+        )
+        if user_id is not None:
+            # Ownership checked in the same query instead of a separate project lookup
+            query = query.join(ProjectDB, ProjectDB.id == TaskDB.project_id).filter(ProjectDB.user_id == user_id)
+        return query.first()
     
-    def update_task(self, db: Session, task_id: int, project_id: int, task_update: TaskUpdate) -> Optional[TaskDB]:
-        """Update a task"""
-        db_task = self.get_task(db, task_id, project_id)
+    def update_task(self, db: Session, task_id: int, project_id: int, task_update: TaskUpdate,
+                    user_id: Optional[int] = None) -> Optional[TaskDB]:
+        """Update a task (with user_id, only in a project that user owns)"""
+        from app.services import search_service
+        
+        db_task = self.get_task(db, task_id, project_id, user_id)
         if not db_task:
             return None
         
@@ -66,16 +100,24 @@ class TaskService:
             db_task.archive = task_update.archive
         
         db_task.updated_at = datetime.utcnow()
+        search_service.index_tasks(db, [task_id])
+        event_bus.emit(db, user_id or self._owner_id(db, project_id), "task.updated", project_id=project_id, task_id=task_id)
         db.commit()
         db.refresh(db_task)
         return db_task
     
-    def delete_task(self, db: Session, task_id: int, project_id: int) -> bool:
-        """Delete a task"""
-        db_task = self.get_task(db, task_id, project_id)
+    def delete_task(self, db: Session, task_id: int, project_id: int, user_id: Optional[int] = None) -> bool:
+        """Delete a task (with user_id, only in a project that user owns)"""
+        from app.services import sync_service, search_service
+        
+        db_task = self.get_task(db, task_id, project_id, user_id)
         if not db_task:
             return False
         
+        user_id = user_id or self._owner_id(db, project_id)
+        sync_service.record_deletion(db, user_id, "task", [task_id])
+        search_service.remove_tasks(db, [task_id])
+        event_bus.emit(db, user_id, "task.deleted", project_id=project_id, task_id=task_id)
         db.delete(db_task)
         db.commit()
         return True
@@ -84,14 +126,159 @@ class TaskService:
         """Check if a task exists for a project"""
         return self.get_task(db, task_id, project_id) is not None
     
-    def archive_task(self, db: Session, task_id: int, project_id: int) -> bool:
-        """Will set the archive flag to true in the db"""
-        db_task = self.get_task(db, task_id, project_id)
+    def archive_task(self, db: Session, task_id: int, project_id: int, user_id: Optional[int] = None) -> bool:
+        """Will set the archive flag to true in the db (with user_id, only in a project that user owns)"""
+        from app.services import search_service
+        
+        db_task = self.get_task(db, task_id, project_id, user_id)
         
         if not db_task:
             return False
         
         db_task.archive = True
         db_task.updated_at = datetime.utcnow()
+        search_service.index_tasks(db, [task_id])
+        event_bus.emit(db, user_id or self._owner_id(db, project_id), "task.updated", project_id=project_id, task_id=task_id)
         db.commit()
-        return True
\ No newline at end of file
+        return True
+    
+    def bulk_create_tasks(self, db: Session, project_id: int, tasks: List[TaskCreate]) -> List[dict]:
+        """Create many tasks with one multi-row INSERT and one commit; per-item results in request order"""
+        from app.services import search_service
+        
+        results = []
+        rows = []
+        for task_data in tasks:
+            if task_data.task_type not in self.TASK_TYPES:
+                results.append({"id": None, "status": "invalid", "error": "Task type must be 'daily-todos' or 'your-ideas'", "task": None})
+                continue
+            now = datetime.utcnow()
+            rows.append({
+                "project_id": project_id,
+                "text": task_data.text,
+                "completed": task_data.completed,
+                "task_type": task_data.task_type,
+                "created_at": now,
+                "updated_at": now
+            })
+            results.append({"id": None, "status": "created", "error": None, "task": None})
+        
+        if rows:
+            # Session.add_all() would flush one INSERT per row on SQLite; a single
+            # multi-row INSERT assigns ascending ids, so sorted ids follow request order
+            task_ids = sorted(db.execute(insert(TaskDB).values(rows).returning(TaskDB.id)).scalars())
+            search_service.index_tasks(db, task_ids)
+            self._emit(db, project_id, "task.created", task_ids)
+            db.commit()
+            tasks_by_id = self._reload(db, task_ids)
+            created = iter(task_ids)
+            for result in results:
+                if result["status"] == "created":
+                    result["id"] = next(created)
+                    result["task"] = tasks_by_id.get(result["id"])
+        return results
+    
+    def bulk_update_tasks(self, db: Session, project_id: int, updates: List[TaskBulkUpdateItem]) -> List[dict]:
+        """Apply partial updates with one executemany UPDATE and one commit"""
+        from app.services import search_service
+        
+        existing = self._existing_ids(db, project_id, [item.id for item in updates])
+        now = datetime.utcnow()
+        
+        results = []
+        mappings = []
+        for item in updates:
+            if item.id not in existing:
+                results.append({"id": item.id, "status": "not_found", "error": "Task not found", "task": None})
+                continue
+            if item.task_type is not None and item.task_type not in self.TASK_TYPES:
+                results.append({"id": item.id, "status": "invalid", "error": "Task type must be 'daily-todos' or 'your-ideas'", "task": None})
+                continue
+            values = item.dict(exclude_none=True, exclude={"id"})
+            mappings.append({"id": item.id, **values, "updated_at": now})
+            results.append({"id": item.id, "status": "updated", "error": None, "task": None})
+        
+        if mappings:
+            # Rows with the same set of columns are sent as one executemany
+            db.execute(update(TaskDB), mappings)
+            search_service.index_tasks(db, [m["id"] for m in mappings])
+            self._emit(db, project_id, "task.updated", [m["id"] for m in mappings])
+            db.commit()
+            self._attach_tasks(db, results)
+        return results
+    
+    def bulk_set_tasks(self, db: Session, project_id: int, task_ids: List[int], values: dict) -> List[dict]:
+        """Set the same columns (e.g. completed or archive) on many tasks with a single UPDATE"""
+        from app.services import search_service
+        
+        existing = self._existing_ids(db, project_id, task_ids)
+        
+        if existing:
+            db.query(TaskDB).filter(
+                TaskDB.project_id == project_id,
+                TaskDB.id.in_(existing)
+            ).update({**values, "updated_at": datetime.utcnow()}, synchronize_session=False)
+            search_service.index_tasks(db, sorted(existing))
+            self._emit(db, project_id, "task.updated", sorted(existing))
+            db.commit()
+        
+        results = [
+            {"id": task_id, "status": "updated", "error": None, "task": None} if task_id in existing
+            else {"id": task_id, "status": "not_found", "error": "Task not found", "task": None}
+            for task_id in task_ids
+        ]
+        self._attach_tasks(db, results)
+        return results
+    
+    def bulk_delete_tasks(self, db: Session, project_id: int, task_ids: List[int]) -> List[dict]:
+        """Delete many tasks with a single DELETE and one commit"""
+        from app.services import sync_service, search_service
+        
+        existing = self._existing_ids(db, project_id, task_ids)
+        
+        if existing:
+            user_id = self._owner_id(db, project_id)
+            db.query(TaskDB).filter(
+                TaskDB.project_id == project_id,
+                TaskDB.id.in_(existing)
+            ).delete(synchronize_session=False)
+            sync_service.record_deletion(db, user_id, "task", sorted(existing))
+            search_service.remove_tasks(db, sorted(existing))
+            event_bus.emit(db, user_id, "task.deleted", project_id=project_id, task_ids=sorted(existing))
+            db.commit()
+        
+        return [
+            {"id": task_id, "status": "deleted", "error": None, "task": None} if task_id in existing
+            else {"id": task_id, "status": "not_found", "error": "Task not found", "task": None}
+            for task_id in task_ids
+        ]
+    
+    def _existing_ids(self, db: Session, project_id: int, task_ids: List[int]) -> set:
+        """Which of the given ids are tasks of this project (one query)"""
+        if not task_ids:
+            return set()
+        return {row.id for row in db.query(TaskDB.id).filter(
+            TaskDB.project_id == project_id,
+            TaskDB.id.in_(set(task_ids))
+        )}
+    
+    def _reload(self, db: Session, task_ids: List[int]) -> Dict[int, TaskDB]:
+        """Load tasks in one SELECT (also refreshes instances expired by the commit)"""
+        if not task_ids:
+            return {}
+        return {task.id: task for task in db.query(TaskDB).filter(TaskDB.id.in_(task_ids))}
+    
+    def _attach_tasks(self, db: Session, results: List[dict]) -> None:
+        tasks = self._reload(db, [r["id"] for r in results if r["status"] == "updated"])
+        for result in results:
+            if result["status"] == "updated":
+                result["task"] = tasks.get(result["id"])
+    
+    def _emit(self, db: Session, project_id: int, event_type: str, task_ids: List[int]) -> None:
+        event_bus.emit(db, self._owner_id(db, project_id), event_type, project_id=project_id, task_ids=task_ids)
+    
+    def _owner_id(self, db: Session, project_id: int) -> Optional[int]:
+        """User who owns a project, for change events and tombstones"""
+        from app.services import project_service
+        
+        return project_service.get_owner_id(db, project_id)
\ No newline at end of file
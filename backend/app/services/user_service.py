@@ -1,17 +1,20 @@
 from sqlalchemy.orm import Session
 from app.models.database import User as UserDB
 from app.models.api_schemas import User, UserCreate, UserResponse, LoginRequest
-from typing import Optional
+from app.core.pagination import prefix_match, keyset_page
+from app.core.identity_cache import identity_cache
+from sqlalchemy import func
+from typing import List, Optional, Tuple
 from datetime import datetime
-import hashlib
 
 class UserService:
     """Service for handling user operations"""
     
     def create_user(self, db: Session, user_create: UserCreate, is_superuser: bool = False) -> User:
-        """Create a new user"""
-        # Simple hash for development (use bcrypt in production)
-        password_hash = hashlib.sha256(user_create.password.encode()).hexdigest() if user_create.password else None
+        """Create a new user (hashes the password inline; async routes hash first with password_service.hash_async)"""
+        from app.services import password_service
+        
+        password_hash = password_service.hash(user_create.password) if user_create.password else None
         
         db_user = UserDB(
             email=user_create.email,
@@ -71,43 +74,101 @@ class UserService:
             updated_at=db_user.updated_at
         )
     
-    def authenticate_user(self, db: Session, email: str, password: Optional[str] = None) -> Optional[User]:
-        """Authenticate user (simplified for development)"""
-        user = self.get_user_by_email(db, email)
-        if not user or not user.is_active:
-            return None
+    async def authenticate_user(self, db: Session, email: str, password: Optional[str] = None) -> Optional[User]:
+        """
+        Authenticate user; without a password (development) the email is enough.
+        The hash is checked off the event loop, and a correct password stored in a
+        legacy or outdated format is rehashed with the current settings.
+        """
+        from app.services import password_service
         
-        # For development: if no password provided, just return user
-        # In production: verify password hash
-        if password is None:
-            return user
-            
-        # Simple password check for development
         db_user = db.query(UserDB).filter(UserDB.email == email).first()
-        if db_user and db_user.password_hash:
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            if password_hash == db_user.password_hash:
-                return user
+        if not db_user or not db_user.is_active:
+            return None
         
-        return None
+        if password is not None:
+            matches, needs_rehash = await password_service.verify_async(password, db_user.password_hash)
+            if not matches:
+                return None
+            if needs_rehash:
+                db_user.password_hash = await password_service.hash_async(password)
+                db.commit()
+        
+        return User(
+            id=db_user.id,
+            email=db_user.email,
+            first_name=db_user.first_name,
+            last_name=db_user.last_name,
+            is_active=db_user.is_active,
+            is_superuser=db_user.is_superuser,
+            created_at=db_user.created_at,
+            updated_at=db_user.updated_at
+        )
     
     def user_exists(self, db: Session, email: str) -> bool:
         """Check if user exists by email"""
         return db.query(UserDB).filter(UserDB.email == email).first() is not None
     
     def user_exists_by_id(self, db: Session, user_id: int) -> bool:
-        """Check if user exists by ID"""
-        return db.query(UserDB).filter(UserDB.id == user_id).first() is not None
+        """Check if an active user exists by ID (cached; see app.core.identity_cache)"""
+        return self._active_user_is_superuser(db, user_id) is not None
 
-    def update_password(self, db: Session, user_id: int, new_password: str) -> bool:
-        """Update user password"""
+    def is_active_superuser(self, db: Session, user_id: int) -> bool:
+        """Check if a user is active and a superuser (cached like user_exists_by_id)"""
+        return bool(self._active_user_is_superuser(db, user_id))
+
+    def _active_user_is_superuser(self, db: Session, user_id: int) -> Optional[bool]:
+        """Superuser flag of an active user, None if the user is inactive or missing"""
+        is_superuser = identity_cache.is_superuser(db, user_id)
+        if is_superuser is not None:
+            return is_superuser
+        user = db.query(UserDB.is_superuser).filter(UserDB.id == user_id, UserDB.is_active == True).first()
+        if user is None:
+            return None
+        identity_cache.remember_user(db, user_id, bool(user.is_superuser))
+        return bool(user.is_superuser)
+
+    def forget_user(self, db: Session, user_id: int) -> None:
+        """Stop trusting cached checks for a user being deleted, deactivated or demoted"""
+        identity_cache.forget_user(db, user_id)
+
+    def adjust_project_count(self, db: Session, user_id: int, delta: int) -> None:
+        """Add delta to the user's denormalized project_count (committed with the caller's transaction)"""
+        db.query(UserDB).filter(UserDB.id == user_id).update(
+            {UserDB.project_count: UserDB.project_count + delta},
+            synchronize_session=False
+        )
+
+    def list_users(
+        self,
+        db: Session,
+        search: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        limit: int = 100,
+        before_id: Optional[int] = None
+    ) -> Tuple[List[UserDB], int, Optional[int]]:
+        """Newest-first page of users for the admin panel; returns (users, total matching, next before_id)"""
+        query = db.query(UserDB)
+        if search:
+            query = query.filter(prefix_match(UserDB.email, UserDB.first_name, UserDB.last_name, term=search))
+        if is_active is not None:
+            query = query.filter(UserDB.is_active == is_active)
+
+        total = query.with_entities(func.count(UserDB.id)).scalar()
+        users, next_before_id = keyset_page(query, UserDB.id, limit, before_id)
+        return users, total, next_before_id
+
+    async def update_password(self, db: Session, user_id: int, new_password: str) -> bool:
+        """Update user password (hashed off the event loop)"""
+        from app.services import password_service
+        
         try:
             db_user = db.query(UserDB).filter(UserDB.id == user_id).first()
             if not db_user:
                 return False
             
             # Hash the new password
-            password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+            password_hash = await password_service.hash_async(new_password)
             
             # Update password hash
             db_user.password_hash = password_hash
@@ -121,14 +182,13 @@ class UserService:
             print(f"Error updating password: {e}")
             return False
 
-    def verify_password(self, password: str, stored_hash: str) -> bool:
-        """Verify a password against its stored hash"""
+    async def verify_password(self, password: str, stored_hash: str) -> bool:
+        """Verify a password against its stored hash (off the event loop)"""
+        from app.services import password_service
+        
         try:
-            # Hash the provided password
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            
-            # Compare with stored hash
-            return password_hash == stored_hash
+            matches, _ = await password_service.verify_async(password, stored_hash)
+            return matches
             
         except Exception as e:
             print(f"Error verifying password: {e}")
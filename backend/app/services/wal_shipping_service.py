@@ -0,0 +1,469 @@
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import struct
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+from app.core.config import settings
+from app.services.backup_service import compress_file, open_backup_file
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock, run a single worker
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+WAL_HEADER_SIZE = 32
+FRAME_HEADER_SIZE = 24
+WAL_MAGIC_LITTLE_ENDIAN = 0x377F0682
+WAL_MAGIC_BIG_ENDIAN = 0x377F0683
+
+class WalGapError(RuntimeError):
+    """Frames were checkpointed before they could be shipped; a new generation is needed"""
+
+def wal_checksum(data: bytes, s0: int, s1: int, big_endian: bool):
+    """SQLite's cumulative WAL checksum over data (a multiple of 8 bytes)"""
+    words = struct.unpack(f"{'>' if big_endian else '<'}{len(data) // 4}I", data)
+    for i in range(0, len(words), 2):
+        s0 = (s0 + words[i] + s1) & 0xFFFFFFFF
+        s1 = (s1 + words[i + 1] + s0) & 0xFFFFFFFF
+    return s0, s1
+
+class WalShippingService:
+    """
+    Continuous backup of the SQLite database by shipping its write-ahead log.
+
+    A generation starts with a full snapshot (SQLite backup API). After that, every
+    BACKUP_WAL_INTERVAL_SECONDS the committed WAL frames written since the last run are
+    appended to the generation as a segment, so the recovery point is one interval old
+    at most and each run copies only what changed. restore() replays the segments over
+    the snapshot up to a point in time.
+
+    The shipper owns checkpointing: app connections only autocheckpoint past
+    BACKUP_WAL_SAFETY_CHECKPOINT_BYTES (a safety net for when the shipper is not running),
+    and the shipper keeps a read transaction open so no other connection can restart the
+    WAL under it. When the WAL passes BACKUP_WAL_CHECKPOINT_BYTES it ships the remainder and
+    checkpoints with RESTART. If frames are ever folded into the database before they
+    were shipped (the checkpoint saw more frames than were shipped, or the WAL salts moved
+    unexpectedly), the shipper starts a new generation rather than leave a gap.
+
+    Layout: <first BACKUP_DESTINATIONS dir>/wal/<generation>/ holds generation.json,
+    the snapshot (base.db) and the segments listed in segments.ndjson.
+
+    One shipper per database: every uvicorn worker calls start(), and only the one that
+    takes the lock on wal/shipper.lock ships; the others skip it.
+    """
+
+    MARKER_TABLE = "_wal_shipping"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._generation: Optional[dict] = None
+        self._wal: Optional[dict] = None
+        self._lock_file = None
+        self.status = {"state": "stopped"}
+
+    @property
+    def root(self) -> str:
+        return os.path.join(settings.BACKUP_DESTINATIONS[0], "wal")
+
+    def start(self) -> bool:
+        """Start the background shipper; returns False when the database is not a SQLite file or another process ships it"""
+        from app.services import backup_service
+
+        if backup_service.database_path() is None:
+            logger.warning("BACKUP_WAL_SHIPPING needs a SQLite database file; WAL shipping is disabled")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+        if not self._acquire_process_lock():
+            logger.info("Another process is shipping the WAL; not starting a shipper in this one")
+            self.status = {"state": "other process"}
+            return False
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="wal-shipping", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """Stop the shipper after a final run, releasing the WAL"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        with self._lock:
+            self._close()
+        self._release_process_lock()
+        self.status = {**self.status, "state": "stopped"}
+
+    def _acquire_process_lock(self) -> bool:
+        """Take wal/shipper.lock without waiting; held (by the open file) until stop() or exit"""
+        if fcntl is None:
+            return True
+        os.makedirs(self.root, exist_ok=True)
+        lock_file = open(os.path.join(self.root, "shipper.lock"), "w")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _release_process_lock(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()  # Closing releases the flock
+            self._lock_file = None
+
+    def _run(self) -> None:
+        self.status = {"state": "running"}
+        while True:
+            try:
+                self.ship()
+            except Exception as e:
+                logger.error(f"WAL shipping failed, starting a new generation on the next run: {e}")
+                self.status = {**self.status, "last_error": str(e), "last_error_at": datetime.utcnow().isoformat()}
+                with self._lock:
+                    self._close()
+            if self._stop.wait(settings.BACKUP_WAL_INTERVAL_SECONDS):
+                # One last run so a clean shutdown loses nothing
+                try:
+                    self.ship()
+                except Exception as e:
+                    logger.error(f"Final WAL shipping run failed: {e}")
+                return
+
+    def ship(self) -> dict:
+        """Ship new WAL frames now (starting a generation if needed); returns the segment written, if any"""
+        from app.services import backup_service
+
+        with self._lock:
+            db_path = backup_service.database_path()
+            if self._generation is None or self._generation_expired():
+                self._start_generation(db_path)
+
+            try:
+                segment = self._ship_frames(db_path)
+                # The shipped offset, not the file size: after RESTART the file keeps its old length
+                if self._wal["offset"] >= settings.BACKUP_WAL_CHECKPOINT_BYTES:
+                    self._checkpoint(db_path)
+            except WalGapError as e:
+                logger.warning(f"{e}; starting a new generation")
+                self._close()
+                self._start_generation(db_path)
+                segment = self._ship_frames(db_path)
+
+            self.status = {
+                **self.status,
+                "generation": self._generation["id"],
+                "wal_index": self._wal["index"],
+                "last_run_at": datetime.utcnow().isoformat(),
+                **({"last_segment": segment} if segment else {})
+            }
+            return segment or {}
+
+    def list_generations(self) -> List[dict]:
+        """Generations with the time range they can restore, oldest first"""
+        generations = []
+        for name in self._generation_names():
+            directory = os.path.join(self.root, name)
+            try:
+                with open(os.path.join(directory, "generation.json"), encoding="utf-8") as f:
+                    generation = json.load(f)
+            except FileNotFoundError:
+                continue  # Snapshot still being written, or a failed start
+            segments = self._read_segments(directory)
+            generation["restorable_until"] = segments[-1]["shipped_at"] if segments else generation["snapshot_at"]
+            generation["segments"] = len(segments)
+            generations.append(generation)
+        return generations
+
+    def restore(self, output_path: str, target_time: Optional[datetime] = None, generation_id: Optional[str] = None) -> dict:
+        """
+        Rebuild the database as of target_time (default: the latest shipped state) into
+        output_path. Uses the newest generation whose snapshot is not after target_time.
+        The result is accurate to within one shipping interval.
+        """
+        from app.services import backup_service
+
+        generations = self.list_generations()
+        if generation_id:
+            generations = [g for g in generations if g["id"] == generation_id]
+        if target_time is not None:
+            generations = [g for g in generations if datetime.fromisoformat(g["snapshot_at"]) <= target_time]
+        if not generations:
+            raise ValueError("No WAL backup generation covers the requested time")
+        generation = generations[-1]
+        directory = os.path.join(self.root, generation["id"])
+
+        partial = f"{output_path}.partial"
+        with open_backup_file(os.path.join(directory, generation["snapshot_file"])) as source, open(partial, "wb") as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+
+        applied = 0
+        restored_to = generation["snapshot_at"]
+        with open(partial, "r+b") as database:
+            wal_header = {}
+            for segment in self._read_segments(directory):
+                if target_time is not None and datetime.fromisoformat(segment["shipped_at"]) > target_time:
+                    break
+                with open_backup_file(os.path.join(directory, segment["file"])) as f:
+                    data = f.read()
+                if segment["offset"] == 0:
+                    wal_header[segment["wal_index"]] = self._parse_header(data[:WAL_HEADER_SIZE])
+                    data = data[WAL_HEADER_SIZE:]
+                self._apply_frames(database, data, wal_header[segment["wal_index"]])
+                applied += 1
+                restored_to = segment["shipped_at"]
+
+        connection = sqlite3.connect(partial)
+        try:
+            connection.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            connection.close()
+        try:
+            tables = backup_service.verify_sqlite(partial)
+        except Exception:
+            os.remove(partial)
+            raise
+        os.replace(partial, output_path)
+
+        return {
+            "output_path": os.path.abspath(output_path),
+            "generation": generation["id"],
+            "segments_applied": applied,
+            "restored_to": restored_to,
+            "tables": tables
+        }
+
+    # Generations
+
+    def _start_generation(self, db_path: str) -> None:
+        from app.services import backup_service
+
+        self._close()
+        connection = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {self.MARKER_TABLE} (id INTEGER PRIMARY KEY, generation TEXT, written_at TEXT)")
+        # Start from a short WAL; a busy checkpoint is fine, the whole WAL is shipped either way
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        self._connection = connection
+
+        started_at = datetime.utcnow()
+        generation_id = started_at.strftime("%Y%m%d_%H%M%S_%f")
+        directory = os.path.join(self.root, generation_id)
+        os.makedirs(directory, exist_ok=True)
+
+        # Pinned before the snapshot: every frame written from here on stays in the WAL
+        # until shipped. Replaying frames the snapshot already contains is harmless.
+        self._pin(generation_id)
+        snapshot_path, _ = backup_service.sqlite_snapshot(db_path, os.path.join(directory, "base.db"))
+        snapshot_path = compress_file(snapshot_path)
+
+        self._generation = {
+            "id": generation_id,
+            "directory": directory,
+            "started_at": started_at.isoformat(),
+            "snapshot_at": datetime.utcnow().isoformat(),
+            "snapshot_file": os.path.basename(snapshot_path),
+            "sequence": 0
+        }
+        self._wal = {"index": 0, "offset": 0, "frames": 0, "salts": None, "previous_salt1": None}
+        with open(os.path.join(directory, "generation.json"), "w", encoding="utf-8") as f:
+            json.dump({key: self._generation[key] for key in ("id", "started_at", "snapshot_at", "snapshot_file")}, f)
+
+        self._rotate_generations()
+        logger.info(f"Started WAL backup generation {generation_id}")
+
+    def _generation_expired(self) -> bool:
+        started_at = datetime.fromisoformat(self._generation["started_at"])
+        return datetime.utcnow() - started_at >= timedelta(hours=settings.BACKUP_WAL_GENERATION_HOURS)
+
+    def _generation_names(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def _rotate_generations(self) -> None:
+        if settings.BACKUP_RETENTION <= 0:
+            return
+        for name in self._generation_names()[:-settings.BACKUP_RETENTION]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            logger.info(f"Removed old WAL backup generation {name}")
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except sqlite3.Error:
+                pass
+        self._connection = None
+        self._generation = None
+        self._wal = None
+
+    # WAL
+
+    def _pin(self, generation_id: str) -> None:
+        """Write a marker row, then hold a read transaction on the WAL it created"""
+        # The write makes sure the read below uses the WAL (an empty WAL would not be pinned)
+        self._connection.execute(
+            f"INSERT OR REPLACE INTO {self.MARKER_TABLE} (id, generation, written_at) VALUES (1, ?, ?)",
+            (generation_id, datetime.utcnow().isoformat())
+        )
+        self._connection.execute("BEGIN")
+        self._connection.execute(f"SELECT COUNT(*) FROM {self.MARKER_TABLE}").fetchone()
+
+    def _ship_frames(self, db_path: str) -> Optional[dict]:
+        """Copy committed frames past the shipped offset into a new segment"""
+        wal = self._wal
+        wal_path = f"{db_path}-wal"
+        if not os.path.exists(wal_path):
+            if wal["offset"]:
+                raise WalGapError("The WAL file disappeared")
+            return None
+
+        with open(wal_path, "rb") as f:
+            header_bytes = f.read(WAL_HEADER_SIZE)
+            if len(header_bytes) < WAL_HEADER_SIZE:
+                if wal["offset"]:
+                    raise WalGapError("The WAL was truncated by another connection")
+                return None
+            header = self._parse_header(header_bytes)
+
+            if wal["salts"] is None:
+                expected = wal["previous_salt1"]
+                if expected is not None and header["salts"][0] != (expected + 1) & 0xFFFFFFFF:
+                    raise WalGapError("The WAL restarted more than once between runs")
+                checksum = wal_checksum(header_bytes[:24], 0, 0, header["big_endian"])
+                if header["checksum"] != checksum:
+                    return None  # Header is being rewritten; try again next run
+                wal.update(salts=header["salts"], big_endian=header["big_endian"], page_size=header["page_size"], checksum=checksum)
+                start = 0
+            elif header["salts"] != wal["salts"]:
+                raise WalGapError("The WAL was restarted by another connection")
+            else:
+                start = wal["offset"]
+
+        return self._ship_from(wal_path, start, header_bytes if start == 0 else b"")
+
+    def _ship_from(self, wal_path: str, start: int, prefix: bytes = b"") -> Optional[dict]:
+        """Ship the committed frames that follow `start` in the current WAL (validated by salt and checksum)"""
+        wal = self._wal
+        with open(wal_path, "rb") as f:
+            f.seek(max(start, WAL_HEADER_SIZE))
+            data = f.read()
+
+        frames, length, checksum = self._committed_frames(data, wal)
+        if not frames:
+            return None
+
+        segment = self._write_segment(prefix + data[:length], start)
+        wal["offset"] = max(start, WAL_HEADER_SIZE) + length
+        wal["frames"] += frames
+        wal["checksum"] = checksum
+        return segment
+
+    def _committed_frames(self, data: bytes, wal: dict):
+        """Count valid frames up to the last commit frame; returns (frames, bytes, checksum)"""
+        frame_size = FRAME_HEADER_SIZE + wal["page_size"]
+        checksum = wal["checksum"]
+        frames = committed_frames = committed_length = 0
+        committed_checksum = checksum
+
+        for offset in range(0, len(data) - frame_size + 1, frame_size):
+            frame_header = data[offset:offset + FRAME_HEADER_SIZE]
+            page_number, db_size, salt1, salt2, c1, c2 = struct.unpack(">IIIIII", frame_header)
+            if (salt1, salt2) != wal["salts"]:
+                break  # Leftover frames from before the last WAL restart
+            checksum = wal_checksum(frame_header[:8], *checksum, wal["big_endian"])
+            checksum = wal_checksum(data[offset + FRAME_HEADER_SIZE:offset + frame_size], *checksum, wal["big_endian"])
+            if checksum != (c1, c2):
+                break  # Frame still being written
+            frames += 1
+            if db_size:
+                committed_frames, committed_length, committed_checksum = frames, offset + frame_size, checksum
+
+        return committed_frames, committed_length, committed_checksum
+
+    def _write_segment(self, payload: bytes, offset: int) -> dict:
+        generation = self._generation
+        generation["sequence"] += 1
+        name = f"{self._wal['index']:06d}_{generation['sequence']:06d}.wal"
+        path = os.path.join(generation["directory"], name)
+        with open(f"{path}.partial", "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{path}.partial", path)
+        path = compress_file(path)
+
+        segment = {
+            "file": os.path.basename(path),
+            "wal_index": self._wal["index"],
+            "offset": offset,
+            "bytes": len(payload),
+            "shipped_at": datetime.utcnow().isoformat()
+        }
+        with open(os.path.join(generation["directory"], "segments.ndjson"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(segment) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return segment
+
+    def _checkpoint(self, db_path: str) -> None:
+        """Fold the shipped WAL into the database so the next writer starts a fresh WAL"""
+        self._connection.execute("COMMIT")  # Release the pin; RESTART waits for readers
+        busy, log_frames, _ = self._connection.execute("PRAGMA wal_checkpoint(RESTART)").fetchone()
+        if not busy:
+            if log_frames > self._wal["frames"]:
+                # Commits that landed after the last ship are still at the end of the old WAL
+                # until the restarted WAL grows over them; ship them before anyone writes more
+                self._ship_from(f"{db_path}-wal", self._wal["offset"])
+            if log_frames != self._wal["frames"]:
+                raise WalGapError(f"Checkpoint folded {log_frames - self._wal['frames']} unshipped WAL frames")
+            self._wal = {
+                "index": self._wal["index"] + 1, "offset": 0, "frames": 0,
+                "salts": None, "previous_salt1": self._wal["salts"][0]
+            }
+        self._pin(self._generation["id"])
+
+    @staticmethod
+    def _parse_header(header_bytes: bytes) -> dict:
+        magic, version, page_size, checkpoint_sequence, salt1, salt2, c1, c2 = struct.unpack(">IIIIIIII", header_bytes)
+        if magic not in (WAL_MAGIC_LITTLE_ENDIAN, WAL_MAGIC_BIG_ENDIAN):
+            raise ValueError("Not a SQLite WAL header")
+        return {
+            "page_size": 65536 if page_size == 1 else page_size,
+            "salts": (salt1, salt2),
+            "checksum": (c1, c2),
+            "big_endian": magic == WAL_MAGIC_BIG_ENDIAN
+        }
+
+    @staticmethod
+    def _apply_frames(database, data: bytes, header: dict) -> None:
+        """Write shipped frames' pages into a database file (segments end on a commit frame)"""
+        page_size = header["page_size"]
+        frame_size = FRAME_HEADER_SIZE + page_size
+        for offset in range(0, len(data) - frame_size + 1, frame_size):
+            page_number, db_size = struct.unpack(">II", data[offset:offset + 8])
+            database.seek((page_number - 1) * page_size)
+            database.write(data[offset + FRAME_HEADER_SIZE:offset + frame_size])
+            if db_size:
+                database.truncate(db_size * page_size)
+
+    @staticmethod
+    def _read_segments(directory: str) -> List[dict]:
+        path = os.path.join(directory, "segments.ndjson")
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
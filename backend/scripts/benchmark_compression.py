@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark for compressed JSON column storage
+
+Stores the same set of generated roadmaps in SQLite files using a plain JSON column
+and the CompressedJSON column (zlib, zlib with a trained dictionary, and zstd when the
+zstandard package is installed), then compares database size, write latency and
+read latency.
+
+Usage:
+    python scripts/benchmark_compression.py [--roadmaps 1000]
+"""
+
+import sys
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import Column, Integer, JSON, create_engine, select
+from sqlalchemy.orm import declarative_base, sessionmaker
+from app.core import compression
+from app.core.compression import CompressionCodec, CompressedJSON, train_dictionary
+from app.core.serialization import canonical_json
+from benchmark_data import build_roadmap
+
+def make_roadmaps(count: int) -> list:
+    """Roadmaps of varying size with distinct names so rows do not compress trivially"""
+    rng = random.Random(7)
+    roadmaps = []
+    for i in range(count):
+        roadmap = build_roadmap(rng.randint(4, 30))
+        roadmap["project"]["name"] = f"Project {i} {rng.getrandbits(64):x}"
+        for epic in roadmap["epics"]:
+            epic["name"] = f"{epic['name']} {rng.getrandbits(32):x}"
+            for story in epic["stories"]:
+                story["completed"] = rng.random() < 0.3
+        roadmaps.append(roadmap)
+    return roadmaps
+
+def run(label: str, column_type, roadmaps: list) -> None:
+    Base = declarative_base()
+
+    class Doc(Base):
+        __tablename__ = "docs"
+        id = Column(Integer, primary_key=True)
+        data = Column(column_type)
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    start = time.perf_counter()
+    for roadmap in roadmaps:
+        db.add(Doc(data=roadmap))
+        db.commit()
+    write_ms = (time.perf_counter() - start) * 1000 / len(roadmaps)
+
+    db.close()
+    engine.dispose()
+    size_kb = os.path.getsize(path) / 1024
+
+    engine = create_engine(f"sqlite:///{path}")
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        rows = conn.execute(select(Doc.data)).scalars().all()
+    read_ms = (time.perf_counter() - start) * 1000 / len(roadmaps)
+    assert rows[0] == roadmaps[0]
+    engine.dispose()
+
+    print(f"{label:<34} {size_kb:>10.0f} KB {write_ms:>12.3f} ms {read_ms:>12.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare compressed vs plain JSON columns")
+    parser.add_argument("--roadmaps", type=int, default=1000)
+    args = parser.parse_args()
+
+    roadmaps = make_roadmaps(args.roadmaps)
+    dictionary = train_dictionary([canonical_json(r).encode("utf-8") for r in roadmaps[:100]])
+
+    print(f"{'Storage':<34} {'DB size':>13} {'write/row':>15} {'read/row':>15}")
+    run("JSON (raw)", JSON, roadmaps)
+
+    variants = [("zlib", None), ("zlib + dictionary", dictionary)]
+    if compression.zstandard is not None:
+        variants += [("zstd", None)]
+    for label, zdict in variants:
+        compression.codec = CompressionCodec(algorithm=label.split()[0], level=6, min_size=0, dictionary=zdict)
+        run(f"CompressedJSON {label}", CompressedJSON, roadmaps)
+
+if __name__ == "__main__":
+    main()
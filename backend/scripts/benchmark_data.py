@@ -0,0 +1,32 @@
+"""
+Synthetic data shared by the benchmark scripts
+"""
+
+def build_roadmap(epic_count: int) -> dict:
+    """A roadmap shaped like the generated ones: epics, stories, criteria, mermaid diagram"""
+    return {
+        "project": {"name": "Benchmark", "vision": "Measure version storage", "type": "web", "target_users": "developers"},
+        "epics": [
+            {
+                "id": e,
+                "name": f"Epic {e}",
+                "priority": "P1",
+                "description": f"Deliver the functionality for feature area {e} end to end.",
+                "stories": [
+                    {
+                        "id": e * 100 + s,
+                        "title": f"Story {e}.{s}: implement the endpoint and UI",
+                        "acceptance_criteria": [f"Criterion {c} for story {e}.{s} is satisfied" for c in range(4)],
+                        "completed": False
+                    }
+                    for s in range(5)
+                ]
+            }
+            for e in range(1, epic_count + 1)
+        ],
+        "architecture": {
+            "mermaid_diagram": "graph TD\n" + "\n".join(f"  C{i}[Component {i}] --> C{i + 1}" for i in range(40)),
+            "components": [f"Component {i}" for i in range(40)]
+        },
+        "message": None
+    }
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the FAST_JSON (orjson) serialization path
+
+Builds a list of ProjectResponse objects with full roadmaps and tasks, like
+GET /api/projects returns for a busy user, and times rendering it with the
+stdlib JSONResponse against ORJSONResponse. Also times dumps/loads of a single
+roadmap blob, which is what the JSON columns and the agent routes do.
+
+Requires the orjson package (`pip install orjson`).
+
+Usage:
+    python scripts/benchmark_json.py [--projects 200] [--epics 20] [--tasks 50]
+"""
+
+import sys
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import orjson
+except ImportError:
+    print("❌ orjson is not installed: pip install orjson")
+    sys.exit(1)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.models.api_schemas import ProjectResponse
+from benchmark_data import build_roadmap
+
+def build_projects(count: int, epic_count: int, task_count: int) -> list:
+    now = datetime.utcnow()
+    tasks = [
+        {"id": t, "project_id": 1, "text": f"Task {t}: follow up on the review comments", "completed": t % 3 == 0,
+         "task_type": "daily-todos", "created_at": now, "updated_at": now, "archive": False}
+        for t in range(task_count)
+    ]
+    return [
+        ProjectResponse(
+            id=p, name=f"Project {p}", description="Benchmark project", status="active",
+            roadmap_data=build_roadmap(epic_count),
+            tasks={"daily_todos": tasks, "your_ideas": []},
+            created_at=now, updated_at=now
+        )
+        for p in range(count)
+    ]
+
+def timed(fn, repeat: int) -> list:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--epics", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    projects = build_projects(args.projects, args.epics, args.tasks)
+    # FastAPI runs the response_model through jsonable_encoder before render()
+    content = jsonable_encoder(projects)
+    roadmap = build_roadmap(args.epics)
+    roadmap_text = json.dumps(roadmap)
+
+    results = {
+        "Response render (stdlib)": timed(lambda: JSONResponse(content), args.repeat),
+        "Response render (orjson)": timed(lambda: ORJSONResponse(content), args.repeat),
+        "Roadmap dumps (stdlib)": timed(lambda: json.dumps(roadmap, ensure_ascii=False), args.repeat * 20),
+        "Roadmap dumps (orjson)": timed(lambda: orjson.dumps(roadmap).decode("utf-8"), args.repeat * 20),
+        "Roadmap loads (stdlib)": timed(lambda: json.loads(roadmap_text), args.repeat * 20),
+        "Roadmap loads (orjson)": timed(lambda: orjson.loads(roadmap_text), args.repeat * 20),
+    }
+
+    body_size = len(JSONResponse(content).body)
+    print(f"{args.projects} projects, {args.epics} epics, {args.tasks} tasks each: {body_size / 1024 / 1024:.1f} MB response")
+    print(f"Roadmap blob: {len(roadmap_text) / 1024:.1f} KB")
+    for name, times in results.items():
+        print(f"{name:28} median {statistics.median(times) * 1000:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark for login throughput under concurrency
+
+Runs --logins concurrent password checks (what POST /api/auth/login does) on one
+event loop, next to a heartbeat task that measures how long the loop is blocked,
+once with the KDF called inline and once through PasswordService's worker pool
+for each pool size. Inline hashing serializes every login and freezes the loop
+for the whole burst; the pool keeps the loop responsive and uses several cores.
+
+Usage:
+    python scripts/benchmark_passwords.py [--logins 64] [--workers 1 2 4 8] [--log-n 14]
+"""
+
+import sys
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import settings
+from app.services.password_service import PasswordService
+
+HEARTBEAT_SECONDS = 0.005
+
+async def run(service: PasswordService, stored_hash: str, logins: int, inline: bool):
+    stalls = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            stalls.append(time.perf_counter() - started - HEARTBEAT_SECONDS)
+
+    async def login():
+        if inline:
+            matches, _ = service.verify("correct horse", stored_hash)
+        else:
+            matches, _ = await service.verify_async("correct horse", stored_hash)
+        assert matches
+
+    monitor = asyncio.create_task(heartbeat())
+    await asyncio.sleep(HEARTBEAT_SECONDS * 2)
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await monitor
+    return elapsed, max(stalls)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--log-n", type=int, default=settings.PASSWORD_SCRYPT_LOG_N)
+    args = parser.parse_args()
+
+    settings.PASSWORD_SCRYPT_LOG_N = args.log_n
+    service = PasswordService()
+    started = time.perf_counter()
+    stored_hash = service.hash("correct horse")
+    print(f"scrypt N=2**{args.log_n}: {(time.perf_counter() - started) * 1000:.0f} ms per hash, {args.logins} concurrent logins")
+
+    runs = [("inline", 0)] + [(f"pool of {workers}", workers) for workers in args.workers]
+    for label, workers in runs:
+        if workers:
+            settings.PASSWORD_HASH_WORKERS = workers
+            service.stop()
+        elapsed, stall = asyncio.run(run(service, stored_hash, args.logins, inline=not workers))
+        print(f"{label:12} {args.logins / elapsed:7.1f} logins/s  event loop blocked up to {stall * 1000:7.1f} ms")
+    service.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for building project/task responses
+
+Compares the old route code (TaskResponse/TasksByType/Roadmap/ProjectResponse built
+field by field, which FastAPI then dumps and validates again) with the projection
+dicts in app/api/projections.py (validated once against the response_model).
+Both paths go through FastAPI's own serialize_response, so the numbers include
+everything a request pays except the JSON rendering.
+
+Usage:
+    python scripts/benchmark_projection.py [--tasks 10000] [--roadmaps 100]
+"""
+
+import sys
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.api.projections import project_to_dict, tasks_by_type_to_dict
+from app.models.api_schemas import ProjectResponse, Roadmap, TaskResponse, TasksByType
+from app.models.database import Project as ProjectDB, Task as TaskDB
+from benchmark_data import build_roadmap
+
+def build_rows(task_count: int, roadmap_count: int, epic_count: int):
+    now = datetime.utcnow()
+    projects = [
+        ProjectDB(id=p, user_id=1, name=f"Project {p}", description="Benchmark project", status="active",
+                  created_at=now, updated_at=now)
+        for p in range(roadmap_count)
+    ]
+    roadmaps = {project.id: build_roadmap(epic_count) for project in projects}
+    tasks = {"daily-todos": [], "your-ideas": []}
+    for t in range(task_count):
+        task_type = "daily-todos" if t % 2 else "your-ideas"
+        tasks[task_type].append(TaskDB(id=t, project_id=0, text=f"Task {t}", completed=t % 3 == 0,
+                                       task_type=task_type, archive=None, created_at=now, updated_at=now))
+    return projects, roadmaps, tasks
+
+def old_tasks(tasks_by_type) -> TasksByType:
+    def to_response(task):
+        return TaskResponse(id=task.id, project_id=task.project_id, text=task.text, completed=task.completed,
+                            task_type=task.task_type, created_at=task.created_at, updated_at=task.updated_at,
+                            archive=task.archive or False)
+    return TasksByType(
+        daily_todos=[to_response(task) for task in tasks_by_type["daily-todos"]],
+        your_ideas=[to_response(task) for task in tasks_by_type["your-ideas"]]
+    )
+
+def old_projects(projects, roadmaps) -> List[ProjectResponse]:
+    no_tasks = {"daily-todos": [], "your-ideas": []}
+    return [
+        ProjectResponse(id=project.id, name=project.name, description=project.description, status=project.status,
+                        roadmap_data=Roadmap(**roadmaps[project.id]), tasks=old_tasks(no_tasks),
+                        created_at=project.created_at, updated_at=project.updated_at)
+        for project in projects
+    ]
+
+def new_projects(projects, roadmaps) -> list:
+    no_tasks = {"daily-todos": [], "your-ideas": []}
+    return [project_to_dict(project, roadmaps[project.id], no_tasks) for project in projects]
+
+def timed(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--roadmaps", type=int, default=100)
+    parser.add_argument("--epics", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    projects, roadmaps, tasks = build_rows(args.tasks, args.roadmaps, args.epics)
+    tasks_field = create_response_field(name="Response_tasks", type_=TasksByType)
+    projects_field = create_response_field(name="Response_projects", type_=List[ProjectResponse])
+
+    def respond(field, content):
+        return asyncio.run(serialize_response(field=field, response_content=content, is_coroutine=True))
+
+    results = [
+        (f"{args.tasks} tasks, per-field models", timed(lambda: respond(tasks_field, old_tasks(tasks)), args.repeat)),
+        (f"{args.tasks} tasks, projection", timed(lambda: respond(tasks_field, tasks_by_type_to_dict(tasks)), args.repeat)),
+        (f"{args.roadmaps} roadmaps, per-field models", timed(lambda: respond(projects_field, old_projects(projects, roadmaps)), args.repeat)),
+        (f"{args.roadmaps} roadmaps, projection", timed(lambda: respond(projects_field, new_projects(projects, roadmaps)), args.repeat)),
+    ]
+    for name, median in results:
+        print(f"{name:36} median {median:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark for roadmap version history (snapshots + compressed deltas)
+
+Builds a 500-version history for a 30-epic roadmap in an in-memory SQLite database,
+where each version toggles a story, renames an epic or appends a story. Reports the
+storage used by the version table against storing a full copy per version, and the
+latency of reconstructing versions cold (replay from snapshot) and warm (cache hit).
+
+Usage:
+    python scripts/benchmark_roadmap_versions.py [--versions 500] [--epics 30]
+"""
+
+import sys
+import argparse
+import copy
+import random
+import statistics
+import time
+import zlib
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from app.core.serialization import canonical_json
+from app.models.database import Base, RoadmapVersion
+from app.services.roadmap_version_service import RoadmapVersionService
+from benchmark_data import build_roadmap
+
+def mutate(roadmap: dict, rng: random.Random) -> None:
+    """Apply one small edit, like a user or the agent would"""
+    epic = rng.choice(roadmap["epics"])
+    action = rng.random()
+    if action < 0.6:
+        story = rng.choice(epic["stories"])
+        story["completed"] = not story["completed"]
+    elif action < 0.85:
+        epic["name"] = f"{epic['name'].split(' (')[0]} (rev {rng.randint(1, 9999)})"
+    else:
+        next_id = max(s["id"] for s in epic["stories"]) + 1
+        epic["stories"].append({"id": next_id, "title": f"Follow-up story {next_id}", "acceptance_criteria": ["Done"], "completed": False})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--versions", type=int, default=500)
+    parser.add_argument("--epics", type=int, default=30)
+    parser.add_argument("--samples", type=int, default=100)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine, tables=[RoadmapVersion.__table__])
+    db = sessionmaker(bind=engine)()
+    service = RoadmapVersionService()
+    rng = random.Random(42)
+
+    roadmap = build_roadmap(args.epics)
+    previous = None
+    full_raw_bytes = 0
+    full_zlib_bytes = 0
+    write_times = []
+    for _ in range(args.versions):
+        encoded = canonical_json(roadmap).encode("utf-8")
+        full_raw_bytes += len(encoded)
+        full_zlib_bytes += len(zlib.compress(encoded, 9))
+
+        start = time.perf_counter()
+        service.record_version(db, 1, previous, roadmap)
+        db.commit()
+        write_times.append(time.perf_counter() - start)
+
+        previous = copy.deepcopy(roadmap)
+        mutate(roadmap, rng)
+
+    stored_bytes = db.query(func.sum(func.length(RoadmapVersion.payload))).scalar()
+    snapshots = db.query(RoadmapVersion).filter(RoadmapVersion.is_snapshot == True).count()
+
+    versions = [rng.randint(1, args.versions) for _ in range(args.samples)]
+    cold, warm = [], []
+    for version in versions:
+        service.clear_cache()
+        start = time.perf_counter()
+        service.get_version(db, 1, version)
+        cold.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        service.get_version(db, 1, version)
+        warm.append(time.perf_counter() - start)
+
+    def ms(values):
+        return f"median {statistics.median(values) * 1000:.2f} ms, p95 {sorted(values)[int(len(values) * 0.95) - 1] * 1000:.2f} ms"
+
+    print(f"Versions: {args.versions} ({snapshots} snapshots, interval {service.SNAPSHOT_INTERVAL}), roadmap size {len(encoded) / 1024:.1f} KB")
+    print(f"Full copies (raw JSON):   {full_raw_bytes / 1024:10.1f} KB")
+    print(f"Full copies (zlib):       {full_zlib_bytes / 1024:10.1f} KB")
+    print(f"Snapshots + deltas:       {stored_bytes / 1024:10.1f} KB ({full_raw_bytes / stored_bytes:.0f}x smaller than raw)")
+    print(f"Record version:           {ms(write_times)}")
+    print(f"Reconstruct (cold):       {ms(cold)}")
+    print(f"Reconstruct (cache hit):  {ms(warm)}")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark for full-text search latency
+
+Loads synthetic documents (Zipf-distributed vocabulary, spread over many users like
+real projects, stories, tasks and messages) into a scratch database, builds the
+index the way SearchService.rebuild() does, and times SearchService.search() for
+rare words, common words, multi-word queries and type-ahead prefixes, each for a
+random user. Also times the per-document cost of the write hooks, and checks that
+ranking covers all of a user's matches: the best match for a word is the oldest
+document, followed by many newer, weaker matches, and must still come first.
+
+Usage:
+    python scripts/benchmark_search.py [--documents 1000000] [--users 10000] [--samples 200]
+    python scripts/benchmark_search.py --url postgresql://localhost/search_bench
+"""
+
+import sys
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.services.search_service import SearchService, search_documents
+
+KINDS = ("project", "epic", "story", "task", "message")
+NEEDLE = "needle0"  # Generated words are letters only, so only the planted documents match
+NEEDLE_MATCHES = 1000
+
+def build_vocabulary(size: int, rng: random.Random):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    words = sorted(words)
+    rng.shuffle(words)
+    # Zipf-like weights: a few very common words, a long tail of rare ones
+    cumulative, total = [], 0.0
+    for rank in range(size):
+        total += 1.0 / (rank + 1)
+        cumulative.append(total)
+    return words, cumulative
+
+def documents(count: int, users: int, words, cumulative, rng: random.Random):
+    for object_id in range(1, count + 1):
+        title = " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(2, 6)))
+        body = " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(0, 40)))
+        yield {
+            "kind": KINDS[object_id % len(KINDS)],
+            "object_id": object_id,
+            "parent_id": None,
+            "user_id": rng.randint(1, users),
+            "project_id": rng.randint(1, users * 5),
+            "title": title,
+            "body": body
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--url", help="Database to use (default: a temporary SQLite file); its search tables are replaced")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    scratch = None
+    if args.url:
+        url = args.url
+    else:
+        scratch = tempfile.mkdtemp()
+        url = f"sqlite:///{os.path.join(scratch, 'search_bench.db')}"
+    engine = create_engine(url)
+    Session = sessionmaker(bind=engine)
+    service = SearchService()
+
+    words, cumulative = build_vocabulary(args.vocabulary, rng)
+    db = Session()
+    conn = db.connection()
+    backend = service._backend(conn)
+    backend.drop(conn)
+    search_documents.drop(conn, checkfirst=True)
+    search_documents.create(conn)
+    backend.create(conn)
+
+    # The oldest document is the best match for NEEDLE (in its title); newer ones only
+    # mention it in the body
+    needle = {**next(documents(1, 1, words, cumulative, rng)), "object_id": 0, "title": f"{NEEDLE} {NEEDLE}"}
+    service._insert(db, iter([needle]))
+
+    started = time.perf_counter()
+    loaded = service._insert(db, documents(args.documents, args.users, words, cumulative, rng))
+    load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    backend.finish_load(conn)
+    db.commit()
+    index_seconds = time.perf_counter() - started
+    service._ready = True
+    weaker = [
+        {**document, "object_id": -index, "body": f"{document['body']} {NEEDLE}"}
+        for index, document in enumerate(documents(NEEDLE_MATCHES, 1, words, cumulative, rng), 1)
+    ]
+    service._insert(db, iter(weaker))
+    db.commit()
+    print(f"Loaded {loaded} documents for {args.users} users in {load_seconds:.1f}s, indexed in {index_seconds:.1f}s")
+
+    # Word rank decides how many documents contain it: ~1 in 10 for the most common
+    queries = {
+        "rare word": lambda: rng.choice(words[2000:]),
+        "common word": lambda: rng.choice(words[:20]),
+        "two words": lambda: f"{rng.choice(words[:100])} {rng.choice(words[:100])}",
+        "type-ahead prefix": lambda: rng.choice(words[:500])[:rng.randint(2, 6)],
+        "long prefix": lambda: rng.choice([word for word in words[:500] if len(word) > 7])[:-1],
+    }
+
+    def ms(values):
+        values = sorted(values)
+        return (
+            f"p50 {statistics.median(values) * 1000:7.2f} ms  "
+            f"p95 {values[int(len(values) * 0.95) - 1] * 1000:7.2f} ms  "
+            f"max {values[-1] * 1000:7.2f} ms"
+        )
+
+    for label, make_query in queries.items():
+        timings, hits = [], 0
+        for _ in range(args.samples):
+            query = make_query()
+            user_id = rng.randint(1, args.users)
+            started = time.perf_counter()
+            results = service.search(db, user_id, query, limit=20)
+            timings.append(time.perf_counter() - started)
+            hits += len(results)
+        print(f"{label:18} {ms(timings)}  ({hits / args.samples:.1f} results/query)")
+
+    started = time.perf_counter()
+    results = service.search(db, needle["user_id"], NEEDLE, limit=20)
+    elapsed = time.perf_counter() - started
+    found = results[0]["id"] == needle["object_id"] if results else False
+    print(f"{'old best match':18} {elapsed * 1000:7.2f} ms  ({'first' if found else 'MISSING'} among {NEEDLE_MATCHES + 1} matches)")
+
+    # Write hooks: delete + insert one document, as index_tasks() does for a task edit
+    timings = []
+    for document in documents(args.samples, args.users, words, cumulative, rng):
+        document["object_id"] += args.documents
+        started = time.perf_counter()
+        service._delete(db, (search_documents.c.kind == document["kind"]) & (search_documents.c.object_id == document["object_id"]))
+        service._insert(db, iter([document]))
+        db.commit()
+        timings.append(time.perf_counter() - started)
+    print(f"{'reindex 1 document':18} {ms(timings)}  (including commit)")
+
+    db.close()
+    if scratch:
+        print(f"Database file: {os.path.join(scratch, 'search_bench.db')} ({os.path.getsize(os.path.join(scratch, 'search_bench.db')) / 1e6:.0f} MB)")
+
+if __name__ == "__main__":
+    main()
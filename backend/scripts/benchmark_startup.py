@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark for cold start: import time of the app
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters (what a new
+worker does before serving its first request) and reports the median total import
+time and the slowest top-level packages. Fails (exit 1) when one of the modules that
+must load lazily (agent_runtime.LAZY_MODULES: Google ADK and the agent graph) is
+imported at startup again, or when the median exceeds --max-ms, so it can run as a
+check before deploys.
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 5] [--top 15] [--max-ms 0]
+"""
+
+import sys
+import argparse
+import os
+import statistics
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.agent_runtime import LAZY_MODULES
+
+def import_profile(module: str):
+    """(module -> cumulative microseconds) for one cold import of `module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=0, help="fail above this median (0: no limit)")
+    args = parser.parse_args()
+
+    totals = []
+    packages = defaultdict(list)
+    for _ in range(args.runs):
+        profile = import_profile(args.module)
+        totals.append(profile[args.module] / 1000)
+        for name, cumulative_us in profile.items():
+            # Top-level packages only; their cumulative time includes submodules
+            if "." not in name:
+                packages[name].append(cumulative_us / 1000)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.0f} ms, min {min(totals):.0f} ms over {args.runs} cold runs")
+    print(f"\nslowest top-level packages (median ms):")
+    slowest = sorted(((statistics.median(times), name) for name, times in packages.items()), reverse=True)
+    for ms, name in slowest[:args.top]:
+        print(f"{ms:9.1f}  {name}")
+
+    eager = sorted(
+        name for name in profile
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+    failed = False
+    if eager:
+        print(f"\nFAIL: imported at startup but should load on first use: {', '.join(eager[:10])}")
+        failed = True
+    if args.max_ms and median > args.max_ms:
+        print(f"\nFAIL: median import time {median:.0f} ms is above --max-ms {args.max_ms:.0f}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
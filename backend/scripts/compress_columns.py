@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Migrate large JSON/Text columns to the compressed storage format
+
+The compressed column types read uncompressed legacy values transparently, so this
+script is optional: it rewrites existing rows in batches so they take less space.
+Rows that are already compressed are skipped, so it is safe to re-run. (On Postgres,
+app startup has already converted the columns to bytea; see app.core.migrations.)
+
+Usage:
+    # Compress every uncompressed value (and VACUUM SQLite afterwards)
+    python scripts/compress_columns.py --vacuum
+
+    # Train a shared dictionary from existing roadmaps, then point
+    # STORAGE_COMPRESSION_DICTIONARY at it and run the migration
+    python scripts/compress_columns.py --train-dictionary roadmap.dict
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+from app.core.database import engine
+from app.core.compression import codec, is_compressed, train_dictionary
+from app.core.migrations import COMPRESSED_COLUMNS, apply_migrations
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+def to_text(value) -> str:
+    """Legacy values come back as str (SQLite TEXT) or bytes"""
+    return value if isinstance(value, str) else bytes(value).decode("utf-8")
+
+def compress_column(table: str, column: str) -> int:
+    """Rewrite uncompressed values of one column in id-ordered batches"""
+    compressed = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                f"SELECT id, {column} AS value FROM {table} "
+                f"WHERE id > :last_id AND {column} IS NOT NULL ORDER BY id LIMIT :limit"
+            ), {"last_id": last_id, "limit": BATCH_SIZE}).fetchall()
+            if not rows:
+                return compressed
+
+            updates = []
+            for row in rows:
+                if is_compressed(row.value):
+                    continue
+                encoded = codec.encode(to_text(row.value).encode("utf-8"))
+                # Values below STORAGE_COMPRESSION_MIN_BYTES stay as they are
+                if is_compressed(encoded):
+                    updates.append({"id": row.id, "value": encoded})
+            if updates:
+                conn.execute(text(f"UPDATE {table} SET {column} = :value WHERE id = :id"), updates)
+            compressed += len(updates)
+            last_id = rows[-1].id
+
+def write_dictionary(path: str, sample_count: int):
+    """Train a shared dictionary from existing roadmap JSON"""
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT roadmap_data FROM projects WHERE roadmap_data IS NOT NULL ORDER BY id DESC LIMIT :limit"
+        ), {"limit": sample_count}).fetchall()
+
+    samples = [codec.decode(row.roadmap_data).encode("utf-8") for row in rows]
+    if not samples:
+        logger.error("❌ No roadmaps found to train a dictionary from")
+        sys.exit(1)
+
+    dictionary = train_dictionary(samples)
+    Path(path).write_bytes(dictionary)
+    logger.info(f"✅ Wrote {len(dictionary)} byte dictionary from {len(samples)} roadmaps to {path}")
+    logger.info(f"   Set STORAGE_COMPRESSION_DICTIONARY={path} before compressing")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress large JSON/Text columns")
+    parser.add_argument("--train-dictionary", metavar="PATH", help="Write a shared dictionary and exit")
+    parser.add_argument("--samples", type=int, default=1000, help="Roadmaps to sample for the dictionary")
+    parser.add_argument("--vacuum", action="store_true", help="Run VACUUM afterwards to reclaim space (SQLite)")
+    args = parser.parse_args()
+
+    if args.train_dictionary:
+        write_dictionary(args.train_dictionary, args.samples)
+        return
+
+    if codec.algorithm == "none":
+        logger.error("❌ STORAGE_COMPRESSION is 'none'; nothing to do")
+        sys.exit(1)
+
+    try:
+        # Converts the Postgres columns to bytea if the app has not started since upgrading
+        apply_migrations(engine)
+
+        for table, column in COMPRESSED_COLUMNS:
+            count = compress_column(table, column)
+            logger.info(f"✅ Compressed {count} values in {table}.{column}")
+
+        if args.vacuum and engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+            logger.info("✅ Vacuumed database")
+
+    except Exception as e:
+        logger.error(f"❌ Error compressing columns: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Backfill the normalized epics/stories tables from projects.roadmap_data
+
+Projects saved before the tables existed are still served from the JSON blob.
+Run this once to copy their epics and stories into indexed rows.
+
+Usage:
+    python scripts/normalize_roadmaps.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import engine, SessionLocal
+from app.core.migrations import apply_migrations
+from app.models.database import Base, Project
+from app.services import roadmap_service
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+def main():
+    """Normalize every project roadmap that has no epic rows yet"""
+    Base.metadata.create_all(bind=engine)
+    apply_migrations(engine)
+
+    db = SessionLocal()
+    try:
+        normalized = 0
+        project_ids = [row.id for row in db.query(Project.id).filter(Project.roadmap_data.isnot(None))]
+        for project_id in project_ids:
+            if roadmap_service.is_normalized(db, project_id):
+                continue
+            project = db.query(Project).filter(Project.id == project_id).first()
+            roadmap_service.sync_project_roadmap(db, project.id, project.roadmap_data)
+            normalized += 1
+            if normalized % BATCH_SIZE == 0:
+                db.commit()
+                db.expunge_all()
+                logger.info(f"   Normalized {normalized} roadmaps...")
+        db.commit()
+        logger.info(f"✅ Normalized {normalized} project roadmaps")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Error normalizing roadmaps: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import pytest
+
+from app.core.json_delta import apply_json_delta, diff_json
+
+ROADMAP = {
+    "epics": [
+        {"id": 1, "name": "Setup", "stories": [{"id": 101, "title": "Init", "completed": False}]},
+        {"id": 2, "name": "Build", "stories": []},
+    ],
+    "estimate": 1.5,
+}
+
+@pytest.mark.parametrize("a, b", [
+    (ROADMAP, ROADMAP),
+    (ROADMAP, {**ROADMAP, "estimate": 2.0}),
+    (ROADMAP, {"epics": ROADMAP["epics"][:1]}),
+    (ROADMAP, {**ROADMAP, "epics": ROADMAP["epics"] + [{"id": 3, "name": "Ship", "stories": []}]}),
+    (ROADMAP, {**ROADMAP, "epics": [{**ROADMAP["epics"][0], "stories": [{"id": 101, "title": "Init", "completed": True}]}]}),
+    (ROADMAP, []),
+    ({"a": None}, {"a": {"b": [1, 2]}}),
+    ([1, [2, 3]], [1, [2], 4]),
+    ({"completed": 1}, {"completed": True}),
+    ({"completed": True}, {"completed": 1}),
+    ([0], [False]),
+    ({"estimate": 1}, {"estimate": 1.0}),
+    ({"priority": 1.0}, {"priority": 1}),
+])
+def test_round_trip(a, b):
+    # repr() tells True from 1 and 1.0 from 1, which == does not
+    assert repr(apply_json_delta(a, diff_json(a, b))) == repr(b)
+
+@pytest.mark.parametrize("a, b", [
+    (1, True),
+    (0, False),
+    (1, 1.0),
+    ({"x": [1]}, {"x": [True]}),
+])
+def test_type_changes_are_changes(a, b):
+    assert diff_json(a, b) is not None
+
+def test_equal_documents_have_no_delta():
+    assert diff_json(ROADMAP, {**ROADMAP}) is None
+
+def test_input_is_not_modified():
+    a = {"epics": [{"id": 1, "stories": []}]}
+    b = {"epics": [{"id": 1, "stories": [{"id": 101}]}]}
+    apply_json_delta(a, diff_json(a, b))["epics"][0]["stories"].append({"id": 102})
+    assert a == {"epics": [{"id": 1, "stories": []}]}
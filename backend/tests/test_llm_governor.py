@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.core.llm_governor import LlmBusyError, LlmGovernor
+
+async def settle():
+    """Let every ready task run until it blocks again"""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+def test_slots_are_shared_round_robin_across_users():
+    async def run():
+        governor = LlmGovernor(capacity=1, queue_timeout_seconds=5)
+        order = []
+
+        async def call(user_id, name):
+            async with governor.slot(user_id):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await governor.acquire("holder")
+        # One user queues three calls before two others queue one each
+        tasks = [asyncio.create_task(call(user_id, name)) for user_id, name in [
+            ("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"), ("c", "c1")
+        ]]
+        await settle()
+        assert governor.stats()["queued"] == 5 and governor.stats()["queued_users"] == 3
+        governor.release()
+        await asyncio.gather(*tasks)
+        return order, governor.stats()
+
+    order, stats = asyncio.run(run())
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+    assert stats["active"] == 0 and stats["queued"] == 0 and stats["granted"] == 6
+
+def test_capacity_is_never_exceeded():
+    async def run():
+        governor = LlmGovernor(capacity=2, queue_timeout_seconds=5)
+        running, peak = 0, 0
+
+        async def call(user_id):
+            nonlocal running, peak
+            async with governor.slot(user_id):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.001)
+                running -= 1
+
+        await asyncio.gather(*(call(index % 3) for index in range(12)))
+        return peak, governor.stats()["active"]
+
+    assert asyncio.run(run()) == (2, 0)
+
+def test_slot_is_released_when_the_call_is_cancelled():
+    async def run():
+        governor = LlmGovernor(capacity=1, queue_timeout_seconds=5)
+        started = asyncio.Event()
+
+        async def call():
+            async with governor.slot("a"):
+                started.set()
+                await asyncio.sleep(60)
+
+        task = asyncio.create_task(call())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return governor.stats()["active"]
+
+    assert asyncio.run(run()) == 0
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        governor = LlmGovernor(capacity=1, queue_timeout_seconds=5)
+        await governor.acquire("holder")
+        waiter = asyncio.create_task(governor.acquire("a"))
+        await settle()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        queued = governor.stats()["queued"]
+        governor.release()
+        return queued, governor.stats()["active"]
+
+    assert asyncio.run(run()) == (0, 0)
+
+def test_waiting_too_long_raises_busy():
+    async def run():
+        governor = LlmGovernor(capacity=1, queue_timeout_seconds=0.01)
+        await governor.acquire("holder")
+        with pytest.raises(LlmBusyError):
+            await governor.acquire("a")
+        return governor.stats()
+
+    stats = asyncio.run(run())
+    assert stats["timed_out"] == 1 and stats["queued"] == 0 and stats["active"] == 1
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core import rate_limit
+from app.core.rate_limit import Budget, MemoryBucketStore, RateLimiter, RateLimitMiddleware
+
+budget = Budget(capacity=2, refill_per_second=0.5)
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+def take(store, key="read:user:1"):
+    return asyncio.run(store.take(key, budget))
+
+def test_burst_then_wait_for_refill(clock):
+    store = MemoryBucketStore()
+    assert [take(store), take(store)] == [0, 0]
+    assert take(store) == pytest.approx(2.0)
+    clock.now += 1
+    assert take(store) == pytest.approx(1.0)
+    clock.now += 1
+    assert take(store) == 0
+    assert take(store) == pytest.approx(2.0)
+
+def test_refill_stops_at_capacity(clock):
+    store = MemoryBucketStore()
+    take(store)
+    clock.now += 3600
+    assert [take(store), take(store)] == [0, 0]
+    assert take(store) > 0
+
+def test_buckets_are_per_key(clock):
+    store = MemoryBucketStore()
+    take(store), take(store)
+    assert take(store) > 0
+    assert take(store, "read:user:2") == 0
+
+def test_sweep_keeps_buckets_that_are_not_full(clock, monkeypatch):
+    monkeypatch.setattr(MemoryBucketStore, "MAX_BUCKETS", 2)
+    store = MemoryBucketStore()
+    take(store, "a")
+    take(store, "b")
+    clock.now += 1  # "a" and "b" are half refilled
+    take(store, "c")
+    assert set(store._buckets) == {"a", "b", "c"}
+    clock.now += 10
+    take(store, "d")
+    assert set(store._buckets) == {"d"}
+
+class FixedStore:
+    def __init__(self, wait):
+        self.wait = wait
+        self.keys = []
+
+    async def take(self, key, budget):
+        self.keys.append(key)
+        return self.wait
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_ENABLED", True)
+
+def client(wait):
+    store = FixedStore(wait)
+    app = Starlette(routes=[
+        Route("/api/projects", lambda request: PlainTextResponse("ok"), methods=["GET", "POST"]),
+        Route("/api/health", lambda request: PlainTextResponse("ok")),
+    ])
+    return TestClient(RateLimitMiddleware(app, RateLimiter(store))), store
+
+def test_empty_bucket_answers_429_with_retry_after():
+    test_client, store = client(wait=2.2)
+    response = test_client.post("/api/projects")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+    assert "write" in response.json()["detail"]
+    assert store.keys == ["write:ip:testclient"]
+
+def test_retry_after_is_at_least_one_second():
+    test_client, _ = client(wait=0.01)
+    assert test_client.get("/api/projects").headers["retry-after"] == "1"
+
+def test_requests_pass_while_tokens_remain():
+    test_client, store = client(wait=0)
+    assert test_client.get("/api/projects").text == "ok"
+    assert store.keys == ["read:ip:testclient"]
+
+def test_health_is_not_limited():
+    test_client, store = client(wait=5)
+    assert test_client.get("/api/health").status_code == 200
+    assert store.keys == []
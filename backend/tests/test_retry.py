@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.core import retry
+from app.core.retry import RetryPolicy, is_retryable, retry_after_seconds
+
+class ProviderError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+class Clock:
+    """Fake monotonic clock that asyncio.sleep advances"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry.time, "monotonic", clock)
+    monkeypatch.setattr(retry.asyncio, "sleep", clock.sleep)
+    return clock
+
+@pytest.fixture
+def longest_jitter(monkeypatch):
+    """Every jittered delay takes the top of its range; the ranges are recorded"""
+    ranges = []
+
+    def uniform(low, high):
+        ranges.append((low, high))
+        return high
+
+    monkeypatch.setattr(retry.random, "uniform", uniform)
+    return ranges
+
+def failing(errors, result="ok"):
+    """Attempt that raises each of `errors` in turn, then returns `result`"""
+    calls = []
+
+    async def attempt():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return attempt, calls
+
+def test_jitter_is_full_and_capped(clock, longest_jitter):
+    policy = RetryPolicy(attempts=6, base_delay=1, max_delay=5, deadline_seconds=1000)
+    attempt, calls = failing([ProviderError(503)] * 5)
+    assert asyncio.run(policy.call(attempt, name="llm")) == "ok"
+    assert longest_jitter == [(0, 1), (0, 2), (0, 4), (0, 5), (0, 5)]
+    assert clock.sleeps == [1, 2, 4, 5, 5]
+    stats = policy.stats()["llm"]
+    assert stats["retries"] == 5 and stats["recovered"] == 1 and stats.get("gave_up", 0) == 0
+
+def test_jittered_delays_stay_in_range(clock):
+    policy = RetryPolicy(attempts=4, base_delay=0.5, max_delay=1, deadline_seconds=1000)
+    attempt, _ = failing([ProviderError(429)] * 3)
+    asyncio.run(policy.call(attempt))
+    assert [0 <= delay <= limit for delay, limit in zip(clock.sleeps, [0.5, 1, 1])] == [True] * 3
+
+def test_gives_up_when_the_next_wait_passes_the_deadline(clock, longest_jitter):
+    policy = RetryPolicy(attempts=10, base_delay=1, max_delay=60, deadline_seconds=3)
+    error = ProviderError(500)
+    attempt, calls = failing([error] * 10)
+    with pytest.raises(ProviderError) as raised:
+        asyncio.run(policy.call(attempt, name="llm"))
+    # Waits 1s, then a 2s wait would end at the 3s deadline
+    assert raised.value is error
+    assert len(calls) == 2 and clock.sleeps == [1]
+    assert policy.stats()["llm"]["gave_up"] == 1
+
+def test_gives_up_after_the_last_attempt(clock, longest_jitter):
+    policy = RetryPolicy(attempts=3, base_delay=1, max_delay=60, deadline_seconds=1000)
+    attempt, calls = failing([ProviderError(502)] * 10)
+    with pytest.raises(ProviderError):
+        asyncio.run(policy.call(attempt))
+    assert len(calls) == 3 and clock.sleeps == [1, 2]
+
+def test_retry_after_header_replaces_the_backoff(clock, longest_jitter):
+    policy = RetryPolicy(attempts=3, base_delay=1, max_delay=60, deadline_seconds=1000)
+    attempt, _ = failing([ProviderError(429, {"retry-after": "7"}), ProviderError(429, {"retry-after-ms": "250"})])
+    asyncio.run(policy.call(attempt))
+    assert clock.sleeps == [7.0, 0.25] and longest_jitter == []
+
+@pytest.mark.parametrize("error", [ProviderError(400), ProviderError(401), ValueError("bug")])
+def test_other_errors_are_not_retried(clock, error):
+    policy = RetryPolicy(attempts=5, base_delay=1, max_delay=60, deadline_seconds=1000)
+    attempt, calls = failing([error])
+    with pytest.raises(type(error)):
+        asyncio.run(policy.call(attempt, name="llm"))
+    assert len(calls) == 1 and clock.sleeps == []
+    stats = policy.stats()["llm"]
+    assert stats["failed"] == 1 and stats.get("retries", 0) == 0
+
+@pytest.mark.parametrize("error, expected", [
+    (ProviderError(408), True),
+    (ProviderError(429), True),
+    (ProviderError(504), True),
+    (ProviderError(404), False),
+    (ConnectionError(), True),
+    (asyncio.TimeoutError(), True),
+    (type("APIConnectionError", (Exception,), {})(), True),
+    (KeyError("x"), False),
+])
+def test_is_retryable(error, expected):
+    assert is_retryable(error) is expected
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, None),
+    ({"retry-after": "3"}, 3.0),
+    ({"retry-after": "-1"}, 0.0),
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "soon"}, None),
+])
+def test_retry_after_seconds(headers, expected):
+    assert retry_after_seconds(ProviderError(429, headers)) == expected
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.api_schemas import Roadmap, StoryUpdate
+from app.models.database import Conversation, Project, Roadmap as RoadmapDB, User
+from app.models.database.base import Base
+from app.services import database_service, project_service, roadmap_version_service
+from app.services.roadmap_service import RoadmapService
+
+roadmap_service = RoadmapService()
+
+LEGACY = {"roadmapNodes": [
+    {"id": 1, "name": "Setup", "stories": [{"id": 101, "title": "Init", "completed": True}]},
+    {"id": "2", "title": "Old", "subtasks": [{"id": "201", "title": "Sub"}]},
+]}
+
+MIXED = {"epics": [
+    {"id": 1, "name": "Setup", "stories": [{"id": 101, "title": "Init"}]},
+    {"id": 2, "name": "Build", "stories": [{"id": 201, "title": "Has id"}, {"title": "No id"}]},
+]}
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def make_project(db, roadmap_data):
+    user = User(email="owner@example.com")
+    db.add(user)
+    db.flush()
+    project = Project(user_id=user.id, name="p", roadmap_data=roadmap_data)
+    db.add(project)
+    db.flush()
+    roadmap_service.sync_project_roadmap(db, project.id, roadmap_data)
+    db.commit()
+    return project
+
+def test_legacy_shapes_are_normalized():
+    epics, stories = roadmap_service.roadmap_rows(5, LEGACY)
+    assert [(e["epic_id"], e["name"]) for e in epics] == [(1, "Setup"), (2, "Old")]
+    assert [(s["epic_id"], s["story_id"], s["completed"]) for s in stories] == [(1, 101, True), (2, 201, False)]
+
+@pytest.mark.parametrize("roadmap_data", [
+    MIXED,
+    {"epics": [{"name": "No id", "stories": []}, {"id": 2, "name": "Build", "stories": []}]},
+    {"epics": [{"id": True, "name": "Bool id", "stories": []}]},
+])
+def test_roadmap_with_unaddressable_entries_is_not_normalized(roadmap_data):
+    assert roadmap_service.roadmap_rows(5, roadmap_data) == ([], [])
+
+def test_mixed_roadmap_is_served_from_the_blob(db):
+    project = make_project(db, MIXED)
+    assert not roadmap_service.is_normalized(db, project.id)
+    assert not roadmap_service.ensure_normalized(db, project.id)
+    assert roadmap_service.get_project_roadmap(db, project) == MIXED
+
+def test_legacy_roadmap_view_has_one_epics_key(db):
+    project = make_project(db, LEGACY)
+    view = roadmap_service.get_project_roadmap(db, project)
+    assert "roadmapNodes" not in view
+    assert [epic["id"] for epic in view["epics"]] == [1, 2]
+    assert [story["id"] for story in view["epics"][1]["stories"]] == [201]
+
+def roadmap(*story_titles):
+    return Roadmap(
+        project={"name": "p", "vision": "v", "type": "web", "target_users": "u"},
+        epics=[{"id": 1, "name": "Setup", "priority": "P0", "description": "d", "stories": [
+            {"id": 100 + index, "title": title} for index, title in enumerate(story_titles)
+        ]}],
+        architecture={"mermaid_diagram": "graph TD"}
+    )
+
+def test_every_roadmap_write_records_a_version(db):
+    project = make_project(db, None)
+    conversation = Conversation(session_id="s1", user_id=project.user_id, project_id=project.id)
+    db.add(conversation)
+    db.commit()
+    assert database_service.save_roadmap(db, conversation.id, roadmap("Init"), project.user_id)
+    roadmap_id = db.query(RoadmapDB.id).filter(RoadmapDB.conversation_id == conversation.id).scalar()
+
+    # A project PUT, a row edit, then a PUT that undoes the row edit
+    _, changed = project_service.update_project_roadmap(db, project.id, project.user_id, roadmap("Init", "Build"))
+    assert changed
+    roadmap_service.update_story(db, project.id, 101, StoryUpdate(completed=True))
+    _, changed = project_service.update_project_roadmap(db, project.id, project.user_id, roadmap("Init", "Build"))
+    assert changed
+
+    versions = [roadmap_version_service.get_version(db, roadmap_id, v) for v in range(1, 5)]
+    assert [[story["title"] for story in version["epics"][0]["stories"]] for version in versions] == [
+        ["Init"], ["Init", "Build"], ["Init", "Build"], ["Init", "Build"]
+    ]
+    assert [version["epics"][0]["stories"][-1]["completed"] for version in versions] == [False, False, True, False]
+    assert roadmap_version_service.get_version(db, roadmap_id, 5) is None
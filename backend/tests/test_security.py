@@ -0,0 +1,25 @@
+import pytest
+
+from app.core.security import TokenError, TokenSigner
+
+signer = TokenSigner("secret", ["old secret"], 60)
+
+def test_issue_and_verify():
+    claims = signer.verify(signer.issue(7, is_superuser=True))
+    assert claims.user_id == 7 and claims.is_superuser
+
+def test_previous_secret_still_verifies():
+    token = TokenSigner("old secret", [], 60).issue(7)
+    assert signer.verify(token).user_id == 7
+
+@pytest.mark.parametrize("token", [
+    "",
+    "x.y.z",
+    "é.a.b",
+    signer.issue(7) + "é",
+    TokenSigner("other", [], 60).issue(7),
+    TokenSigner("secret", [], -1).issue(7),
+])
+def test_rejects_bad_tokens(token):
+    with pytest.raises(TokenError):
+        signer.verify(token)
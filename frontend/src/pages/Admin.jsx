@@ -15,15 +15,25 @@ import {
   MessageSquare,
   Edit
 } from 'lucide-react';
+import AuthService from '../services/authService';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
+// Admin endpoints require a superuser's access token
+const adminFetch = (url, options = {}) => fetch(url, {
+  ...options,
+  headers: { ...AuthService.getAuthHeaders(), ...options.headers },
+});
+
 const Admin = () => {
   const [activeTab, setActiveTab] = useState('users');
   const [users, setUsers] = useState([]);
+  const [userPage, setUserPage] = useState({ total: 0, nextBeforeId: null });
   const [projects, setProjects] = useState([]);
+  const [projectPage, setProjectPage] = useState({ total: 0, nextBeforeId: null });
   const [analytics, setAnalytics] = useState({});
   const [feedback, setFeedback] = useState([]);
+  const [feedbackPage, setFeedbackPage] = useState({ total: 0, nextBeforeId: null });
   const [loading, setLoading] = useState(false);
   const [showCreateUser, setShowCreateUser] = useState(false);
   const [selectedUser, setSelectedUser] = useState(null);
@@ -36,24 +46,38 @@ const Admin = () => {
     loadFeedback();
   }, []);
 
-  const loadUsers = async () => {
+  // Admin listings are paged: the total and the next page cursor come back in headers
+  const fetchPage = async (path, beforeId) => {
+    const url = beforeId ? `${API_BASE_URL}${path}?before_id=${beforeId}` : `${API_BASE_URL}${path}`;
+    const response = await adminFetch(url);
+    if (!response.ok) {
+      return null;
+    }
+    return {
+      items: await response.json(),
+      total: Number(response.headers.get('X-Total-Count') || 0),
+      nextBeforeId: response.headers.get('X-Next-Before-Id')
+    };
+  };
+
+  const loadUsers = async (more = false) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/users`);
-      if (response.ok) {
-        const data = await response.json();
-        setUsers(data);
+      const page = await fetchPage('/api/admin/users', more ? userPage.nextBeforeId : null);
+      if (page) {
+        setUsers(more ? [...users, ...page.items] : page.items);
+        setUserPage({ total: page.total, nextBeforeId: page.nextBeforeId });
       }
     } catch (error) {
       console.error('Failed to load users:', error);
     }
   };
 
-  const loadProjects = async () => {
+  const loadProjects = async (more = false) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/projects`);
-      if (response.ok) {
-        const data = await response.json();
-        setProjects(data);
+      const page = await fetchPage('/api/admin/projects', more ? projectPage.nextBeforeId : null);
+      if (page) {
+        setProjects(more ? [...projects, ...page.items] : page.items);
+        setProjectPage({ total: page.total, nextBeforeId: page.nextBeforeId });
       }
     } catch (error) {
       console.error('Failed to load projects:', error);
@@ -62,7 +86,7 @@ const Admin = () => {
 
   const loadAnalytics = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/analytics`);
+      const response = await adminFetch(`${API_BASE_URL}/api/admin/analytics`);
       if (response.ok) {
         const data = await response.json();
         setAnalytics(data);
@@ -72,12 +96,12 @@ const Admin = () => {
     }
   };
 
-  const loadFeedback = async () => {
+  const loadFeedback = async (more = false) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/feedback`);
-      if (response.ok) {
-        const data = await response.json();
-        setFeedback(data);
+      const page = await fetchPage('/api/admin/feedback', more ? feedbackPage.nextBeforeId : null);
+      if (page) {
+        setFeedback(more ? [...feedback, ...page.items] : page.items);
+        setFeedbackPage({ total: page.total, nextBeforeId: page.nextBeforeId });
       }
     } catch (error) {
       console.error('Failed to load feedback:', error);
@@ -133,7 +157,9 @@ const Admin = () => {
         {/* Tab Content */}
         {activeTab === 'users' && <UserManagement 
           users={users}
-          onRefresh={loadUsers}
+          total={userPage.total}
+          onRefresh={() => loadUsers()}
+          onLoadMore={userPage.nextBeforeId ? () => loadUsers(true) : null}
           showCreateUser={showCreateUser}
           setShowCreateUser={setShowCreateUser}
           selectedUser={selectedUser}
@@ -142,12 +168,16 @@ const Admin = () => {
         
         {activeTab === 'projects' && <ProjectManagement 
           projects={projects}
-          onRefresh={loadProjects}
+          total={projectPage.total}
+          onRefresh={() => loadProjects()}
+          onLoadMore={projectPage.nextBeforeId ? () => loadProjects(true) : null}
         />}
         
         {activeTab === 'feedback' && <FeedbackManagement 
           feedback={feedback}
-          onRefresh={loadFeedback}
+          total={feedbackPage.total}
+          onRefresh={() => loadFeedback()}
+          onLoadMore={feedbackPage.nextBeforeId ? () => loadFeedback(true) : null}
         />}
         
         {activeTab === 'analytics' && <AnalyticsDashboard 
@@ -182,14 +212,14 @@ const Admin = () => {
 };
 
 // User Management Component
-const UserManagement = ({ users, onRefresh, showCreateUser, setShowCreateUser, selectedUser, setSelectedUser }) => {
+const UserManagement = ({ users, total, onRefresh, onLoadMore, showCreateUser, setShowCreateUser, selectedUser, setSelectedUser }) => {
   const handleDeleteUser = async (userId) => {
     if (!confirm('Are you sure you want to delete this user? This action cannot be undone.')) {
       return;
     }
     
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/users/${userId}`, {
+      const response = await adminFetch(`${API_BASE_URL}/api/admin/users/${userId}`, {
         method: 'DELETE',
       });
       
@@ -206,7 +236,7 @@ const UserManagement = ({ users, onRefresh, showCreateUser, setShowCreateUser, s
 
   const toggleUserStatus = async (userId, currentStatus) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/users/${userId}/toggle-status`, {
+      const response = await adminFetch(`${API_BASE_URL}/api/admin/users/${userId}/toggle-status`, {
         method: 'PATCH',
         headers: {
           'Content-Type': 'application/json',
@@ -230,7 +260,7 @@ const UserManagement = ({ users, onRefresh, showCreateUser, setShowCreateUser, s
       {/* Header with Add User button */}
       <div className="flex justify-between items-center mb-6">
         <h2 className="text-xl font-semibold text-gray-900 dark:text-white">
-          Users ({users.length})
+          Users ({total})
         </h2>
         <button
           onClick={() => setShowCreateUser(true)}
@@ -331,6 +361,16 @@ const UserManagement = ({ users, onRefresh, showCreateUser, setShowCreateUser, s
           </tbody>
         </table>
       </div>
+      {onLoadMore && (
+        <div className="flex justify-center mt-4">
+          <button
+            onClick={onLoadMore}
+            className="text-blue-600 hover:text-blue-700 dark:text-blue-400 dark:hover:text-blue-300"
+          >
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -350,7 +390,7 @@ const CreateUserModal = ({ onClose, onSuccess }) => {
     setLoading(true);
 
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/users`, {
+      const response = await adminFetch(`${API_BASE_URL}/api/admin/users`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -467,7 +507,7 @@ const UserDetailsModal = ({ user, onClose, onSuccess }) => {
 
   const loadUserProjects = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/users/${user.id}/projects`);
+      const response = await adminFetch(`${API_BASE_URL}/api/admin/users/${user.id}/projects`);
       if (response.ok) {
         const data = await response.json();
         setUserProjects(data);
@@ -569,12 +609,12 @@ const UserDetailsModal = ({ user, onClose, onSuccess }) => {
 };
 
 // Project Management Component
-const ProjectManagement = ({ projects, onRefresh }) => {
+const ProjectManagement = ({ projects, total, onRefresh, onLoadMore }) => {
   return (
     <div>
       <div className="flex justify-between items-center mb-6">
         <h2 className="text-xl font-semibold text-gray-900 dark:text-white">
-          All Projects ({projects.length})
+          All Projects ({total})
         </h2>
         <button
           onClick={onRefresh}
@@ -645,12 +685,22 @@ const ProjectManagement = ({ projects, onRefresh }) => {
           </tbody>
         </table>
       </div>
+      {onLoadMore && (
+        <div className="flex justify-center mt-4">
+          <button
+            onClick={onLoadMore}
+            className="text-blue-600 hover:text-blue-700 dark:text-blue-400 dark:hover:text-blue-300"
+          >
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   );
 };
 
 // Feedback Management Component
-const FeedbackManagement = ({ feedback, onRefresh }) => {
+const FeedbackManagement = ({ feedback, total, onRefresh, onLoadMore }) => {
   const [selectedFeedback, setSelectedFeedback] = useState(null);
   const [showUpdateModal, setShowUpdateModal] = useState(false);
   const [showViewModal, setShowViewModal] = useState(false);
@@ -662,7 +712,7 @@ const FeedbackManagement = ({ feedback, onRefresh }) => {
     }
     
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/feedback/${feedbackId}`, {
+      const response = await adminFetch(`${API_BASE_URL}/api/admin/feedback/${feedbackId}`, {
         method: 'DELETE',
       });
       
@@ -679,7 +729,7 @@ const FeedbackManagement = ({ feedback, onRefresh }) => {
 
   const handleUpdateFeedback = async (feedbackId, status, adminNotes) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/feedback/${feedbackId}`, {
+      const response = await adminFetch(`${API_BASE_URL}/api/admin/feedback/${feedbackId}`, {
         method: 'PATCH',
         headers: {
           'Content-Type': 'application/json',
@@ -729,7 +779,7 @@ const FeedbackManagement = ({ feedback, onRefresh }) => {
     <div>
       <div className="flex justify-between items-center mb-6">
         <h2 className="text-xl font-semibold text-gray-900 dark:text-white">
-          Feedback Management
+          Feedback Management ({total})
         </h2>
         <button
           onClick={onRefresh}
@@ -828,6 +878,16 @@ const FeedbackManagement = ({ feedback, onRefresh }) => {
           </tbody>
         </table>
       </div>
+      {onLoadMore && (
+        <div className="flex justify-center mt-4">
+          <button
+            onClick={onLoadMore}
+            className="text-blue-600 hover:text-blue-700 dark:text-blue-400 dark:hover:text-blue-300"
+          >
+            Load more
+          </button>
+        </div>
+      )}
 
       {/* Update Feedback Modal */}
       {showUpdateModal && selectedFeedback && (
@@ -1045,7 +1105,7 @@ const SystemManagement = () => {
   const handleBackupDatabase = async () => {
     setBackupStatus('Creating backup...');
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/backup`, {
+      const response = await adminFetch(`${API_BASE_URL}/api/admin/backup`, {
         method: 'POST',
       });
       
@@ -1062,7 +1122,7 @@ const SystemManagement = () => {
 
   const checkSystemHealth = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/admin/health`);
+      const response = await adminFetch(`${API_BASE_URL}/api/admin/health`);
       if (response.ok) {
         const data = await response.json();
         setSystemHealth(data);
@@ -1,3 +1,5 @@
+import AuthService from './authService';
+
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 const API_TIMEOUT = import.meta.env.VITE_API_TIMEOUT || 30000;
 
@@ -12,6 +14,7 @@ class ApiClient {
     const config = {
       headers: {
         'Content-Type': 'application/json',
+        ...AuthService.getAuthHeaders(),
         ...options.headers,
       },
       timeout: this.timeout,
@@ -5,7 +5,8 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000
 
 class AuthService {
   /**
-   * Login user with email (dev mode - no password required)
+   * Login user with email and password (the password may be omitted when the
+   * backend runs with AUTH_ALLOW_USER_ID_PARAM, in development)
    */
   async login(email, password = null) {
     try {
@@ -14,7 +15,7 @@ class AuthService {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ email }),
+        body: JSON.stringify(password ? { email, password } : { email }),
       });
 
       if (!response.ok) {
@@ -25,13 +26,13 @@ class AuthService {
       const data = await response.json();
       
       // Store auth data in localStorage
-      localStorage.setItem('auth_token', `dev-token-${data.user.id}`);
+      localStorage.setItem('auth_token', data.access_token);
       localStorage.setItem('user', JSON.stringify(data.user));
       localStorage.setItem('user_id', data.user.id.toString());
 
       return {
         user: data.user,
-        token: `dev-token-${data.user.id}`,
+        token: data.access_token,
         message: data.message
       };
     } catch (error) {
@@ -103,6 +104,14 @@ class AuthService {
     }
   }
 
+  /**
+   * Authorization header for API calls (empty for sessions from before access tokens)
+   */
+  getAuthHeaders() {
+    const token = localStorage.getItem('auth_token');
+    return token && !token.startsWith('dev-token-') ? { Authorization: `Bearer ${token}` } : {};
+  }
+
   /**
    * Get stored user ID
    */